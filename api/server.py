@@ -0,0 +1,501 @@
+"""
+HTTP/JSON API ของระบบร้องเรียน (asyncio ไม่ต้องใช้ tkinter หรือไลบรารีภายนอก)
+
+Endpoint:
+    GET  /canteens                           สรุปโรงอาหารพร้อมจำนวนการร้องเรียน
+    GET  /stalls[?canteen_id=]               สรุปร้านอาหารพร้อมจำนวนการร้องเรียน
+    GET  /complaints?page=&page_size=&status=
+    GET  /complaints?stall_id=[&limit=]      การร้องเรียนของร้านหนึ่ง
+    GET  /complaints?start=&end=[&status=&limit=]  การร้องเรียนในช่วงวันที่
+    GET  /complaints/query?status=&canteen_id=&stall_id=&problem_type=&start=&end=&sort=&page=&page_size=
+                                             การร้องเรียนที่ตรงทุกเงื่อนไขที่ระบุ ทีละหน้า
+    GET  /complaints/search?q=&limit=&status=
+    GET  /complaints/<id>                    รายละเอียดพร้อมการตอบกลับ
+    GET  /trend?granularity=&dimension=&start=&end=&status=
+    GET  /rankings?dimension=stall|canteen&metric=total|pending|recent&limit=&days=&end=
+                                             ร้าน/โรงอาหารที่มีการร้องเรียนมากที่สุด
+    GET  /stats                              สถิติ hit/miss ของ cache ผลการอ่าน
+    POST /complaints                         {"stall_id", "problem_type", "complaint_description"}
+    POST /complaints/<id>/responses          {"response_text"}
+
+การเรียก model ทั้งหมดทำใน thread pool (loop.run_in_executor) event loop จึงรับและตอบ
+คำขออื่นได้ระหว่างการค้นหาหรือคำนวณที่ใช้เวลานาน การอ่านทำใน executor ของการอ่าน
+ส่วนการเขียนทำทีละรายการตามลำดับใน executor ของการเขียน (thread เดียว) และไม่ทำ
+พร้อมกับการอ่าน (ReadWriteGate) การเขียนไฟล์จริงเกิดใน PersistenceWorker
+การเชื่อมต่อรองรับ keep-alive
+"""
+
+import asyncio
+import json
+import logging
+import re
+import sys
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, Any, Callable, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from controllers.complaint_controller import ComplaintController
+
+
+logger = logging.getLogger(__name__)
+
+
+class HttpError(Exception):
+    """ข้อผิดพลาดที่ส่งกลับไปให้ client เป็น JSON พร้อม status code"""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class HttpRequest:
+    """คำขอ HTTP ที่อ่านแล้ว (method, path, query, headers และ body)"""
+    
+    __slots__ = ('method', 'path', 'query', 'version', 'headers', 'body')
+    
+    def __init__(self, method: str, target: str, version: str, headers: Dict[str, str], body: bytes):
+        url = urlsplit(target)
+        self.method = method
+        self.path = url.path.rstrip('/') or '/'
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self.version = version
+        self.headers = headers
+        self.body = body
+    
+    @property
+    def keep_alive(self) -> bool:
+        """HTTP/1.1 เปิดการเชื่อมต่อค้างไว้เป็นค่าเริ่มต้น HTTP/1.0 ต้องขอด้วย header"""
+        connection = self.headers.get('connection', '').lower()
+        if self.version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+    
+    def json(self) -> Dict[str, Any]:
+        """อ่าน body เป็น JSON object"""
+        try:
+            data = json.loads(self.body.decode('utf-8'))
+        except (UnicodeDecodeError, ValueError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "body ต้องเป็น JSON")
+        if not isinstance(data, dict):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "body ต้องเป็น JSON object")
+        return data
+    
+    def int_param(self, name: str, default: int, minimum: int = 0, maximum: int = None) -> int:
+        """อ่าน query parameter เป็นจำนวนเต็มในช่วงที่กำหนด"""
+        value = self.query.get(name)
+        if value is None:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"{name} ต้องเป็นจำนวนเต็ม")
+        if number < minimum or (maximum is not None and number > maximum):
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"{name} ต้องอยู่ระหว่าง {minimum} ถึง {maximum}")
+        return number
+
+
+class ReadWriteGate:
+    """ให้การอ่านหลายรายการทำพร้อมกันได้ แต่การเขียนทำเมื่อไม่มีงานอื่นทำอยู่เท่านั้น
+    
+    ใช้ใน event loop เท่านั้น งานที่ต้องรอถูกปล่อยตามลำดับที่มาถึง การอ่านที่มาหลัง
+    การเขียนที่รออยู่จึงรอการเขียนนั้นก่อน (การเขียนไม่ถูกการอ่านต่อเนื่องแซงไปเรื่อย ๆ)
+    """
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.readers = 0
+        self.writing = False
+        self.waiting = deque()
+    
+    @property
+    def idle(self) -> bool:
+        """ไม่มีงานที่ทำอยู่หรือรออยู่"""
+        return not self.readers and not self.writing and not self.waiting
+    
+    def _can_enter(self, write: bool) -> bool:
+        return not self.writing and not (write and self.readers)
+    
+    def _admit(self, write: bool):
+        if write:
+            self.writing = True
+        else:
+            self.readers += 1
+    
+    async def enter(self, write: bool):
+        """รอจนได้สิทธิ์อ่าน (write=False) หรือเขียน (write=True)"""
+        if not self.waiting and self._can_enter(write):
+            self._admit(write)
+            return
+        future = self.loop.create_future()
+        self.waiting.append((write, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # ได้สิทธิ์แล้วแต่ผู้รอถูกยกเลิกก่อนใช้
+                self.leave(write)
+            raise
+    
+    def leave(self, write: bool):
+        """คืนสิทธิ์ที่ได้จาก enter แล้วปล่อยงานที่รออยู่ที่ทำต่อได้"""
+        if write:
+            self.writing = False
+        else:
+            self.readers -= 1
+        while self.waiting:
+            waiting_write, future = self.waiting[0]
+            if future.cancelled():
+                self.waiting.popleft()
+                continue
+            if not self._can_enter(waiting_write):
+                return
+            self.waiting.popleft()
+            self._admit(waiting_write)
+            future.set_result(None)
+
+
+def to_json(value: Any) -> Any:
+    """แปลง record (Mapping) เป็น dict สำหรับ json.dumps"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"แปลงเป็น JSON ไม่ได้: {type(value).__name__}")
+
+
+def encode_json(payload: Any) -> bytes:
+    """แปลง payload เป็น JSON แบบ utf-8"""
+    return json.dumps(payload, ensure_ascii=False, default=to_json).encode('utf-8')
+
+
+def render_response(status: int, body: bytes, keep_alive: bool) -> bytes:
+    """สร้าง HTTP response จาก body ที่แปลงเป็น JSON แล้ว (encode_json)"""
+    status = HTTPStatus(status)
+    head = (
+        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        f"\r\n"
+    )
+    return head.encode('latin-1') + body
+
+
+class ApiServer:
+    """HTTP server ที่เปิด operation ของ ComplaintController เป็น JSON"""
+    
+    # เวลา (วินาที) ที่การเชื่อมต่อ keep-alive ว่างได้ก่อนถูกปิด
+    KEEP_ALIVE_TIMEOUT = 15
+    # ขนาด body สูงสุดที่รับ (ไบต์)
+    MAX_BODY = 64 * 1024
+    # จำนวนรายการสูงสุดต่อคำขอ (ป้องกันการส่งข้อมูลทั้งหมดในครั้งเดียว)
+    MAX_PAGE_SIZE = 500
+    # ช่วงวันล่าสุดที่ยาวที่สุดของการจัดอันดับ
+    MAX_RANKING_DAYS = 3660
+    # ระยะเวลา (วินาที) ระหว่างการตรวจผลการเขียนไฟล์เบื้องหลัง
+    POLL_INTERVAL = 0.2
+    # จำนวนรอบที่เลื่อนการตรวจได้ระหว่างที่มีคำขอทำอยู่ ก่อนเข้าคิวรอแทรก
+    POLL_MAX_SKIPS = 25
+    # จำนวน thread ของการอ่าน (ใช้ 1 ถ้า model ไม่รองรับการอ่านพร้อมกันหลาย thread)
+    READ_WORKERS = 4
+    
+    COMPLAINT_PATH = re.compile(r'^/complaints/([^/]+)$')
+    RESPONSES_PATH = re.compile(r'^/complaints/([^/]+)/responses$')
+    
+    def __init__(self, controller: ComplaintController, loop: asyncio.AbstractEventLoop = None):
+        self.controller = controller
+        self.loop = loop or asyncio.get_event_loop()
+        self.gate = ReadWriteGate(self.loop)
+        read_workers = self.READ_WORKERS if getattr(controller.model, 'THREAD_SAFE_READS', False) else 1
+        self.readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix='api-read')
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='api-write')
+        # งานเขียนที่ยังไม่เสร็จ (stop รอให้เสร็จก่อนปิด)
+        self.pending_writes = set()
+        self.server = None
+        self.tasks = []
+        # การเชื่อมต่อที่เปิดอยู่ (ปิดทั้งหมดเมื่อหยุด server แม้จะเป็น keep-alive ที่ว่างอยู่)
+        self.connections = set()
+        self.routes: Dict[Tuple[str, str], Callable] = {
+            ('GET', '/canteens'): self.list_canteens,
+            ('GET', '/stalls'): self.list_stalls,
+            ('GET', '/complaints'): self.list_complaints,
+            ('GET', '/complaints/query'): self.query_complaints,
+            ('GET', '/complaints/search'): self.search_complaints,
+            ('GET', '/trend'): self.get_trend,
+            ('GET', '/rankings'): self.get_rankings,
+            ('GET', '/stats'): self.get_stats,
+            ('POST', '/complaints'): self.create_complaint
+        }
+        # handler ที่แก้ไขข้อมูล (ทำใน executor ของการเขียน)
+        self.write_handlers = {self.create_complaint, self.create_response}
+        self.controller.register_callback('persistence_error', self.on_persistence_error)
+    
+    # ===== Server Lifecycle =====
+    def start(self, host: str, port: int):
+        """เปิด socket และเริ่ม task ตรวจผลการเขียน (คืนเมื่อพร้อมรับการเชื่อมต่อ)"""
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self.handle_connection, host, port)
+        )
+        self.tasks = [self.loop.create_task(self.poll_loop())]
+        return self.server.sockets[0].getsockname()
+    
+    def stop(self):
+        """หยุดรับการเชื่อมต่อใหม่ ทำงานเขียนที่ค้างให้เสร็จ แล้วหยุด task และ executor"""
+        self.server.close()
+        if self.pending_writes:
+            self.loop.run_until_complete(asyncio.wait(self.pending_writes))
+        for writer in list(self.connections):
+            writer.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        for task in self.tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*self.tasks, return_exceptions=True))
+        self.readers.shutdown(wait=True)
+        self.writer.shutdown(wait=True)
+    
+    async def run_model(self, write: bool, func: Callable, *args) -> Any:
+        """เรียก func(*args) ใน executor ของการอ่านหรือการเขียน แล้วรอผล
+        
+        สิทธิ์ใน gate ถูกคืนเมื่อ thread ทำงานเสร็จจริง แม้ผู้รอจะถูกยกเลิกก่อน
+        """
+        await self.gate.enter(write)
+        try:
+            future = self.loop.run_in_executor(self.writer if write else self.readers, func, *args)
+        except BaseException:
+            self.gate.leave(write)
+            raise
+        future.add_done_callback(lambda _: self.gate.leave(write))
+        return await asyncio.shield(future)
+    
+    async def run_write(self, func: Callable, *args) -> Any:
+        """เรียกงานเขียนผ่าน run_model โดยงานทำต่อจนเสร็จแม้ client ปิดการเชื่อมต่อ"""
+        task = self.loop.create_task(self.run_model(True, func, *args))
+        self.pending_writes.add(task)
+        task.add_done_callback(self.pending_writes.discard)
+        return await asyncio.shield(task)
+    
+    async def poll_loop(self):
+        """ตรวจผลการเขียนไฟล์เบื้องหลังและข้อมูลจาก instance อื่นเป็นระยะ (แทน root.after ของ GUI)"""
+        skipped = 0
+        while True:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            # การเขียนที่รอใน gate ทำให้การอ่านใหม่ต้องรอด้วย จึงเลื่อนการตรวจระหว่างมีคำขอทำอยู่
+            if not self.gate.idle and skipped < self.POLL_MAX_SKIPS:
+                skipped += 1
+                continue
+            skipped = 0
+            await self.run_model(True, self.poll_changes)
+    
+    def poll_changes(self):
+        """งานของ poll_loop (รวมข้อมูลเข้า model จึงทำใน executor ของการเขียน)"""
+        self.controller.poll_persistence()
+        self.controller.poll_external_changes()
+    
+    def on_persistence_error(self, change):
+        """ไม่มีหน้าจอให้แจ้ง จึงเขียนข้อผิดพลาดการบันทึกลง stderr"""
+        print(f"บันทึกข้อมูลไม่สำเร็จ: {change.get('error', '')}", file=sys.stderr)
+    
+    # ===== Connection Handling =====
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """รับคำขอบนการเชื่อมต่อเดียวซ้ำจนกว่า client จะปิดหรือไม่ขอ keep-alive"""
+        self.connections.add(writer)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), self.KEEP_ALIVE_TIMEOUT)
+                except HttpError as e:
+                    writer.write(render_response(e.status, encode_json({'error': e.message}), False))
+                    await writer.drain()
+                    return
+                if request is None:
+                    return
+                status, body = await self.dispatch(request)
+                writer.write(render_response(status, body, request.keep_alive))
+                await writer.drain()
+                if not request.keep_alive:
+                    return
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            return
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+    
+    async def read_request(self, reader: asyncio.StreamReader) -> HttpRequest or None:
+        """อ่านคำขอหนึ่งรายการ (None เมื่อ client ปิดการเชื่อมต่อระหว่างคำขอ)"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HttpError(HTTPStatus.BAD_REQUEST, "คำขอไม่สมบูรณ์")
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "header ยาวเกินไป")
+        
+        # request target อาจมีตัวอักษรที่ไม่ได้ percent-encode (เช่นคำค้นภาษาไทย) จึงอ่านเป็น utf-8
+        request_line, _, header_block = head.partition(b'\r\n')
+        try:
+            method, target, version = request_line.decode('utf-8').split(' ')
+        except (UnicodeDecodeError, ValueError):
+            raise HttpError(HTTPStatus.BAD_REQUEST, "request line ไม่ถูกต้อง")
+        headers = {}
+        for line in header_block.decode('latin-1').split('\r\n'):
+            if line:
+                name, _, value = line.partition(':')
+                headers[name.strip().lower()] = value.strip()
+        
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "Content-Length ไม่ถูกต้อง")
+        if length > self.MAX_BODY:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "body ใหญ่เกินไป")
+        body = await reader.readexactly(length) if length > 0 else b''
+        return HttpRequest(method, target, version, headers, body)
+    
+    async def dispatch(self, request: HttpRequest) -> Tuple[int, bytes]:
+        """เลือก handler ตาม method และ path คืน (status, body ที่เป็น JSON)"""
+        handler = self.routes.get((request.method, request.path))
+        args = ()
+        if handler is None:
+            match = self.RESPONSES_PATH.match(request.path)
+            if match and request.method == 'POST':
+                handler, args = self.create_response, match.groups()
+            match = self.COMPLAINT_PATH.match(request.path)
+            if match and request.method == 'GET':
+                handler, args = self.get_complaint, match.groups()
+        if handler is None:
+            return HTTPStatus.NOT_FOUND, encode_json({'error': f"ไม่พบ {request.method} {request.path}"})
+        try:
+            if handler in self.write_handlers:
+                return await self.run_write(self.call_handler, handler, request, *args)
+            return await self.run_model(False, self.call_handler, handler, request, *args)
+        except HttpError as e:
+            return e.status, encode_json({'error': e.message})
+        except ValueError as e:
+            # ค่าที่ model ไม่รองรับ เช่น รูปแบบวันที่หรือช่วงเวลาที่ไม่รู้จัก
+            return HTTPStatus.BAD_REQUEST, encode_json({'error': str(e)})
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("คำขอ %s %s ล้มเหลว", request.method, request.path)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, encode_json({'error': "เกิดข้อผิดพลาดภายในระบบ"})
+    
+    @staticmethod
+    def call_handler(handler: Callable, request: HttpRequest, *args) -> Tuple[int, bytes]:
+        """เรียก handler แล้วแปลงผลเป็น JSON ใน thread ของ executor
+        
+        record อ่านรายละเอียดและข้อความตอบกลับจากไฟล์เมื่อถูกแปลงเป็น dict จึงต้องแปลง
+        ก่อนคืนสิทธิ์ใน gate ไม่ใช่ใน event loop ระหว่างที่การเขียนอื่นอาจทำอยู่
+        """
+        status, payload = handler(request, *args)
+        return status, encode_json(payload)
+    
+    # ===== Validation =====
+    def read_status(self, request: HttpRequest) -> str or None:
+        status = request.query.get('status') or None
+        if status is not None and status not in self.controller.model.STATUSES:
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"ไม่รู้จักสถานะ: {status}")
+        return status
+    
+    @staticmethod
+    def required_text(data: Dict[str, Any], field: str) -> str:
+        value = data.get(field)
+        if not isinstance(value, str) or not value.strip():
+            raise HttpError(HTTPStatus.BAD_REQUEST, f"กรุณาระบุ {field}")
+        return value.strip()
+    
+    # ===== Read Handlers =====
+    def list_canteens(self, request: HttpRequest):
+        return HTTPStatus.OK, self.controller.get_canteen_summary()
+    
+    def list_stalls(self, request: HttpRequest):
+        canteen_id = request.query.get('canteen_id')
+        if canteen_id:
+            return HTTPStatus.OK, self.controller.get_stalls_by_canteen(canteen_id)
+        return HTTPStatus.OK, self.controller.get_stall_summary()
+    
+    def list_complaints(self, request: HttpRequest):
+        status = self.read_status(request)
+        limit = request.int_param('limit', self.MAX_PAGE_SIZE, 1, self.MAX_PAGE_SIZE)
+        stall_id = request.query.get('stall_id')
+        if stall_id:
+            return HTTPStatus.OK, self.controller.get_complaints_by_stall(stall_id)[:limit]
+        if 'start' in request.query or 'end' in request.query:
+            return HTTPStatus.OK, self.controller.get_complaints_between(
+                request.query.get('start'), request.query.get('end'), status
+            )[:limit]
+        return HTTPStatus.OK, self.controller.get_complaints_page(
+            request.int_param('page', 0),
+            request.int_param('page_size', 50, 1, self.MAX_PAGE_SIZE),
+            status
+        )
+    
+    def query_complaints(self, request: HttpRequest):
+        return HTTPStatus.OK, self.controller.query_complaints(
+            request.int_param('page', 0),
+            request.int_param('page_size', 50, 1, self.MAX_PAGE_SIZE),
+            request.query.get('sort', 'newest'),
+            self.read_status(request),
+            *(request.query.get(field) or None
+              for field in ('canteen_id', 'stall_id', 'problem_type', 'start', 'end'))
+        )
+    
+    def search_complaints(self, request: HttpRequest):
+        query = request.query.get('q', '').strip()
+        if not query:
+            raise HttpError(HTTPStatus.BAD_REQUEST, "กรุณาระบุคำค้น q")
+        return HTTPStatus.OK, self.controller.search_complaints(
+            query,
+            request.int_param('limit', 100, 1, self.MAX_PAGE_SIZE),
+            self.read_status(request)
+        )
+    
+    def get_complaint(self, request: HttpRequest, complaint_id: str):
+        complaint = self.controller.get_complaint_detail(complaint_id)
+        if not complaint:
+            raise HttpError(HTTPStatus.NOT_FOUND, "ไม่พบการร้องเรียน")
+        detail = dict(complaint)
+        detail['responses'] = self.controller.get_complaint_responses(complaint_id)
+        return HTTPStatus.OK, detail
+    
+    def get_trend(self, request: HttpRequest):
+        return HTTPStatus.OK, self.controller.get_trend(
+            request.query.get('granularity', 'week'),
+            request.query.get('dimension', 'all'),
+            request.query.get('start'),
+            request.query.get('end'),
+            self.read_status(request)
+        )
+    
+    def get_rankings(self, request: HttpRequest):
+        return HTTPStatus.OK, self.controller.get_top_offenders(
+            request.query.get('dimension', 'stall'),
+            request.query.get('metric', 'total'),
+            request.int_param('limit', 10, 1, self.MAX_PAGE_SIZE),
+            request.int_param('days', 30, 1, self.MAX_RANKING_DAYS),
+            request.query.get('end')
+        )
+    
+    def get_stats(self, request: HttpRequest):
+        return HTTPStatus.OK, {'cache': self.controller.get_cache_stats()}
+    
+    # ===== Write Handlers =====
+    def create_complaint(self, request: HttpRequest):
+        data = request.json()
+        stall_id = self.required_text(data, 'stall_id')
+        problem_type = self.required_text(data, 'problem_type')
+        description = self.required_text(data, 'complaint_description')
+        if not self.controller.model.get_stall_by_id(stall_id):
+            raise HttpError(HTTPStatus.NOT_FOUND, "ไม่พบร้านอาหาร")
+        complaint_id = self.controller.create_new_complaint(stall_id, problem_type, description)
+        return HTTPStatus.CREATED, {'complaint_id': complaint_id}
+    
+    def create_response(self, request: HttpRequest, complaint_id: str):
+        data = request.json()
+        response_text = self.required_text(data, 'response_text')
+        if not self.controller.get_complaint_detail(complaint_id):
+            raise HttpError(HTTPStatus.NOT_FOUND, "ไม่พบการร้องเรียน")
+        response_id = self.controller.submit_response(complaint_id, response_text)
+        return HTTPStatus.CREATED, {'response_id': response_id}
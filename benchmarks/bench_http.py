@@ -0,0 +1,196 @@
+"""
+ตัวสร้างโหลดสำหรับ HTTP API (server.py) วัดจำนวนคำขอต่อวินาทีและ latency
+
+รัน: python3 -m benchmarks.bench_http [--complaints 100000] [--connections 32] [--duration 10]
+     python3 -m benchmarks.bench_http --port 8080      (ยิงไปยัง server ที่เปิดอยู่แล้ว)
+
+ถ้าไม่ระบุ --port จะสร้างข้อมูลสังเคราะห์ในโฟลเดอร์ชั่วคราวแล้วเปิด server.py ใน process แยก
+แต่ละการเชื่อมต่อส่งคำขอต่อเนื่องบน keep-alive (ปิดได้ด้วย --no-keep-alive)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import write_dataset
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEARCH_QUERIES = ['แมลง', 'ไม่สุก', 'วัตถุดิบ', 'รสชาติ เมนู']
+
+
+def random_read_path(stall_ids, complaint_ids):
+    """สุ่ม path ของคำขออ่านหนึ่งรายการ"""
+    choice = random.random()
+    if choice < 0.35:
+        return f"/complaints?page={random.randint(0, 50)}&page_size=50"
+    if choice < 0.6:
+        return f"/complaints/{random.choice(complaint_ids)}"
+    if choice < 0.75:
+        return f"/complaints/search?q={quote(random.choice(SEARCH_QUERIES))}&limit=20"
+    if choice < 0.85:
+        return f"/complaints?stall_id={random.choice(stall_ids)}&limit=50"
+    if choice < 0.95:
+        return "/trend?granularity=week&dimension=canteen"
+    return "/stalls"
+
+
+def build_request(method: str, path: str, body: dict = None, keep_alive: bool = True) -> bytes:
+    payload = json.dumps(body, ensure_ascii=False).encode('utf-8') if body is not None else b''
+    head = (
+        f"{method} {path} HTTP/1.1\r\n"
+        f"Host: localhost\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"\r\n"
+    )
+    return head.encode('latin-1') + payload
+
+
+async def read_response(reader: asyncio.StreamReader):
+    """อ่าน response หนึ่งรายการ คืน (status, body)"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ')[1])
+    length = 0
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    body = await reader.readexactly(length)
+    return status, body
+
+
+async def http_get_json(host: str, port: int, path: str):
+    """GET ครั้งเดียว (ใช้ดึงรายการ ID สำหรับสุ่มคำขอ)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(build_request('GET', path, keep_alive=False))
+    _, body = await read_response(reader)
+    writer.close()
+    return json.loads(body.decode('utf-8'))
+
+
+async def client(host, port, deadline, keep_alive, write_ratio, stall_ids, complaint_ids, latencies, statuses):
+    """ส่งคำขอต่อเนื่องจนถึง deadline บันทึก latency (วินาที) และจำนวนแต่ละ status"""
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        if random.random() < write_ratio:
+            request = build_request('POST', '/complaints', {
+                'stall_id': random.choice(stall_ids),
+                'problem_type': 'ทดสอบโหลด',
+                'complaint_description': 'สร้างโดย bench_http'
+            }, keep_alive)
+        else:
+            request = build_request('GET', random_read_path(stall_ids, complaint_ids), keep_alive=keep_alive)
+        start = time.perf_counter()
+        if writer is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        writer.write(request)
+        status, _ = await read_response(reader)
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if not keep_alive:
+            writer.close()
+            writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(host, port, connections, duration, keep_alive, write_ratio):
+    stall_ids = [stall['stall_id'] for stall in await http_get_json(host, port, '/stalls')]
+    page = await http_get_json(host, port, '/complaints?page=0&page_size=500')
+    complaint_ids = [complaint['complaint_id'] for complaint in page['complaints']]
+    
+    latencies = []
+    statuses = {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*[
+        client(host, port, deadline, keep_alive, write_ratio, stall_ids, complaint_ids, latencies, statuses)
+        for _ in range(connections)
+    ])
+    elapsed = time.perf_counter() - start
+    
+    latencies.sort()
+    
+    def percentile(fraction):
+        return round(latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] * 1000, 3)
+    
+    return {
+        'connections': connections,
+        'keep_alive': keep_alive,
+        'write_ratio': write_ratio,
+        'seconds': round(elapsed, 3),
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': percentile(0.50),
+            'p90': percentile(0.90),
+            'p99': percentile(0.99),
+            'max': round(latencies[-1] * 1000, 3)
+        },
+        'statuses': {str(status): count for status, count in sorted(statuses.items())}
+    }
+
+
+def start_server(data_dir: str):
+    """เปิด server.py ใน process แยกบนพอร์ตที่ระบบเลือกให้ คืน (process, port)"""
+    env = dict(os.environ, COMPLAINT_DATA_DIR=data_dir, COMPLAINT_STORAGE='csv')
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT_DIR, "server.py"), "--port", "0"],
+        stdout=subprocess.PIPE, env=env, cwd=ROOT_DIR
+    )
+    # บรรทัดแรกของ server คือ "เปิด API ที่ http://host:port"
+    line = process.stdout.readline().decode('utf-8').strip()
+    return process, int(line.rsplit(':', 1)[1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="วัดจำนวนคำขอต่อวินาทีของ HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="พอร์ตของ server ที่เปิดอยู่แล้ว (ไม่ระบุ = เปิดเอง)")
+    parser.add_argument("--complaints", type=int, default=100000, help="ขนาดข้อมูลสังเคราะห์เมื่อเปิด server เอง")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="ระยะเวลาที่ยิงโหลด (วินาที)")
+    parser.add_argument("--write-ratio", type=float, default=0.05, help="สัดส่วนคำขอเพิ่มการร้องเรียน")
+    parser.add_argument("--no-keep-alive", action='store_true', help="เปิดการเชื่อมต่อใหม่ทุกคำขอ")
+    args = parser.parse_args()
+    
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    
+    def run(port):
+        return loop.run_until_complete(run_load(
+            args.host, port, args.connections, args.duration,
+            not args.no_keep_alive, args.write_ratio
+        ))
+    
+    if args.port:
+        result = run(args.port)
+    else:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_dataset(data_dir, args.complaints)
+            process, port = start_server(data_dir)
+            try:
+                result = run(port)
+            finally:
+                process.send_signal(signal.SIGINT)
+                process.wait()
+        result['complaints'] = args.complaints
+    loop.close()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
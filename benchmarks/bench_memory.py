@@ -0,0 +1,67 @@
+"""
+เปรียบเทียบหน่วยความจำของแถวแบบ dict (csv.DictReader) กับ record แบบ __slots__
+
+รัน: python3 -m benchmarks.bench_memory [จำนวนแถว]
+"""
+
+import csv
+import io
+import json
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.records import ComplaintRecord
+
+
+PROBLEM_TYPES = ['วัตถุดิบไม่สด', 'มีสิ่งแปลกปลอม', 'รสชาติไม่ตรงตามเมนู',
+                 'ปริมาณไม่เพียงพอ', 'ความสะอาดไม่ดี', 'การให้บริการไม่ดี']
+STATUSES = ['รอดำเนินการ', 'ดำเนินการแล้ว']
+
+
+def make_csv(rows: int) -> str:
+    """สร้างข้อความ CSV ของการร้องเรียนจำลอง"""
+    rng = random.Random(0)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ComplaintRecord.FIELDS)
+    for i in range(rows):
+        writer.writerow([
+            f"C{i + 1:03d}",
+            f"S{rng.randint(1, 50):03d}",
+            f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            rng.choice(PROBLEM_TYPES),
+            f"รายละเอียดการร้องเรียนหมายเลข {i}",
+            rng.choice(STATUSES)
+        ])
+    return buffer.getvalue()
+
+
+def measure(text: str, factory) -> int:
+    """วัดหน่วยความจำ (ไบต์) ที่ใช้เก็บแถวทั้งหมด"""
+    tracemalloc.start()
+    rows = [factory(row) for row in csv.DictReader(io.StringIO(text))]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return current
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = make_csv(rows)
+    dict_bytes = measure(text, dict)
+    record_bytes = measure(text, ComplaintRecord.from_dict)
+    print(json.dumps({
+        'rows': rows,
+        'dict_bytes': dict_bytes,
+        'record_bytes': record_bytes,
+        'saving_percent': round(100 * (1 - record_bytes / dict_bytes), 1)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
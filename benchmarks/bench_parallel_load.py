@@ -0,0 +1,52 @@
+"""
+วัดความเร็วการอ่าน complaints.csv แบบขนานเทียบกับแบบ process เดียว
+
+รัน: python3 -m benchmarks.bench_parallel_load [จำนวนการร้องเรียน]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import write_dataset
+from models.complaint_model import ComplaintModel
+
+
+def timed_load(model: ComplaintModel, workers: int) -> float:
+    """วัดเวลา load_complaints ด้วยจำนวน process ที่กำหนด (วินาที)"""
+    start = time.perf_counter()
+    model.load_complaints(workers=workers)
+    return time.perf_counter() - start
+
+
+def main():
+    complaints = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores})
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir, complaints)
+        model = ComplaintModel(data_dir)
+        baseline = timed_load(model, 1)
+        results = []
+        for workers in worker_counts:
+            seconds = baseline if workers == 1 else timed_load(model, workers)
+            results.append({
+                'workers': workers,
+                'seconds': round(seconds, 4),
+                'speedup': round(baseline / seconds, 2),
+                'speedup_per_core': round(baseline / seconds / min(workers, cores), 2)
+            })
+        print(json.dumps({
+            'complaints': complaints,
+            'file_bytes': os.path.getsize(os.path.join(data_dir, "complaints.csv")),
+            'cpu_count': cores,
+            'results': results
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+วัดเวลาค้นหาข้อความด้วย inverted index เทียบกับการไล่อ่านรายละเอียดทุกรายการ
+
+รัน: python3 -m benchmarks.bench_search [จำนวนการร้องเรียน]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import write_dataset
+from models.complaint_model import ComplaintModel
+
+QUERIES = ['แมลง', 'ไม่สุก', 'วัตถุดิบ', 'รสชาติ เมนู']
+
+
+def median_ms(func, repeat: int = 5) -> float:
+    """เวลากลาง (มิลลิวินาที) ของการเรียก func หลายครั้ง"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main():
+    complaints = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir, complaints)
+        model = ComplaintModel(data_dir)
+        results = {}
+        for query in QUERIES:
+            results[query] = {
+                'matches': len(model.search_complaints(query, limit=complaints)),
+                'index_ms': round(median_ms(lambda: model.search_complaints(query)), 2)
+            }
+        # เทียบกับการไล่ค้นหาคำแรกในรายละเอียดทุกรายการ (อ่านจากไฟล์)
+        scan_ms = median_ms(lambda: [
+            c for c in model.complaints if QUERIES[0] in c['complaint_description']
+        ], repeat=1)
+        print(json.dumps({
+            'complaints': complaints,
+            'queries': results,
+            'linear_scan_ms': round(scan_ms, 2)
+        }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
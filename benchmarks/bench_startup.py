@@ -0,0 +1,41 @@
+"""
+เปรียบเทียบเวลาเปิดโปรแกรมแบบ cold (แปลง CSV) กับ warm (โหลด snapshot)
+
+รัน: python3 -m benchmarks.bench_startup [จำนวนการร้องเรียน]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import write_dataset
+from models.complaint_model import ComplaintModel
+
+
+def timed_load(data_dir: str) -> float:
+    """วัดเวลาสร้าง ComplaintModel (วินาที)"""
+    start = time.perf_counter()
+    ComplaintModel(data_dir)
+    return time.perf_counter() - start
+
+
+def main():
+    complaints = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir, complaints)
+        cold = timed_load(data_dir)
+        warm = timed_load(data_dir)
+        print(json.dumps({
+            'complaints': complaints,
+            'cold_seconds': round(cold, 4),
+            'warm_seconds': round(warm, 4),
+            'speedup': round(cold / warm, 2) if warm else None
+        }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+ชุดวัดประสิทธิภาพของ model และ controller ที่ขนาดข้อมูลต่าง ๆ (ไม่ใช้ GUI)
+
+รัน: python3 -m benchmarks.bench_suite --sizes 1000 10000 100000 [--backend csv|sqlite] [--output ผล.json]
+
+แต่ละขนาดรันใน process แยก หน่วยความจำสูงสุดของแต่ละขนาดจึงไม่ปนกัน
+ผลลัพธ์เป็น JSON (เวลาเป็นมิลลิวินาที) เพื่อนำไปเปรียบเทียบระหว่างรอบได้
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Windows ไม่มีโมดูล resource จึงไม่รายงาน max RSS
+    resource = None
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import write_dataset
+from controllers.complaint_controller import ComplaintController
+from models.complaint_model import ComplaintModel
+from models.sqlite_model import SQLiteComplaintModel, migrate_csv_to_sqlite
+
+
+def timed(func, repeat: int = 1):
+    """เรียก func ซ้ำ repeat ครั้ง คืน (สรุปเวลาเป็นมิลลิวินาที, ผลลัพธ์ครั้งสุดท้าย)"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    summary = {
+        'median_ms': round(statistics.median(timings), 3),
+        'min_ms': round(min(timings), 3),
+        'repeat': repeat
+    }
+    return summary, result
+
+
+def open_model(backend: str, data_dir: str):
+    """สร้าง model ของ backend ที่เลือก (สำหรับ csv คือ load_all_data ทั้งหมด)"""
+    if backend == 'sqlite':
+        return SQLiteComplaintModel(os.path.join(data_dir, "complaints.db"))
+    return ComplaintModel(data_dir)
+
+
+def clear_caches(data_dir: str):
+    """ลบ snapshot และไฟล์ดัชนีข้าง ๆ CSV เพื่อให้การโหลดครั้งถัดไปเป็นแบบ cold"""
+    for path in glob.glob(os.path.join(data_dir, "snapshot.json*")) + \
+            glob.glob(os.path.join(data_dir, "*.csv.idx*")):
+        os.remove(path)
+
+
+def max_rss_kb() -> int or None:
+    """หน่วยความจำสูงสุดของ process (KB) ถ้าระบบรองรับ"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS รายงานเป็นไบต์ Linux รายงานเป็น KB
+    return usage // 1024 if sys.platform == 'darwin' else usage
+
+
+def run_size(complaints: int, backend: str, repeat: int, mutations: int, trace_memory: bool):
+    """วัดทุกการทำงานที่ขนาดข้อมูลหนึ่ง คืน dict ของผลลัพธ์"""
+    timings = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        timings['generate'], file_bytes = timed(lambda: write_dataset(data_dir, complaints))
+        if backend == 'sqlite':
+            timings['migrate'], _ = timed(
+                lambda: migrate_csv_to_sqlite(data_dir, os.path.join(data_dir, "complaints.db"))
+            )
+        
+        # ===== Load =====
+        timings['load_all_data_cold'], model = timed(lambda: open_model(backend, data_dir))
+        if backend == 'sqlite':
+            model.close()
+        del model
+        timings['load_all_data_warm'], model = timed(lambda: open_model(backend, data_dir))
+        
+        peak_traced = None
+        if trace_memory:
+            # วัดหน่วยความจำที่จองระหว่างโหลดแบบ cold (ช้ากว่าปกติเพราะ tracemalloc)
+            if backend == 'sqlite':
+                model.close()
+            del model
+            clear_caches(data_dir)
+            tracemalloc.start()
+            model = open_model(backend, data_dir)
+            _, peak_traced = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        controller = ComplaintController(model)
+        
+        # ===== Read Operations =====
+        stall_id = model.get_all_stalls()[0]['stall_id']
+        pending = model.STATUSES[0]
+        reads = {
+            'get_all_complaints': model.get_all_complaints,
+            'get_latest_complaints': lambda: model.get_latest_complaints(100),
+            'get_complaints_by_stall': lambda: model.get_complaints_by_stall(stall_id),
+            'get_complaints_by_status': lambda: model.get_complaints_by_status(pending),
+            'get_complaints_page': lambda: model.get_complaints_page(1000, 100, pending),
+            'get_stall_complaint_summary': model.get_stall_complaint_summary,
+            'get_canteen_summary': model.get_canteen_summary,
+            'search_complaints': lambda: model.search_complaints('แมลง'),
+            'get_trend': lambda: model.get_trend('week', 'canteen'),
+            'controller.get_complaints_page': lambda: controller.get_complaints_page(10, 100, pending),
+            'controller.get_stall_summary': controller.get_stall_summary
+        }
+        for name, func in reads.items():
+            timings[name], _ = timed(func, repeat)
+        
+        # ===== Write Operations (เวลาเฉลี่ยต่อครั้ง) =====
+        complaint_ids = []
+        timings['add_complaint'], _ = timed(
+            lambda: complaint_ids.append(model.add_complaint(stall_id, 'ทดสอบ', 'รายละเอียดทดสอบ')),
+            mutations
+        )
+        answered = iter(complaint_ids)
+        timings['add_response'], _ = timed(
+            lambda: model.add_response(next(answered), 'ตอบกลับทดสอบ'), mutations
+        )
+        timings['controller.create_new_complaint'], _ = timed(
+            lambda: controller.create_new_complaint(stall_id, 'ทดสอบ', 'รายละเอียดทดสอบ'), mutations
+        )
+        timings['save_complaints'], _ = timed(model.save_complaints)
+        timings['save_responses'], _ = timed(model.save_responses)
+        timings['compact'], _ = timed(model.compact)
+        if backend == 'sqlite':
+            model.close()
+    
+    return {
+        'complaints': complaints,
+        'backend': backend,
+        'file_bytes': file_bytes,
+        'timings': timings,
+        'peak_traced_bytes': peak_traced,
+        'max_rss_kb': max_rss_kb()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="วัดประสิทธิภาพของ model และ controller")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[1000, 10000, 100000],
+                        help="จำนวนการร้องเรียนที่จะทดสอบ (10^3 - 10^7)")
+    parser.add_argument("--backend", choices=['csv', 'sqlite'], default='csv')
+    parser.add_argument("--repeat", type=int, default=5, help="จำนวนครั้งที่รันการอ่านแต่ละแบบ")
+    parser.add_argument("--mutations", type=int, default=20, help="จำนวนครั้งที่เพิ่มการร้องเรียน/การตอบกลับ")
+    parser.add_argument("--no-tracemalloc", action='store_true', help="ไม่วัดหน่วยความจำด้วย tracemalloc")
+    parser.add_argument("--output", help="เขียนผลลัพธ์ลงไฟล์ JSON (ค่าเริ่มต้นพิมพ์ออกหน้าจอ)")
+    parser.add_argument("--single", action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.single:
+        # process ลูก: วัดขนาดเดียวแล้วพิมพ์ JSON ให้ process แม่
+        print(json.dumps(run_size(args.sizes[0], args.backend, args.repeat,
+                                  args.mutations, not args.no_tracemalloc)))
+        return
+    
+    runs = []
+    for size in args.sizes:
+        command = [sys.executable, "-m", "benchmarks.bench_suite", "--single",
+                   "--sizes", str(size), "--backend", args.backend,
+                   "--repeat", str(args.repeat), "--mutations", str(args.mutations)]
+        if args.no_tracemalloc:
+            command.append("--no-tracemalloc")
+        output = subprocess.run(
+            command, stdout=subprocess.PIPE, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout
+        runs.append(json.loads(output.decode('utf-8')))
+    
+    report = json.dumps({
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'runs': runs
+    }, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+สร้างข้อมูลจำลองของระบบร้องเรียน (canteens/stalls/complaints/responses.csv)
+
+รัน: python3 -m benchmarks.synthetic <โฟลเดอร์ปลายทาง> --complaints 100000
+
+ร้านยอดนิยมถูกร้องเรียนบ่อยกว่า (น้ำหนักแบบ Zipf) การร้องเรียนหนาแน่นขึ้นในช่วงหลัง
+และการร้องเรียนล่าสุดมีโอกาสยังไม่ได้ตอบกลับมากกว่า ไฟล์ถูกเขียนทีละแถว
+จึงสร้างได้ถึงหลักสิบล้านรายการโดยไม่ต้องเก็บไว้ในหน่วยความจำ
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import time
+from datetime import date, timedelta
+
+
+PROBLEM_TYPES = ['วัตถุดิบไม่สด', 'มีสิ่งแปลกปลอม', 'รสชาติไม่ตรงตามเมนู',
+                 'การปรุงอาหารไม่เพียงพอ', 'ปริมาณไม่เพียงพอ', 'ความสะอาดไม่ดี',
+                 'การให้บริการไม่ดี', 'วัตถุดิบเสีย']
+DESCRIPTIONS = ['อาหารไม่สดใจเลย ดูเหมือนเก่า', 'พบเศษแมลงในอาหาร ทำให้รู้สึกไม่สุขสบาย',
+                'เนื้อสัตว์ยังไม่สุกเพียงพอ ทำให้กังวล', 'ราคาแพงแต่ปริมาณน้อย',
+                'อาหารมีกลิ่นแปลกๆ ทำให้ไม่อยากกิน', 'อาหารเน่า มีกลิ่นฉุน',
+                'อาหารเย็นลงแล้ว ไม่ร้อนเลย', 'รสเค็มมากเกินไป',
+                'สั่ง "ข้าวผัด" แต่ได้ข้าวเปล่า\r\nแจ้งพนักงานแล้วไม่มีการแก้ไข']
+RESPONSES = ['ขอโทษที่เกิดเหตุการณ์ดังกล่าว เราได้ตรวจสอบแล้ว',
+             'ขอบคุณที่แจ้งเรา เราได้ฝึกเพิ่มเติมให้พนักงาน',
+             'เราได้เปลี่ยนผู้ขายวัตถุดิบแล้ว', 'ดำเนินการแล้ว']
+STATUSES = ['รอดำเนินการ', 'ดำเนินการแล้ว']
+
+# จำนวนวันย้อนหลังที่การร้องเรียนล่าสุดมีโอกาสได้รับการตอบกลับเพียงครึ่งหนึ่ง
+RECENT_DAYS = 14
+
+
+def write_dataset(data_dir: str, complaints: int, stalls: int = 50, canteens: int = 5,
+                  response_ratio: float = 0.6, seed: int = 0, days: int = 730):
+    """เขียนไฟล์ CSV ทั้งสี่ไฟล์ลงใน data_dir (การร้องเรียนกระจายใน days วัน)"""
+    rng = random.Random(seed)
+    os.makedirs(data_dir, exist_ok=True)
+    width = max(3, len(str(max(complaints, stalls, canteens))))
+    start = date(2024, 1, 1)
+    
+    with open(os.path.join(data_dir, "canteens.csv"), 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['canteen_id', 'canteen_name', 'location'])
+        for i in range(1, canteens + 1):
+            writer.writerow([f"C{i:03d}", f"โรงอาหาร {i}", f"ชั้น {i % 5 + 1} อาคาร {chr(65 + i % 26)}"])
+    
+    stall_ids = [f"S{i:03d}" for i in range(1, stalls + 1)]
+    with open(os.path.join(data_dir, "stalls.csv"), 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(['stall_id', 'stall_name', 'canteen_id', 'owner_name'])
+        for i, stall_id in enumerate(stall_ids):
+            writer.writerow([stall_id, f"ร้าน {i + 1}", f"C{i % canteens + 1:03d}", f"เจ้าของ {i + 1}"])
+    
+    # ร้องเรียนร้านอันดับต้น ๆ บ่อยกว่า (น้ำหนัก 1 / อันดับ^0.8)
+    stall_weights = list(itertools.accumulate(1 / (rank ** 0.8) for rank in range(1, stalls + 1)))
+    
+    with open(os.path.join(data_dir, "complaints.csv"), 'w', newline='', encoding='utf-8') as complaint_file, \
+            open(os.path.join(data_dir, "responses.csv"), 'w', newline='', encoding='utf-8') as response_file:
+        complaint_writer = csv.writer(complaint_file)
+        response_writer = csv.writer(response_file)
+        complaint_writer.writerow(['complaint_id', 'stall_id', 'complaint_date',
+                                   'problem_type', 'complaint_description', 'status'])
+        response_writer.writerow(['response_id', 'complaint_id', 'response_date', 'response_text'])
+        response_count = 0
+        for i in range(1, complaints + 1):
+            complaint_id = f"C{i:0{width}d}"
+            # จำนวนการร้องเรียนเพิ่มขึ้นตามเวลา (กระจายแบบสามเหลี่ยมเอียงไปทางวันล่าสุด)
+            offset = int(rng.triangular(0, days, days))
+            complaint_date = start + timedelta(days=offset)
+            ratio = response_ratio if days - offset > RECENT_DAYS else response_ratio / 2
+            answered = rng.random() < ratio
+            complaint_writer.writerow([
+                complaint_id,
+                rng.choices(stall_ids, cum_weights=stall_weights)[0],
+                complaint_date.isoformat(),
+                rng.choice(PROBLEM_TYPES),
+                rng.choice(DESCRIPTIONS),
+                STATUSES[1] if answered else STATUSES[0]
+            ])
+            if answered:
+                response_count += 1
+                response_writer.writerow([
+                    f"R{response_count:0{width}d}",
+                    complaint_id,
+                    (complaint_date + timedelta(days=rng.randint(0, 7))).isoformat(),
+                    rng.choice(RESPONSES)
+                ])
+    
+    return {
+        name: os.path.getsize(os.path.join(data_dir, name))
+        for name in ("canteens.csv", "stalls.csv", "complaints.csv", "responses.csv")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="สร้างไฟล์ CSV จำลองของระบบร้องเรียน")
+    parser.add_argument("data_dir", help="โฟลเดอร์ปลายทาง")
+    parser.add_argument("--complaints", type=int, default=100000, help="จำนวนการร้องเรียน (10^3 - 10^7)")
+    parser.add_argument("--stalls", type=int, default=50, help="จำนวนร้านอาหาร")
+    parser.add_argument("--canteens", type=int, default=5, help="จำนวนโรงอาหาร")
+    parser.add_argument("--response-ratio", type=float, default=0.6, help="สัดส่วนการร้องเรียนที่ได้รับการตอบกลับ")
+    parser.add_argument("--days", type=int, default=730, help="จำนวนวันที่การร้องเรียนกระจายอยู่")
+    parser.add_argument("--seed", type=int, default=0, help="seed ของตัวสุ่ม")
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    sizes = write_dataset(args.data_dir, args.complaints, args.stalls, args.canteens,
+                          args.response_ratio, args.seed, args.days)
+    print(json.dumps({
+        'data_dir': args.data_dir,
+        'complaints': args.complaints,
+        'file_bytes': sizes,
+        'seconds': round(time.perf_counter() - started, 2)
+    }, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
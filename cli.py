@@ -0,0 +1,294 @@
+"""
+ระบบติดตามการร้องเรียนคุณภาพอาหาร
+Entry Point แบบ command line สำหรับงานอัตโนมัติ (ไม่ต้องใช้ tkinter)
+
+รัน: python3 cli.py import แบบฟอร์ม.csv [--format csv|jsonl] [--batch-size 5000]
+     python3 cli.py export [complaints|responses] [--output ไฟล์] [--format csv|jsonl]
+                           [--status สถานะ] [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+     python3 cli.py report summary [--by stall|canteen] [--format table|csv|jsonl]
+     python3 cli.py report trend [--granularity day|week|month] [--dimension all|stall|canteen]
+     python3 cli.py report top [--by stall|canteen] [--metric total|pending|recent] [--limit 10] [--days 30]
+     python3 cli.py canteen-reports --output-dir โฟลเดอร์ [--month YYYY-MM | --from ... --to ...]
+                                    [--format html csv] [--workers N]
+
+ไฟล์นำเข้าใช้คอลัมน์เดียวกับ complaints.csv (ไม่ต้องมี complaint_id) อ่านและเขียนทีละแถว
+ผ่าน generator หน่วยความจำจึงไม่เพิ่มตามขนาดไฟล์ ไม่ระบุ --output จะเขียนออก stdout
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterable, Iterator
+
+# เพิ่ม path สำหรับ import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.factory import create_model
+from models.complaint_import import ImportValidationError, prepare_complaint_rows
+from models.ranking import RANKING_METRICS
+from models.time_index import next_bucket
+from reports.canteen_report import REPORT_FORMATS
+from models.records import ComplaintRecord, ResponseRecord
+from controllers.complaint_controller import ComplaintController
+
+
+FORMATS = ('csv', 'jsonl')
+
+# คอลัมน์ของแต่ละชนิดข้อมูลที่ export (ตรงกับไฟล์ CSV ในโฟลเดอร์ข้อมูล)
+EXPORT_FIELDS = {
+    'complaints': ComplaintRecord.FIELDS,
+    'responses': ResponseRecord.FIELDS
+}
+
+
+def detect_format(path: str, fmt: str = None) -> str:
+    """รูปแบบไฟล์จาก --format หรือนามสกุล (.jsonl/.json = jsonl นอกนั้น csv)"""
+    if fmt:
+        return fmt
+    return 'jsonl' if path.lower().endswith(('.jsonl', '.json')) else 'csv'
+
+
+def read_rows(path: str, fmt: str) -> Iterator[Dict[str, Any]]:
+    """อ่านแถวจากไฟล์ CSV (มี header) หรือ JSONL ทีละแถว"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as file:
+        if fmt == 'csv':
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def batched(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    """แบ่งแถวเป็นชุดละ size แถว"""
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def open_output(path: str = None):
+    """เปิดไฟล์ผลลัพธ์ (ไม่ระบุหรือ "-" = stdout)"""
+    if not path or path == '-':
+        yield sys.stdout
+        return
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        yield file
+
+
+def write_records(records: Iterable[Dict[str, Any]], fields, out, fmt: str) -> int:
+    """เขียนรายการทีละแถวเป็น CSV หรือ JSONL คืนจำนวนแถว"""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(fields)
+        for record in records:
+            writer.writerow([record[field] for field in fields])
+            count += 1
+    else:
+        for record in records:
+            out.write(json.dumps({field: record[field] for field in fields}, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+# ===== Commands =====
+
+def run_import(controller: ComplaintController, args) -> int:
+    """ตรวจทั้งไฟล์ก่อน แล้วนำเข้าทีละชุด (มีแถวผิดจะไม่นำเข้าเลย)"""
+    fmt = detect_format(args.file, args.format)
+    model = controller.model
+    stall_ids = {stall['stall_id'] for stall in controller.get_all_stalls()}
+    today = datetime.now().strftime('%Y-%m-%d')
+    
+    # รอบแรก: ตรวจทุกแถวโดยไม่เก็บไว้ เลขแถวนับต่อกันทั้งไฟล์
+    errors = []
+    total = 0
+    for batch in batched(read_rows(args.file, fmt), args.batch_size):
+        try:
+            prepare_complaint_rows(batch, stall_ids, model.STATUSES, today)
+        except ImportValidationError as e:
+            errors.extend((total + row, message) for row, message in e.errors)
+        total += len(batch)
+    if errors:
+        raise ImportValidationError(errors)
+    
+    # รอบสอง: นำเข้าทีละชุด แต่ละชุดจองเลข ID ต่อเนื่องกันครั้งเดียว
+    first_id = last_id = None
+    for batch in batched(read_rows(args.file, fmt), args.batch_size):
+        complaint_ids = controller.import_complaints(batch)
+        if complaint_ids:
+            first_id = first_id or complaint_ids[0]
+            last_id = complaint_ids[-1]
+    model.compact()
+    if total:
+        print(f"นำเข้า {total} รายการ ({first_id} - {last_id})")
+    else:
+        print("ไม่มีรายการให้นำเข้า")
+    return 0
+
+
+def run_export(controller: ComplaintController, args) -> int:
+    """เขียนการร้องเรียนหรือการตอบกลับออกทีละแถว"""
+    fmt = detect_format(args.output or '', args.format)
+    if args.kind == 'complaints':
+        records = controller.iter_complaints(args.status, args.start, args.end)
+    else:
+        records = controller.iter_responses()
+    with open_output(args.output) as out:
+        count = write_records(records, EXPORT_FIELDS[args.kind], out, fmt)
+    print(f"ส่งออก {count} รายการ", file=sys.stderr)
+    return 0
+
+
+def summary_rows(controller: ComplaintController, by: str) -> Iterator[Dict[str, Any]]:
+    """สรุปจำนวนการร้องเรียนของแต่ละร้าน/โรงอาหาร แยกคอลัมน์ตามสถานะ"""
+    if by == 'stall':
+        summaries = controller.get_stall_summary()
+        id_field, name_field = 'stall_id', 'stall_name'
+    else:
+        summaries = controller.get_canteen_summary()
+        id_field, name_field = 'canteen_id', 'canteen_name'
+    for summary in summaries:
+        row = {'id': summary[id_field], 'name': summary[name_field], 'total': summary['complaint_count']}
+        row.update(summary['status_count'])
+        yield row
+
+
+def trend_rows(controller: ComplaintController, args) -> Iterator[Dict[str, Any]]:
+    """จำนวนการร้องเรียนต่อช่วงเวลาแบบหนึ่งแถวต่อ (ช่วงเวลา, key)"""
+    trend = controller.get_trend(args.granularity, args.dimension, args.start, args.end, args.status)
+    for bucket in trend:
+        for key, count in sorted(bucket['counts'].items()):
+            yield {'bucket': bucket['bucket'], 'key': key, 'count': count}
+
+
+def top_rows(controller: ComplaintController, args) -> Iterator[Dict[str, Any]]:
+    """ร้าน/โรงอาหารที่มีการร้องเรียนมากที่สุดตามเกณฑ์ที่เลือก"""
+    top = controller.get_top_offenders(args.by, args.metric, args.limit, args.days, args.end)
+    for entry in top:
+        yield {
+            'rank': entry['rank'],
+            'id': entry[f'{args.by}_id'],
+            'name': entry[f'{args.by}_name'],
+            'count': entry['count']
+        }
+
+
+def write_table(rows: List[Dict[str, Any]], fields: List[str], out):
+    """เขียนตารางข้อความที่จัดความกว้างคอลัมน์ (รายงานมีขนาดเล็ก จึงเก็บทั้งหมดได้)"""
+    widths = [max([len(str(field))] + [len(str(row.get(field, ''))) for row in rows]) for field in fields]
+    for values in [fields] + [[row.get(field, '') for field in fields] for row in rows]:
+        out.write('  '.join(str(value).ljust(width) for value, width in zip(values, widths)).rstrip() + '\n')
+
+
+def run_report(controller: ComplaintController, args) -> int:
+    """พิมพ์รายงานสรุปหรือแนวโน้ม"""
+    if args.report == 'summary':
+        rows = summary_rows(controller, args.by)
+        fields = ['id', 'name', 'total'] + list(controller.model.STATUSES)
+    elif args.report == 'top':
+        rows = top_rows(controller, args)
+        fields = ['rank', 'id', 'name', 'count']
+    else:
+        rows = trend_rows(controller, args)
+        fields = ['bucket', 'key', 'count']
+    with open_output(args.output) as out:
+        if args.format == 'table':
+            write_table(list(rows), fields, out)
+        else:
+            write_records(rows, fields, out, args.format)
+    return 0
+
+
+def run_canteen_reports(controller: ComplaintController, args) -> int:
+    """สร้างรายงานของทุกโรงอาหาร (--month ใช้แทน --from/--to ได้)"""
+    start, end = args.start, args.end
+    if args.month:
+        first = datetime.strptime(args.month, '%Y-%m').date()
+        start = first.isoformat()
+        end = (next_bucket(first, 'month') - timedelta(days=1)).isoformat()
+    entries = controller.generate_canteen_reports(args.output_dir, start, end, args.format, args.workers)
+    total = sum(entry['complaint_count'] for entry in entries)
+    print(f"สร้างรายงาน {len(entries)} โรงอาหาร ({total} รายการ) ที่ "
+          f"{os.path.join(args.output_dir, 'index.html')}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="จัดการข้อมูลระบบร้องเรียนแบบไม่ใช้หน้าจอ GUI")
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+    
+    importer = commands.add_parser('import', help="นำเข้าการร้องเรียนจากไฟล์ CSV หรือ JSONL")
+    importer.add_argument('file')
+    importer.add_argument('--format', choices=FORMATS, help="ไม่ระบุ = ดูจากนามสกุลไฟล์")
+    importer.add_argument('--batch-size', type=int, default=5000, help="จำนวนแถวที่นำเข้าต่อครั้ง")
+    importer.set_defaults(handler=run_import)
+    
+    exporter = commands.add_parser('export', help="ส่งออกการร้องเรียนหรือการตอบกลับ")
+    exporter.add_argument('kind', nargs='?', choices=sorted(EXPORT_FIELDS), default='complaints')
+    exporter.add_argument('--output', '-o', help="ไฟล์ผลลัพธ์ (ไม่ระบุ = stdout)")
+    exporter.add_argument('--format', choices=FORMATS, help="ไม่ระบุ = ดูจากนามสกุลไฟล์")
+    exporter.add_argument('--status', help="เฉพาะสถานะนี้ (การร้องเรียนเท่านั้น)")
+    exporter.add_argument('--from', dest='start', help="ตั้งแต่วันที่ YYYY-MM-DD")
+    exporter.add_argument('--to', dest='end', help="ถึงวันที่ YYYY-MM-DD")
+    exporter.set_defaults(handler=run_export)
+    
+    reporter = commands.add_parser('report', help="รายงานสรุปหรือแนวโน้มการร้องเรียน")
+    reporter.add_argument('report', nargs='?', choices=('summary', 'trend', 'top'), default='summary')
+    reporter.add_argument('--by', choices=('stall', 'canteen'), default='canteen', help="สรุปตามร้านหรือโรงอาหาร")
+    reporter.add_argument('--metric', choices=RANKING_METRICS, default='total',
+                          help="เกณฑ์จัดอันดับ (top เท่านั้น) recent = จำนวนใน --days วันล่าสุด")
+    reporter.add_argument('--limit', type=int, default=10, help="จำนวนอันดับ (top เท่านั้น)")
+    reporter.add_argument('--days', type=int, default=30, help="จำนวนวันของเกณฑ์ recent")
+    reporter.add_argument('--granularity', choices=('day', 'week', 'month'), default='month')
+    reporter.add_argument('--dimension', choices=('all', 'stall', 'canteen'), default='all')
+    reporter.add_argument('--status', help="เฉพาะสถานะนี้ (แนวโน้มเท่านั้น)")
+    reporter.add_argument('--from', dest='start', help="ตั้งแต่วันที่ YYYY-MM-DD")
+    reporter.add_argument('--to', dest='end', help="ถึงวันที่ YYYY-MM-DD")
+    reporter.add_argument('--output', '-o', help="ไฟล์ผลลัพธ์ (ไม่ระบุ = stdout)")
+    reporter.add_argument('--format', choices=('table',) + FORMATS, default='table')
+    reporter.set_defaults(handler=run_report)
+    
+    canteen_reports = commands.add_parser('canteen-reports', help="สร้างรายงาน HTML/CSV ของทุกโรงอาหาร")
+    canteen_reports.add_argument('--output-dir', '-o', required=True, help="โฟลเดอร์ที่เขียนรายงาน")
+    canteen_reports.add_argument('--month', help="เดือน YYYY-MM (แทน --from/--to)")
+    canteen_reports.add_argument('--from', dest='start', help="ตั้งแต่วันที่ YYYY-MM-DD")
+    canteen_reports.add_argument('--to', dest='end', help="ถึงวันที่ YYYY-MM-DD")
+    canteen_reports.add_argument('--format', nargs='+', choices=REPORT_FORMATS, default=list(REPORT_FORMATS))
+    canteen_reports.add_argument('--workers', type=int, help="จำนวน process (ไม่ระบุ = จำนวน CPU)")
+    canteen_reports.set_defaults(handler=run_canteen_reports)
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    """รันคำสั่งหนึ่งคำสั่ง คืน exit code (1 เมื่อข้อมูลไม่ถูกต้อง)"""
+    args = build_parser().parse_args(argv)
+    model = create_model()
+    controller = ComplaintController(model)
+    try:
+        return args.handler(controller, args)
+    except BrokenPipeError:
+        # โปรแกรมปลายทาง (เช่น head) ปิดไปก่อน ไม่ถือเป็นข้อผิดพลาด
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (ValueError, OSError) as e:
+        print(f"ผิดพลาด: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if hasattr(model, 'close'):
+            model.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
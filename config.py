@@ -0,0 +1,28 @@
+"""
+การตั้งค่าของแอปพลิเคชัน
+ค่าเริ่มต้นสามารถเปลี่ยนได้ด้วย environment variable
+"""
+
+import os
+
+# ตำแหน่งโฟลเดอร์ข้อมูล
+DATA_DIR = os.environ.get("COMPLAINT_DATA_DIR", "data")
+
+# ระบบจัดเก็บข้อมูล: "csv" หรือ "sqlite"
+STORAGE_BACKEND = os.environ.get("COMPLAINT_STORAGE", "csv")
+
+# ตำแหน่งไฟล์ฐานข้อมูลเมื่อใช้ SQLite
+SQLITE_PATH = os.environ.get("COMPLAINT_SQLITE_PATH", os.path.join(DATA_DIR, "complaints.db"))
+
+# จำนวน process ที่ใช้อ่าน complaints.csv ตอนเปิดโปรแกรม (0 = ใช้ทุก CPU เมื่อไฟล์ใหญ่ 1 = ไม่อ่านแบบขนาน)
+LOAD_WORKERS = int(os.environ.get("COMPLAINT_LOAD_WORKERS", "0"))
+
+# วัดเวลาการทำงานของ model, controller และ view (ตั้งเป็น "1" เพื่อเปิดใช้)
+INSTRUMENTATION = os.environ.get("COMPLAINT_INSTRUMENT", "") == "1"
+
+# ไฟล์ JSON ที่จะเขียนสถิติการวัดเมื่อปิดโปรแกรม (เว้นว่างเพื่อไม่เขียน)
+INSTRUMENTATION_DUMP = os.environ.get("COMPLAINT_INSTRUMENT_DUMP")
+
+# ที่อยู่ของ HTTP API (server.py)
+SERVER_HOST = os.environ.get("COMPLAINT_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("COMPLAINT_SERVER_PORT", "8080"))
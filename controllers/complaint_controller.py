@@ -1,16 +1,25 @@
+from controllers.query_cache import QueryCache
 from models.complaint_model import ComplaintModel
-from typing import List, Dict, Any, Callable
+from reports.canteen_report import REPORT_FORMATS, generate_canteen_reports
+from datetime import datetime
+from typing import List, Dict, Any, Callable, Iterator
 
 
 class ComplaintController:
     """Controller สำหรับจัดการ business logic ของระบบร้องเรียน"""
     
+    # จำนวนผลการอ่านที่เก็บไว้ใน cache (รายการที่ใช้ล่าสุดน้อยที่สุดถูกลบก่อน)
+    CACHE_SIZE = 64
+    
     def __init__(self, model: ComplaintModel):
         self.model = model
+        # ผลการอ่านที่ใช้ซ้ำได้จนกว่า model จะเปลี่ยน (generation เพิ่ม)
+        self.cache = QueryCache(self.CACHE_SIZE)
         self.callbacks: Dict[str, List[Callable]] = {
             'complaints_updated': [],
             'complaint_detail_updated': [],
-            'responses_updated': []
+            'responses_updated': [],
+            'persistence_error': []
         }
     
     def register_callback(self, event: str, callback: Callable):
@@ -18,10 +27,60 @@ class ComplaintController:
         if event in self.callbacks:
             self.callbacks[event].append(callback)
     
-    def notify_observers(self, event: str):
-        """แจ้ง observer ทั้งหมดสำหรับ event"""
+    def notify_observers(self, event: str, change: Dict[str, Any] = None):
+        """แจ้ง observer ทั้งหมดสำหรับ event พร้อมรายละเอียดการเปลี่ยนแปลง"""
         for callback in self.callbacks.get(event, []):
-            callback()
+            callback(change or {})
+    
+    def _complaint_change(self, action: str, complaint_ids: List[str]) -> Dict[str, Any]:
+        """สร้าง payload ว่าการร้องเรียน ร้าน และโรงอาหารใดเปลี่ยนแปลง
+
+        action: 'added' (เพิ่มใหม่) หรือ 'updated' (แก้ไขข้อมูลเดิม เช่นสถานะ)
+        """
+        # dict ใช้เป็นเซตที่คงลำดับ เพราะการนำเข้าอาจมีหลายหมื่นรายการ
+        stall_ids = {}
+        canteen_ids = {}
+        for complaint_id in complaint_ids:
+            complaint = self.model.get_complaint_by_id(complaint_id)
+            if not complaint or complaint['stall_id'] in stall_ids:
+                continue
+            stall_ids[complaint['stall_id']] = None
+            stall = self.model.get_stall_by_id(complaint['stall_id'])
+            if stall:
+                canteen_ids[stall['canteen_id']] = None
+        return {
+            'action': action,
+            'complaint_ids': list(complaint_ids),
+            'stall_ids': list(stall_ids),
+            'canteen_ids': list(canteen_ids)
+        }
+    
+    def _cached(self, name: str, compute: Callable, *args) -> Any:
+        """อ่านผลของ compute(*args) จาก cache ถ้า model ยังไม่เปลี่ยนตั้งแต่คำนวณครั้งก่อน"""
+        return self.cache.get(self.model.generation, (name,) + args, compute, *args)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """สถิติ hit/miss ของ cache ผลการอ่าน"""
+        return self.cache.stats()
+    
+    def poll_persistence(self):
+        """ตรวจผลการเขียนไฟล์เบื้องหลัง และแจ้ง observer เมื่อเกิดข้อผิดพลาด"""
+        for error in self.model.poll_writer():
+            self.notify_observers('persistence_error', {'error': str(error)})
+    
+    def poll_external_changes(self):
+        """รวมการเปลี่ยนแปลงจาก instance อื่นที่ใช้ข้อมูลชุดเดียวกัน แล้วแจ้ง observer เฉพาะรายการที่เปลี่ยน"""
+        changes = self.model.check_external_changes()
+        if changes['responses_added']:
+            self.notify_observers('responses_updated', {
+                'action': 'added',
+                'complaint_ids': changes['complaints_updated'],
+                'response_ids': changes['responses_added']
+            })
+        if changes['complaints_added']:
+            self.notify_observers('complaints_updated', self._complaint_change('added', changes['complaints_added']))
+        if changes['complaints_updated']:
+            self.notify_observers('complaints_updated', self._complaint_change('updated', changes['complaints_updated']))
     
     # ===== Canteen Operations =====
     def get_all_canteens(self) -> List[Dict[str, Any]]:
@@ -30,7 +89,16 @@ class ComplaintController:
     
     def get_canteen_summary(self) -> List[Dict[str, Any]]:
         """ดึงข้อมูลโรงอาหารพร้อมจำนวนการร้องเรียน"""
-        return self.model.get_canteen_summary()
+        return self._cached('canteen_summary', self.model.get_canteen_summary)
+    
+    def get_canteen_summary_by_id(self, canteen_id: str) -> Dict[str, Any]:
+        """ดึงจำนวนการร้องเรียนของโรงอาหารหนึ่ง"""
+        return self.model.get_canteen_summary_by_id(canteen_id)
+    
+    def get_canteen_name(self, canteen_id: str) -> str:
+        """ดึงชื่อโรงอาหารจาก ID"""
+        canteen = self.model.get_canteen_by_id(canteen_id)
+        return canteen['canteen_name'] if canteen else 'ไม่พบโรงอาหาร'
     
     # ===== Stall Operations =====
     def get_all_stalls(self) -> List[Dict[str, Any]]:
@@ -43,7 +111,18 @@ class ComplaintController:
     
     def get_stall_summary(self) -> List[Dict[str, Any]]:
         """ดึงข้อมูลร้านอาหารพร้อมจำนวนการร้องเรียน"""
-        return self.model.get_stall_complaint_summary()
+        return self._cached('stall_summary', self.model.get_stall_complaint_summary)
+    
+    def get_stall_summary_by_id(self, stall_id: str) -> Dict[str, Any]:
+        """ดึงจำนวนการร้องเรียนของร้านหนึ่ง"""
+        return self.model.get_stall_summary_by_id(stall_id)
+    
+    def get_top_offenders(self, dimension: str = 'stall', metric: str = 'total', limit: int = 10,
+                          days: int = 30, end: str = None) -> List[Dict[str, Any]]:
+        """ร้าน/โรงอาหารที่มีการร้องเรียนมากที่สุด limit อันดับ (ดู ComplaintModel.get_top_offenders)"""
+        # ระบุวันสิ้นสุดของช่วงเสมอ เพื่อไม่ให้ผลที่ cache ไว้ข้ามวันโดยไม่มีการเปลี่ยนแปลง
+        end = end or datetime.now().strftime('%Y-%m-%d')
+        return self._cached('top_offenders', self.model.get_top_offenders, dimension, metric, limit, days, end)
     
     def get_stall_name(self, stall_id: str) -> str:
         """ดึงชื่อร้านจาก ID"""
@@ -52,15 +131,90 @@ class ComplaintController:
     # ===== Complaint List Operations =====
     def get_all_complaints_sorted(self) -> List[Dict[str, Any]]:
         """ดึงข้อมูลการร้องเรียนทั้งหมดเรียงตามวันที่ล่าสุด"""
-        return self.model.get_all_complaints()
+        return self._cached('all_complaints', self.model.get_all_complaints)
+    
+    def get_latest_complaints(self, limit: int) -> List[Dict[str, Any]]:
+        """ดึงการร้องเรียนล่าสุดตามจำนวนที่กำหนด"""
+        return self._cached('latest_complaints', self.model.get_latest_complaints, limit)
     
     def get_complaints_by_stall(self, stall_id: str) -> List[Dict[str, Any]]:
         """ดึงการร้องเรียนของร้านหนึ่ง"""
-        return self.model.get_complaints_by_stall(stall_id)
+        return self._cached('complaints_by_stall', self.model.get_complaints_by_stall, stall_id)
     
     def get_complaints_by_status(self, status: str) -> List[Dict[str, Any]]:
         """ดึงการร้องเรียนตามสถานะ"""
-        return self.model.get_complaints_by_status(status)
+        return self._cached('complaints_by_status', self.model.get_complaints_by_status, status)
+    
+    def count_complaints(self, status: str = None) -> int:
+        """นับจำนวนการร้องเรียนทั้งหมด หรือเฉพาะสถานะ"""
+        return self._cached('count_complaints', self.model.count_complaints, status)
+    
+    def get_complaints_page(self, page: int, page_size: int, status: str = None) -> Dict[str, Any]:
+        """ดึงการร้องเรียนทีละหน้าพร้อมจำนวนทั้งหมด (page เริ่มที่ 0)"""
+        return self._cached('complaints_page', self._complaints_page, page, page_size, status)
+    
+    def _complaints_page(self, page: int, page_size: int, status: str = None) -> Dict[str, Any]:
+        total = self.model.count_complaints(status)
+        page_count = max((total + page_size - 1) // page_size, 1)
+        page = min(max(page, 0), page_count - 1)
+        return {
+            'complaints': self.model.get_complaints_page(page * page_size, page_size, status),
+            'total': total,
+            'page': page,
+            'page_count': page_count
+        }
+    
+    def query_complaints(self, page: int, page_size: int, sort: str = 'newest', status: str = None,
+                         canteen_id: str = None, stall_id: str = None, problem_type: str = None,
+                         start: str = None, end: str = None) -> Dict[str, Any]:
+        """ดึงการร้องเรียนหนึ่งหน้าที่ตรงทุกเงื่อนไข (None = ไม่กรอง) ผลเหมือน get_complaints_page"""
+        return self._cached('query_complaints', self._query_page, page, page_size, sort,
+                            status, canteen_id, stall_id, problem_type, start, end)
+    
+    def _query_page(self, page: int, page_size: int, sort: str, *filters) -> Dict[str, Any]:
+        status, canteen_id, stall_id, problem_type, start, end = filters
+        
+        def fetch(page: int) -> Dict[str, Any]:
+            return self.model.query_complaints(status, canteen_id, stall_id, problem_type, start, end,
+                                               sort, page * page_size, page_size)
+        
+        result = fetch(max(page, 0))
+        page_count = max((result['total'] + page_size - 1) // page_size, 1)
+        if page < 0 or page >= page_count:
+            page = min(max(page, 0), page_count - 1)
+            result = fetch(page)
+        return {
+            'complaints': result['complaints'],
+            'total': result['total'],
+            'page': page,
+            'page_count': page_count
+        }
+    
+    def get_problem_types(self) -> List[str]:
+        """ประเภทปัญหาทั้งหมดที่มีการร้องเรียน"""
+        return self._cached('problem_types', self.model.get_problem_types)
+    
+    def iter_complaints(self, status: str = None, start: str = None, end: str = None) -> Iterator[Dict[str, Any]]:
+        """วนการร้องเรียนเรียงตามวันที่ล่าสุดทีละรายการ (สำหรับ export ข้อมูลจำนวนมาก)"""
+        return self.model.iter_complaints(status, start, end)
+    
+    def iter_responses(self) -> Iterator[Dict[str, Any]]:
+        """วนการตอบกลับทั้งหมดทีละรายการ"""
+        return self.model.iter_responses()
+    
+    def search_complaints(self, query: str, limit: int, status: str = None) -> List[Dict[str, Any]]:
+        """ค้นหาการร้องเรียนด้วยคำค้น เรียงตามความเกี่ยวข้อง"""
+        return self._cached('search_complaints', self.model.search_complaints, query, limit, status)
+    
+    # ===== Trend Operations =====
+    def get_complaints_between(self, start: str, end: str, status: str = None) -> List[Dict[str, Any]]:
+        """ดึงการร้องเรียนในช่วงวันที่ (YYYY-MM-DD รวมทั้งสองวัน) เรียงตามวันที่ล่าสุด"""
+        return self._cached('complaints_between', self.model.get_complaints_between, start, end, status)
+    
+    def get_trend(self, granularity: str, dimension: str = 'all', start: str = None,
+                  end: str = None, status: str = None) -> List[Dict[str, Any]]:
+        """ดึงจำนวนการร้องเรียนต่อวัน/สัปดาห์/เดือน แยกตามร้าน โรงอาหาร หรือรวมทั้งหมด"""
+        return self._cached('trend', self.model.get_trend, granularity, dimension, start, end, status)
     
     # ===== Complaint Detail Operations =====
     def get_complaint_detail(self, complaint_id: str) -> Dict[str, Any]:
@@ -75,13 +229,33 @@ class ComplaintController:
     def submit_response(self, complaint_id: str, response_text: str) -> str:
         """ส่งการตอบกลับให้การร้องเรียน"""
         response_id = self.model.add_response(complaint_id, response_text)
-        self.notify_observers('responses_updated')
-        self.notify_observers('complaints_updated')
+        self.notify_observers('responses_updated', {
+            'action': 'added',
+            'complaint_ids': [complaint_id],
+            'response_ids': [response_id]
+        })
+        self.notify_observers('complaints_updated', self._complaint_change('updated', [complaint_id]))
         return response_id
     
     # ===== Complaint Creation Operations =====
     def create_new_complaint(self, stall_id: str, problem_type: str, description: str) -> str:
         """เพิ่มการร้องเรียนใหม่"""
         complaint_id = self.model.add_complaint(stall_id, problem_type, description)
-        self.notify_observers('complaints_updated')
+        self.notify_observers('complaints_updated', self._complaint_change('added', [complaint_id]))
         return complaint_id
+    
+    def import_complaints(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """นำเข้าการร้องเรียนหลายรายการในครั้งเดียว แล้วแจ้ง observer ครั้งเดียว
+        
+        โยน ImportValidationError (ValueError) พร้อมแถวที่ผิดถ้าข้อมูลไม่ถูกต้อง
+        """
+        complaint_ids = self.model.add_complaints(rows)
+        if complaint_ids:
+            self.notify_observers('complaints_updated', self._complaint_change('added', complaint_ids))
+        return complaint_ids
+    
+    # ===== Report Operations =====
+    def generate_canteen_reports(self, output_dir: str, start: str = None, end: str = None,
+                                 formats=REPORT_FORMATS, workers: int = None) -> List[Dict[str, Any]]:
+        """สร้างรายงาน HTML/CSV ของทุกโรงอาหารพร้อม index.html ใน output_dir (ดู reports.canteen_report)"""
+        return generate_canteen_reports(self.model, output_dir, start, end, formats, workers)
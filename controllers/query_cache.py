@@ -0,0 +1,70 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Hashable
+
+
+class QueryCache:
+    """LRU cache ของผลการอ่านข้อมูล ผูกกับ generation ของ model
+    
+    ผลที่เก็บไว้ใช้ได้เฉพาะ generation เดียวกับตอนคำนวณ เมื่อ model มีการเปลี่ยนแปลง
+    (generation เปลี่ยน) ทุกรายการถูกล้างในการเรียกครั้งถัดไป ผลที่คืนถูกใช้ร่วมกัน
+    ระหว่างผู้เรียก จึงต้องไม่แก้ไขผลที่ได้รับ
+    
+    เรียกจากหลาย thread พร้อมกันได้ (compute ทำนอก lock จึงอาจถูกคำนวณซ้ำพร้อมกัน)
+    """
+    
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.generation = None
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+    
+    def get(self, generation: Hashable, key: Hashable, compute: Callable, *args) -> Any:
+        """คืนผลของ key จาก cache หรือเรียก compute(*args) แล้วเก็บไว้"""
+        with self._lock:
+            if generation != self.generation:
+                if self._entries:
+                    self.invalidations += 1
+                    self._entries.clear()
+                self.generation = generation
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+        value = compute(*args)
+        with self._lock:
+            if generation != self.generation:
+                # model เปลี่ยนระหว่างคำนวณ ผลนี้จึงไม่เก็บไว้
+                return value
+            self._entries[key] = value
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+    
+    def clear(self):
+        """ล้างผลที่เก็บไว้ทั้งหมด"""
+        with self._lock:
+            self._entries.clear()
+    
+    def reset_stats(self):
+        """ล้างตัวนับสถิติ (ไม่ล้างผลที่เก็บไว้)"""
+        self.hits = self.misses = self.invalidations = self.evictions = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """สถิติการใช้งาน cache"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'invalidations': self.invalidations,
+            'evictions': self.evictions
+        }
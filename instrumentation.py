@@ -0,0 +1,123 @@
+"""
+การวัดเวลาการทำงานของ model, controller และ view (เปิดใช้เมื่อต้องการเท่านั้น)
+
+เมื่อเปิดใช้ method ของคลาสที่เลือกจะถูกห่อด้วยตัวจับเวลา ซึ่งบันทึกจำนวนครั้ง
+เวลารวม และตัวอย่างเวลาล่าสุดสำหรับคำนวณ percentile ถ้าไม่เปิดใช้จะไม่มีการห่อ
+method ใด ๆ จึงไม่มีค่าใช้จ่ายเพิ่ม
+"""
+
+import functools
+import json
+import threading
+import time
+import types
+from collections import deque
+from typing import Dict, Any, Callable
+
+
+class OperationStats:
+    """สถิติของการทำงานหนึ่ง (เก็บตัวอย่างเวลาล่าสุดไม่เกิน sample_size ค่า)"""
+    
+    __slots__ = ('count', 'total', 'max', 'samples')
+    
+    def __init__(self, sample_size: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=sample_size)
+    
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+    
+    @staticmethod
+    def _percentile(ordered, fraction: float) -> float:
+        """percentile แบบ nearest-rank ของรายการที่เรียงแล้ว"""
+        index = min(int(fraction * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+    
+    def summary(self) -> Dict[str, Any]:
+        """สรุปเป็นมิลลิวินาที"""
+        ordered = sorted(self.samples)
+        return {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'mean_ms': round(self.total * 1000 / self.count, 3),
+            'p50_ms': round(self._percentile(ordered, 0.50) * 1000, 3),
+            'p90_ms': round(self._percentile(ordered, 0.90) * 1000, 3),
+            'p99_ms': round(self._percentile(ordered, 0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3)
+        }
+
+
+class Metrics:
+    """ตัวเก็บสถิติของทุกการทำงานที่ถูกวัด (ใช้ได้จากหลาย thread)"""
+    
+    # จำนวนตัวอย่างเวลาล่าสุดต่อการทำงานที่ใช้คำนวณ percentile
+    SAMPLE_SIZE = 2048
+    
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._stats: Dict[str, OperationStats] = {}
+    
+    def record(self, name: str, seconds: float):
+        """บันทึกเวลาที่ใช้ของการทำงานหนึ่งครั้ง"""
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = OperationStats(self.SAMPLE_SIZE)
+            stats.add(seconds)
+    
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """สรุปสถิติของทุกการทำงาน เรียงตามเวลารวมมากไปน้อย"""
+        with self._lock:
+            summaries = {name: stats.summary() for name, stats in self._stats.items()}
+        return dict(sorted(summaries.items(), key=lambda item: -item[1]['total_ms']))
+    
+    def reset(self):
+        """ล้างสถิติทั้งหมด"""
+        with self._lock:
+            self._stats.clear()
+    
+    def dump(self, path: str):
+        """เขียนสถิติเป็นไฟล์ JSON"""
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'operations': self.snapshot()
+            }, file, ensure_ascii=False, indent=2)
+    
+    def timed(self, name: str, func: Callable) -> Callable:
+        """ห่อ func ให้บันทึกเวลาที่ใช้ทุกครั้งที่ถูกเรียก"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - start)
+        wrapper.__instrumented__ = True
+        return wrapper
+    
+    def instrument_class(self, cls, predicate: Callable[[str], bool] = None):
+        """ห่อ method ของคลาส (ค่าเริ่มต้นคือ method public ทั้งหมด) ด้วยตัวจับเวลา
+        
+        ต้องเรียกก่อนสร้าง instance ที่ลงทะเบียน method เป็น callback
+        """
+        if predicate is None:
+            predicate = lambda name: not name.startswith('_')
+        for name, value in list(vars(cls).items()):
+            if not isinstance(value, types.FunctionType) or not predicate(name):
+                continue
+            if getattr(value, '__instrumented__', False):
+                continue
+            setattr(cls, name, self.timed(f"{cls.__name__}.{name}", value))
+        self.enabled = True
+
+
+# ตัวเก็บสถิติของทั้งโปรแกรม
+metrics = Metrics()
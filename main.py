@@ -10,15 +10,53 @@ import os
 # เพิ่ม path สำหรับ import modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import config
+from instrumentation import metrics
 from models.complaint_model import ComplaintModel
+from models.factory import create_model
 from controllers.complaint_controller import ComplaintController
+from models.persistence_worker import PersistenceWorker
 from views.main_window import MainWindow
 
 
+# method ของ view ที่วาดข้อมูลใหม่ (นอกเหนือจาก refresh* และ on_*_updated)
+VIEW_REFRESH_METHODS = ('show_search_results', 'insert_new_row', 'patch_row', 'fill_table', 'draw_chart')
+
+
+def is_view_refresh(name: str) -> bool:
+    """method ของ view ที่นับเป็นการรีเฟรชหน้าจอ"""
+    return (name.startswith('refresh')
+            or (name.startswith('on_') and name.endswith('_updated'))
+            or name in VIEW_REFRESH_METHODS)
+
+
+def enable_instrumentation():
+    """ห่อ method public ของ model, controller และ method รีเฟรชของ view ด้วยตัวจับเวลา
+    
+    ต้องเรียกก่อนสร้าง view เพราะ view ลงทะเบียน method ของตัวเองเป็น callback
+    """
+    from models.sqlite_model import SQLiteComplaintModel
+    from views.complaint_list_view import ComplaintListView
+    from views.restaurant_view import RestaurantView
+    from views.trend_view import TrendView
+    
+    for cls in (ComplaintModel, SQLiteComplaintModel, ComplaintController):
+        metrics.instrument_class(cls)
+    for cls in (ComplaintListView, RestaurantView, TrendView):
+        metrics.instrument_class(cls, is_view_refresh)
+
+
 def main():
     """ฟังก์ชันหลักเพื่อเรียกใช้แอปพลิเคชัน"""
+    if config.INSTRUMENTATION:
+        enable_instrumentation()
+    
     # สร้าง Model
-    model = ComplaintModel(data_dir="data")
+    model = create_model()
+    
+    # เขียนไฟล์ใน thread เบื้องหลังเพื่อไม่ให้หน้าจอค้าง
+    writer = PersistenceWorker()
+    model.attach_writer(writer)
     
     # สร้าง Controller
     controller = ComplaintController(model)
@@ -28,7 +66,14 @@ def main():
     app = MainWindow(root, controller)
     
     # เรียกใช้แอปพลิเคชัน
-    app.run()
+    try:
+        app.run()
+    finally:
+        # เขียนงานที่ค้างให้เสร็จ และรวม journal กลับเข้าไฟล์ CSV ก่อนปิดโปรแกรม
+        model.compact()
+        writer.stop()
+        if config.INSTRUMENTATION_DUMP:
+            metrics.dump(config.INSTRUMENTATION_DUMP)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Tuple
+
+
+# ฟิลด์ของแถวนำเข้าที่ต้องมีค่า
+REQUIRED_FIELDS = ('stall_id', 'problem_type')
+
+# จำนวนแถวที่ผิดที่แสดงในข้อความผิดพลาด
+MAX_REPORTED_ERRORS = 5
+
+
+class ImportValidationError(ValueError):
+    """แถวที่นำเข้าไม่ถูกต้อง errors คือรายการ (ลำดับแถวเริ่มที่ 1, ข้อความ)"""
+    
+    def __init__(self, errors: List[Tuple[int, str]]):
+        self.errors = errors
+        shown = '; '.join(f"แถว {row}: {message}" for row, message in errors[:MAX_REPORTED_ERRORS])
+        more = f" และอีก {len(errors) - MAX_REPORTED_ERRORS} แถว" if len(errors) > MAX_REPORTED_ERRORS else ""
+        super().__init__(f"ข้อมูลนำเข้าไม่ถูกต้อง {len(errors)} แถว: {shown}{more}")
+
+
+def prepare_complaint_rows(rows: Iterable[Dict[str, Any]], stall_ids, statuses: Tuple[str, ...],
+                           today: str) -> List[Dict[str, str]]:
+    """ตรวจสอบและจัดรูปแบบแถวการร้องเรียนที่จะนำเข้า (ยังไม่มี complaint_id)
+    
+    แต่ละแถวต้องมี stall_id ที่มีอยู่ใน stall_ids และ problem_type ส่วน complaint_date
+    (YYYY-MM-DD ค่าเริ่มต้น today) และ status (ค่าเริ่มต้นคือสถานะแรกใน statuses)
+    ไม่บังคับ ถ้ามีแถวผิดจะโยน ImportValidationError พร้อมทุกแถวที่ผิด
+    """
+    prepared = []
+    errors = []
+    # วันที่ในชุดนำเข้ามักซ้ำกัน จึงแปลงแต่ละค่าครั้งเดียว
+    parsed_dates: Dict[str, str] = {}
+    for number, row in enumerate(rows, 1):
+        values = {field: str(row.get(field) or '').strip() for field in (
+            'stall_id', 'complaint_date', 'problem_type', 'complaint_description', 'status'
+        )}
+        missing = [field for field in REQUIRED_FIELDS if not values[field]]
+        if missing:
+            errors.append((number, f"ไม่มีค่า {', '.join(missing)}"))
+            continue
+        if values['stall_id'] not in stall_ids:
+            errors.append((number, f"ไม่พบร้าน {values['stall_id']}"))
+            continue
+        
+        raw_date = values['complaint_date'] or today
+        complaint_date = parsed_dates.get(raw_date)
+        if complaint_date is None:
+            try:
+                complaint_date = datetime.strptime(raw_date, '%Y-%m-%d').date().isoformat()
+            except ValueError:
+                errors.append((number, f"วันที่ไม่ถูกต้อง {raw_date}"))
+                continue
+            parsed_dates[raw_date] = complaint_date
+        values['complaint_date'] = complaint_date
+        
+        values['status'] = values['status'] or statuses[0]
+        if values['status'] not in statuses:
+            errors.append((number, f"ไม่รู้จักสถานะ {values['status']}"))
+            continue
+        prepared.append(values)
+    if errors:
+        raise ImportValidationError(errors)
+    return prepared
@@ -1,26 +1,225 @@
+import bisect
 import csv
+import gc
+import heapq
+import itertools
+import operator
 import os
-from datetime import datetime
-from typing import List, Dict, Any
+from collections import Counter
+from datetime import datetime, date
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Dict, Any, Iterator, Set, Tuple
+
+from models.complaint_import import prepare_complaint_rows
+from models.file_lock import DataDirLock
+from models.journal import ComplaintJournal
+from models.parallel_loader import load_csv_parallel
+from models.persistence_worker import PersistenceWorker
+from models.ranking import check_ranking, recent_window, top_entries
+from models.record_store import CsvRecordStore
+from models.records import ComplaintRecord, ResponseRecord
+from models.search_index import TextSearchIndex
+from models.time_index import TimeBucketIndex
+from models.snapshot import ModelSnapshot
 
 
 class ComplaintModel:
     """Model สำหรับจัดการข้อมูลระบบร้องเรียนอาหาร"""
     
-    def __init__(self, data_dir: str = "data"):
+    # สถานะการร้องเรียนที่นับแยกในสรุป
+    STATUSES = ('รอดำเนินการ', 'ดำเนินการแล้ว')
+    
+    # จำนวนรายการใน journal ก่อนรวมกลับเข้าไฟล์ CSV อัตโนมัติ
+    COMPACT_THRESHOLD = 1000
+    
+    # จำนวนการร้องเรียนขั้นต่ำที่เพิ่มพร้อมกันแล้วรวมลำดับตามวันที่ครั้งเดียว (น้อยกว่านี้แทรกทีละรายการ)
+    BULK_INSERT_MIN = 128
+    
+    # จำนวนแถวที่เก็บรายละเอียด/ข้อความตอบกลับไว้ใน LRU cache
+    TEXT_CACHE_SIZE = 256
+    
+    # จำนวนวันที่ที่จำผลการแปลงเป็น date ไว้ (วันที่ของการร้องเรียนซ้ำกันมาก)
+    PARSE_DATE_CACHE = 4096
+    
+    # ขนาดไฟล์ complaints.csv (ไบต์) ที่เริ่มอ่านแบบขนานหลาย process เมื่อไม่ได้กำหนด
+    # จำนวน process (ไฟล์เล็กกว่านี้อ่านใน process เดียวเร็วกว่าหรือเท่ากัน)
+    PARALLEL_LOAD_BYTES = 64 * 1024 * 1024
+    
+    # ฟิลด์ของการร้องเรียนที่ทำดัชนีค้นหาข้อความ
+    COMPLAINT_TEXT_FIELDS = ('problem_type', 'complaint_description')
+    
+    # น้ำหนักของแต่ละฟิลด์ในการจัดอันดับผลการค้นหา
+    SEARCH_WEIGHTS = {'problem_type': 3.0, 'complaint_description': 2.0, 'response_text': 1.0}
+    
+    # ฟิลด์ที่มี posting list (ค่า -> ชุด complaint_id) สำหรับ query_complaints
+    POSTING_FIELDS = ('stall_id', 'status', 'problem_type')
+    
+    # ลำดับที่ query_complaints รองรับ (เรียงตามฟิลด์จะเรียงวันที่ล่าสุดก่อนภายในค่าเดียวกัน)
+    QUERY_SORTS = ('newest', 'oldest', 'stall_id', 'problem_type', 'status')
+    
+    # ผลที่ตรงเงื่อนไขมากกว่า 1/QUERY_SCAN_RATIO ของช่วงวันที่ จะเดินตามลำดับวันที่แทนการเรียง
+    QUERY_SCAN_RATIO = 8
+    
+    # method อ่านไม่แก้ไขข้อมูลในหน่วยความจำ จึงเรียกพร้อมกันหลาย thread ได้ (แต่ไม่พร้อมกับการเขียน)
+    THREAD_SAFE_READS = True
+    
+    # ไฟล์ต้นทางที่ snapshot ต้องตรวจสอบ
+    SOURCE_FILES = ['canteens.csv', 'stalls.csv', 'complaints.csv', 'responses.csv']
+    
+    def __init__(self, data_dir: str = "data", load_workers: int = None):
         self.data_dir = data_dir
+        # จำนวน process ที่ใช้อ่าน complaints.csv (None = เลือกตามขนาดไฟล์)
+        self.load_workers = load_workers
+        # lock ระหว่าง instance ที่เปิดโฟลเดอร์ข้อมูลเดียวกัน (ต้องถือไว้ระหว่างเขียนไฟล์)
+        self.lock = DataDirLock(data_dir)
+        self.journal = ComplaintJournal(data_dir)
+        self.snapshot = ModelSnapshot(data_dir, self.SOURCE_FILES)
+        # อ่านรายละเอียดการร้องเรียนและข้อความตอบกลับจากไฟล์เมื่อต้องใช้เท่านั้น
+        self.complaint_store = CsvRecordStore(
+            os.path.join(data_dir, "complaints.csv"), 'complaint_id', self.TEXT_CACHE_SIZE
+        )
+        self.response_store = CsvRecordStore(
+            os.path.join(data_dir, "responses.csv"), 'response_id', self.TEXT_CACHE_SIZE
+        )
+        self.writer: PersistenceWorker = None
+        self._journal_entries = 0
+        # snapshot ไม่ตรงกับ CSV ที่ต่อท้ายแล้ว (เขียนใหม่ครั้งเดียวตอน compact)
+        self._snapshot_stale = False
+        # เพิ่มขึ้นทุกครั้งที่ข้อมูลในหน่วยความจำเปลี่ยน (ใช้ตรวจว่าผลที่ cache ไว้ยังใช้ได้)
+        self.generation = 0
+        # ลายเซ็นและตำแหน่ง (mark) ของไฟล์ CSV ตอนรวมข้อมูลครั้งล่าสุด และ ID ที่ instance อื่นเพิ่ม/แก้ไข
+        self._synced_sources = None
+        self._source_marks = (None, None)
+        self._external_changes = self._new_changes()
         self.canteens: List[Dict[str, Any]] = []
         self.stalls: List[Dict[str, Any]] = []
         self.complaints: List[Dict[str, Any]] = []
         self.responses: List[Dict[str, Any]] = []
+        # ดัชนีสำหรับค้นหาแบบ O(1)
+        self._canteen_index: Dict[str, Dict[str, Any]] = {}
+        self._stall_index: Dict[str, Dict[str, Any]] = {}
+        self._complaint_index: Dict[str, Dict[str, Any]] = {}
+        self._response_index: Dict[str, Dict[str, Any]] = {}
+        self._responses_by_complaint: Dict[str, List[Dict[str, Any]]] = {}
+        # key ตามวันที่ของแต่ละรายการ (date, -ลำดับที่เพิ่ม) และลำดับการร้องเรียนตามวันที่ (เก่า -> ใหม่)
+        self._complaint_keys: Dict[str, Tuple[date, int]] = {}
+        self._date_keys: List[Tuple[date, int]] = []
+        self._by_date: List[Dict[str, Any]] = []
+        self._next_seq = 0
+        # posting list ของแต่ละฟิลด์ใน POSTING_FIELDS (ฟิลด์ -> ค่า -> ชุด complaint_id)
+        self._postings: Dict[str, Dict[str, Set[str]]] = {field: {} for field in self.POSTING_FIELDS}
+        # ตัวนับสรุปของร้านและโรงอาหารที่อัปเดตทีละรายการ
+        self._stall_stats: Dict[str, Dict[str, Any]] = {}
+        self._canteen_stats: Dict[str, Dict[str, Any]] = {}
+        self._status_totals: Dict[str, int] = {}
+        # จำนวนการร้องเรียนที่รวมไว้ตามวัน/สัปดาห์/เดือน
+        self.time_index = TimeBucketIndex()
+        # ดัชนีค้นหาข้อความ (complaint_id -> ประเภทปัญหา รายละเอียด และข้อความตอบกลับ)
+        self.search_index = TextSearchIndex()
         self.load_all_data()
     
     def load_all_data(self):
-        """โหลดข้อมูลจากไฟล์ CSV ทั้งหมด"""
-        self.load_canteens()
-        self.load_stalls()
-        self.load_complaints()
-        self.load_responses()
+        """โหลดข้อมูลจาก snapshot หรือไฟล์ CSV ทั้งหมด"""
+        # ถือ lock ไว้เพื่อไม่ให้อ่าน CSV ก่อนและ journal หลังการรวมไฟล์ของ instance อื่น
+        self.generation += 1
+        with self.lock:
+            if not self.load_snapshot():
+                self.load_canteens()
+                self.load_stalls()
+                self.load_complaints()
+                self.load_responses()
+                self.save_snapshot()
+            self._mark_synced()
+            self.replay_journal()
+    
+    def load_snapshot(self) -> bool:
+        """โหลดข้อมูลและดัชนีจาก snapshot คืน False ถ้า snapshot ใช้ไม่ได้"""
+        # object ที่สร้างระหว่างโหลดถูกเก็บไว้ทั้งหมด การเก็บขยะแบบวนรอบระหว่างนี้จึงเสียเวลาเปล่า
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            state = self.snapshot.load()
+            if state is None:
+                return False
+            self._restore_state(state)
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+            # snapshot ผิดรูป: ล้างส่วนที่โหลดไปแล้วและแปลงจาก CSV แทน
+            self.canteens, self.stalls, self.complaints, self.responses = [], [], [], []
+            self.search_index = TextSearchIndex()
+            return False
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return True
+    
+    def save_snapshot(self):
+        """บันทึกข้อมูลและดัชนีปัจจุบันลง snapshot (ต้องตรงกับไฟล์ CSV)"""
+        try:
+            self.snapshot.save(self._snapshot_state())
+            self._snapshot_stale = False
+        except OSError:
+            # snapshot เป็นเพียง cache หากเขียนไม่ได้ก็โหลดจาก CSV ครั้งถัดไป
+            pass
+    
+    def _snapshot_state(self) -> Dict[str, Any]:
+        """ข้อมูลและดัชนีในรูปที่เขียนเป็น JSON ได้
+        
+        การร้องเรียนและการตอบกลับเก็บเป็นแถวตาม FIELDS (ข้อความที่ยังไม่ได้อ่านเป็น None)
+        ลำดับตามวันที่เก็บเป็นตำแหน่งใน complaints ส่วนดัชนีตาม ID และ posting list
+        สร้างใหม่ตอนโหลด offset ของข้อความโหลดจากไฟล์ .idx ของ store เมื่อใช้
+        """
+        positions = {id(complaint): position for position, complaint in enumerate(self.complaints)}
+        return {
+            'canteens': self.canteens,
+            'stalls': self.stalls,
+            'complaints': [complaint.to_row() for complaint in self.complaints],
+            'complaint_seqs': [-self._complaint_keys[c['complaint_id']][1] for c in self.complaints],
+            'by_date': [positions[id(complaint)] for complaint in self._by_date],
+            'next_seq': self._next_seq,
+            'responses': [response.to_row() for response in self.responses],
+            'stall_stats': self._stall_stats,
+            'canteen_stats': self._canteen_stats,
+            'status_totals': self._status_totals,
+            'time_index': self.time_index.to_state(),
+            'search_index': self.search_index.to_state()
+        }
+    
+    def _restore_state(self, state: Dict[str, Any]):
+        """สร้างข้อมูลและดัชนีจาก state ของ _snapshot_state (โยน ValueError ถ้าข้อมูลไม่ครบ)"""
+        self.canteens = state['canteens']
+        self.stalls = state['stalls']
+        self._canteen_index = {c['canteen_id']: c for c in self.canteens}
+        self._stall_index = {s['stall_id']: s for s in self.stalls}
+        self.complaints = [
+            ComplaintRecord.from_row(row, self.complaint_store) for row in state['complaints']
+        ]
+        if len(state['complaint_seqs']) != len(self.complaints) or len(state['by_date']) != len(self.complaints):
+            raise ValueError("ลำดับการร้องเรียนใน snapshot ไม่ครบ")
+        # อ่านเป็นคอลัมน์จากแถวใน state โดยตรงแทนการเข้าถึง record ทีละฟิลด์
+        columns = dict(zip(ComplaintRecord.FIELDS, zip(*state['complaints'])))
+        ids = columns.get('complaint_id', ())
+        self._complaint_index = dict(zip(ids, self.complaints))
+        dates = map(self._parse_date, columns.get('complaint_date', ()))
+        self._complaint_keys = dict(zip(ids, zip(dates, map(operator.neg, state['complaint_seqs']))))
+        self._next_seq = state['next_seq']
+        self._by_date = [self.complaints[position] for position in state['by_date']]
+        self._date_keys = [self._complaint_keys[c['complaint_id']] for c in self._by_date]
+        self._postings = {field: {} for field in self.POSTING_FIELDS}
+        for field, postings in self._postings.items():
+            for complaint_id, value in zip(ids, columns.get(field, ())):
+                if value not in postings:
+                    postings[value] = set()
+                postings[value].add(complaint_id)
+        self._stall_stats = state['stall_stats']
+        self._canteen_stats = state['canteen_stats']
+        self._status_totals = state['status_totals']
+        self.time_index = TimeBucketIndex.from_state(state['time_index'])
+        self.responses = [
+            ResponseRecord.from_row(row, self.response_store) for row in state['responses']
+        ]
+        self._rebuild_response_indexes()
+        self.search_index = TextSearchIndex.from_state(state['search_index'])
     
     def load_canteens(self):
         """โหลดข้อมูลโรงอาหาร"""
@@ -29,6 +228,7 @@ class ComplaintModel:
             with open(csv_path, 'r', encoding='utf-8') as file:
                 reader = csv.DictReader(file)
                 self.canteens = list(reader)
+        self._canteen_index = {c['canteen_id']: c for c in self.canteens}
     
     def load_stalls(self):
         """โหลดข้อมูลร้านอาหาร"""
@@ -37,52 +237,422 @@ class ComplaintModel:
             with open(csv_path, 'r', encoding='utf-8') as file:
                 reader = csv.DictReader(file)
                 self.stalls = list(reader)
+        self._stall_index = {s['stall_id']: s for s in self.stalls}
     
-    def load_complaints(self):
-        """โหลดข้อมูลการร้องเรียน"""
-        csv_path = os.path.join(self.data_dir, "complaints.csv")
+    def load_complaints(self, workers: int = None):
+        """โหลดข้อมูลการร้องเรียน
+
+        workers: จำนวน process สำหรับอ่านไฟล์แบบขนาน (None = load_workers ของ model
+        ถ้าไม่ได้กำหนดจะใช้ทุก CPU เมื่อไฟล์ใหญ่ถึง PARALLEL_LOAD_BYTES)
+        """
+        csv_path = self.complaint_store.path
+        for field in self.COMPLAINT_TEXT_FIELDS:
+            self.search_index.clear_field(field)
         if os.path.exists(csv_path):
-            with open(csv_path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                self.complaints = list(reader)
-                # แปลง complaint_id เป็น int
-                for complaint in self.complaints:
-                    complaint['complaint_id'] = complaint.get('complaint_id', '')
+            workers = workers or self.load_workers
+            if not workers:
+                large = os.path.getsize(csv_path) >= self.PARALLEL_LOAD_BYTES
+                workers = (os.cpu_count() or 1) if large else 1
+            if workers > 1:
+                self._load_complaints_parallel(workers)
+                return
+            # เก็บเป็น record แบบ __slots__ โดยไม่เก็บรายละเอียดไว้ในหน่วยความจำ
+            self.complaints = []
+            for row in self.complaint_store.scan():
+                self._index_complaint_text(row)
+                self.complaints.append(ComplaintRecord.header_from_dict(row, self.complaint_store))
+        self._rebuild_complaint_indexes()
+    
+    def _load_complaints_parallel(self, workers: int):
+        """อ่าน complaints.csv เป็นช่วงไบต์พร้อมกันหลาย process แล้วรวมผลตามลำดับไฟล์
+        
+        แต่ละ process แยก CSV แปลงวันที่ ทำดัชนีค้นหาข้อความ และจัดกลุ่มแถวตามค่าของ
+        ฟิลด์ส่วนหัวในช่วงของตัวเอง (ดู parse_range) รายละเอียดไม่ถูกส่งกลับ process หลัก
+        process หลักสร้าง record ส่วนหัวจากคอลัมน์ที่ได้ แล้วรวม offset, posting list
+        และดัชนีค้นหาของแต่ละช่วงตามลำดับไฟล์
+        """
+        store = self.complaint_store
+        key_field = ComplaintRecord.KEY_FIELD
+        coded_fields = [
+            field for field in ComplaintRecord.FIELDS
+            if field != key_field and field not in ComplaintRecord.LAZY_FIELDS
+        ]
+        fieldnames, chunks = load_csv_parallel(
+            store.path, key_field, coded_fields, 'complaint_date',
+            list(self.COMPLAINT_TEXT_FIELDS), self.search_index.n, workers
+        )
+        self.complaints = []
+        self._postings = {field: {} for field in self.POSTING_FIELDS}
+        offsets = {}
+        dates = []
+        groups = Counter()
+        for chunk in chunks:
+            keys = chunk['keys']
+            columns = {key_field: keys}
+            for field, (values, codes) in chunk['columns'].items():
+                columns[field] = [values[code] for code in codes]
+            for field in ComplaintRecord.LAZY_FIELDS:
+                columns[field] = itertools.repeat(None)
+            self.complaints.extend(
+                ComplaintRecord.from_row(row, store)
+                for row in zip(*(columns[field] for field in ComplaintRecord.FIELDS))
+            )
+            for field, field_postings in self._postings.items():
+                for value, rows in zip(chunk['columns'][field][0], chunk['postings'][field]):
+                    if value not in field_postings:
+                        field_postings[value] = set()
+                    field_postings[value].update(map(keys.__getitem__, rows))
+            chunk_dates = chunk['dates']
+            date_codes = chunk['columns']['complaint_date'][1]
+            dates.extend(map(chunk_dates.__getitem__, date_codes))
+            # จำนวนต่อ (วันที่, ร้าน, สถานะ) นับจากเลขลำดับค่าแทนการไล่ record
+            stall_values, stall_codes = chunk['columns']['stall_id']
+            status_values, status_codes = chunk['columns']['status']
+            for (day, stall, status), count in Counter(zip(date_codes, stall_codes, status_codes)).items():
+                groups[(chunk_dates[day], stall_values[stall], status_values[status])] += count
+            offsets.update(zip(keys, zip(chunk['offsets'], chunk['lengths'])))
+            self.search_index.merge(chunk['search_index'])
+        store.adopt_index(fieldnames, offsets)
+        self._rebuild_date_order(dates, groups)
+    
+    @staticmethod
+    @lru_cache(maxsize=PARSE_DATE_CACHE)
+    def _parse_date(value: str) -> date:
+        """แปลงข้อความวันที่ (YYYY-MM-DD) เป็น date (จำผลของแต่ละค่าไว้ ใช้ทั้งตอนโหลดและตอนเพิ่ม)"""
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    
+    def _date_key(self, complaint: Dict[str, Any], parsed: date = None) -> Tuple[date, int]:
+        """สร้าง key สำหรับเรียงตามวันที่ รายการที่เพิ่มก่อนอยู่หลังในลำดับจากเก่าไปใหม่"""
+        if parsed is None:
+            parsed = self._parse_date(complaint['complaint_date'])
+        self._next_seq += 1
+        key = (parsed, -self._next_seq)
+        self._complaint_keys[complaint['complaint_id']] = key
+        return key
+    
+    def _index_postings(self, complaint: Dict[str, Any]):
+        """เพิ่มการร้องเรียนเข้า posting list ของทุกฟิลด์ใน POSTING_FIELDS"""
+        complaint_id = complaint['complaint_id']
+        for field in self.POSTING_FIELDS:
+            postings = self._postings[field]
+            value = complaint[field]
+            if value not in postings:
+                postings[value] = set()
+            postings[value].add(complaint_id)
+    
+    def _rebuild_complaint_indexes(self):
+        """สร้างดัชนีของการร้องเรียนใหม่ทั้งหมดหลังโหลดจากไฟล์"""
+        self._postings = {field: {} for field in self.POSTING_FIELDS}
+        for complaint in self.complaints:
+            self._index_postings(complaint)
+        self._rebuild_date_order([self._parse_date(c['complaint_date']) for c in self.complaints])
+    
+    def _rebuild_date_order(self, dates: List[date], groups: Dict[Tuple[date, str, str], int] = None):
+        """สร้างดัชนีตาม ID, key ตามวันที่ ลำดับตามวันที่ และตัวนับสรุปของ self.complaints ใหม่
+        
+        dates: วันที่ของแต่ละรายการตามลำดับใน self.complaints groups ส่งต่อให้ _rebuild_summaries
+        """
+        ids = [c['complaint_id'] for c in self.complaints]
+        self._complaint_index = dict(zip(ids, self.complaints))
+        keys = [(day, -seq) for seq, day in enumerate(dates, 1)]
+        self._complaint_keys = dict(zip(ids, keys))
+        self._next_seq = len(keys)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._date_keys = [keys[i] for i in order]
+        self._by_date = [self.complaints[i] for i in order]
+        self._rebuild_summaries(groups)
     
     def load_responses(self):
         """โหลดข้อมูลการตอบกลับ"""
-        csv_path = os.path.join(self.data_dir, "responses.csv")
-        if os.path.exists(csv_path):
-            with open(csv_path, 'r', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                self.responses = list(reader)
+        self.search_index.clear_field('response_text')
+        if os.path.exists(self.response_store.path):
+            # เก็บเฉพาะส่วนหัว ข้อความตอบกลับอ่านจากไฟล์เมื่อเปิดดูรายละเอียด
+            self.responses = []
+            for row in self.response_store.scan():
+                self._index_response_text(row)
+                self.responses.append(ResponseRecord.header_from_dict(row, self.response_store))
+        self._rebuild_response_indexes()
+    
+    def _rebuild_response_indexes(self):
+        """สร้างดัชนีของการตอบกลับใหม่ทั้งหมดจาก self.responses"""
+        self._response_index = {}
+        self._responses_by_complaint = {}
+        for response in self.responses:
+            self._index_response(response)
+    
+    def _index_response(self, response: Dict[str, Any]):
+        """เพิ่มการตอบกลับเข้าดัชนีและ multimap complaint_id -> responses"""
+        self._response_index[response['response_id']] = response
+        self._responses_by_complaint.setdefault(response['complaint_id'], []).append(response)
+    
+    def _index_complaint_text(self, complaint: Dict[str, Any]):
+        """เพิ่มประเภทปัญหาและรายละเอียดของการร้องเรียนเข้าดัชนีค้นหา"""
+        complaint_id = complaint['complaint_id']
+        for field in self.COMPLAINT_TEXT_FIELDS:
+            self.search_index.add(complaint_id, field, complaint[field])
+    
+    def _index_response_text(self, response: Dict[str, Any]):
+        """เพิ่มข้อความตอบกลับเข้าดัชนีค้นหาของการร้องเรียนที่ตอบ"""
+        self.search_index.add(response['complaint_id'], 'response_text', response['response_text'])
+    
+    def replay_journal(self):
+        """นำการเปลี่ยนแปลงที่ค้างอยู่ใน journal มาใช้กับข้อมูลที่โหลดจาก CSV"""
+        self._apply_journal(self.journal.replay())
+        self._journal_entries = self.journal.entry_count
+        if self.journal.needs_repair:
+            self.compact()
+    
+    def _apply_journal(self, entries, changes: Dict[str, List[str]] = None):
+        """นำรายการใน journal มาใช้ (ซ้ำได้) และบันทึก ID ที่เปลี่ยนลง changes ถ้ามี
+        
+        การร้องเรียนที่เพิ่มติดกันถูกรวมเป็นชุดเดียว (เช่นจากการนำเข้าของ instance อื่น)
+        """
+        pending: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            op = entry.get('op')
+            if op == 'add_complaint':
+                record = entry['record']
+                # ข้ามรายการที่ถูกรวมเข้า CSV ไปแล้ว
+                if record['complaint_id'] not in self._complaint_index:
+                    pending[record['complaint_id']] = ComplaintRecord.from_dict(record)
+                    if changes is not None:
+                        changes['complaints_added'].append(record['complaint_id'])
+                continue
+            if pending:
+                self._insert_complaints(list(pending.values()))
+                pending = {}
+            if op == 'add_response':
+                record = entry['record']
+                if record['response_id'] not in self._response_index:
+                    self._insert_response(ResponseRecord.from_dict(record))
+                    if changes is not None:
+                        changes['responses_added'].append(record['response_id'])
+            elif op == 'update_status':
+                complaint = self._complaint_index.get(entry['complaint_id'])
+                if complaint and complaint['status'] != entry['status']:
+                    self._apply_status(complaint, entry['status'])
+                    if changes is not None:
+                        changes['complaints_updated'].append(entry['complaint_id'])
+        if pending:
+            self._insert_complaints(list(pending.values()))
+    
+    # ===== Change Detection =====
+    @staticmethod
+    def _new_changes() -> Dict[str, List[str]]:
+        return {'complaints_added': [], 'complaints_updated': [], 'responses_added': []}
+    
+    def _source_signature(self) -> Tuple:
+        """ขนาด เวลาแก้ไข และ inode ของไฟล์ CSV ที่การรวม journal ของทุก instance เขียนทับ"""
+        signature = []
+        for store in (self.complaint_store, self.response_store):
+            try:
+                stat = os.stat(store.path)
+            except OSError:
+                signature.append(None)
+            else:
+                signature.append((stat.st_size, stat.st_mtime_ns, stat.st_ino))
+        return tuple(signature)
+    
+    def _mark_synced(self):
+        """จำลายเซ็นและ mark ของไฟล์ CSV หลังรวมหรือเขียนข้อมูล (เรียกภายใต้ self.lock)"""
+        self._synced_sources = self._source_signature()
+        self._source_marks = (self.complaint_store.mark(), self.response_store.mark())
+    
+    def has_external_changes(self) -> bool:
+        """ตรวจแบบเร็ว (stat เท่านั้น) ว่ามี instance อื่นเขียนข้อมูลหลังการรวมครั้งล่าสุดหรือไม่"""
+        return (self._source_signature() != self._synced_sources
+                or self.journal.size() != self.journal.position)
+    
+    def _sync_external(self):
+        """รวมการเปลี่ยนแปลงของ instance อื่นเข้าหน่วยความจำ (เรียกภายใต้ self.lock)
+        
+        ถ้า CSV ถูกเขียนใหม่ (instance อื่นรวม journal แล้ว) จะรวมเฉพาะแถวที่ใหม่หรือ
+        สถานะเปลี่ยนจาก CSV แล้วอ่าน journal ที่เหลือตั้งแต่ต้น มิฉะนั้นอ่านเฉพาะรายการ
+        ที่ต่อท้าย journal หลังตำแหน่งที่อ่านไว้ ทั้งสองกรณีไม่สร้างดัชนีใหม่ทั้งหมด
+        """
+        if not self.has_external_changes():
+            return
+        changes = self._external_changes
+        if self._source_signature() != self._synced_sources:
+            self._merge_sources(changes)
+            self._mark_synced()
+            self.journal.position = 0
+        count = self.journal.entry_count
+        self._apply_journal(self.journal.read_new(), changes)
+        self._journal_entries += self.journal.entry_count - count
+    
+    def _merge_sources(self, changes: Dict[str, List[str]]):
+        """เพิ่มแถวใหม่และสถานะที่เปลี่ยนจาก complaints.csv และ responses.csv
+        
+        ถ้าไฟล์ถูกต่อท้ายเท่านั้น (เช่นการนำเข้าชุดใหญ่) จะอ่านเฉพาะแถวหลัง mark ที่รวมไว้
+        ถ้าไฟล์ถูกเขียนใหม่ (รวม journal) จะอ่านทุกแถว
+        """
+        complaint_mark, response_mark = self._source_marks
+        new_complaints = []
+        for row in self.complaint_store.scan_since(complaint_mark):
+            complaint = self._complaint_index.get(row['complaint_id'])
+            if complaint is None:
+                new_complaints.append(ComplaintRecord.from_dict(row))
+            elif complaint['status'] != row['status']:
+                self._apply_status(complaint, row['status'])
+                changes['complaints_updated'].append(row['complaint_id'])
+        self._insert_complaints(new_complaints)
+        changes['complaints_added'].extend(complaint['complaint_id'] for complaint in new_complaints)
+        
+        new_responses = [
+            ResponseRecord.from_dict(row) for row in self.response_store.scan_since(response_mark)
+            if row['response_id'] not in self._response_index
+        ]
+        for response in new_responses:
+            self._insert_response(response)
+            changes['responses_added'].append(response['response_id'])
+    
+    def check_external_changes(self) -> Dict[str, List[str]]:
+        """รวมการเปลี่ยนแปลงจาก instance อื่น แล้วคืน ID ที่เพิ่มหรือแก้ไขตั้งแต่การเรียกครั้งก่อน
+        
+        คืน {'complaints_added', 'complaints_updated', 'responses_added'} ถ้า lock
+        ถูกใช้อยู่ (เช่นกำลังรวม journal) จะรวมในการเรียกครั้งถัดไปแทนการรอ
+        """
+        if self.has_external_changes() and self.lock.acquire(timeout=0):
+            try:
+                self._sync_external()
+            finally:
+                self.lock.release()
+        changes = self._external_changes
+        self._external_changes = self._new_changes()
+        return {key: list(dict.fromkeys(ids)) for key, ids in changes.items()}
+    
+    def attach_writer(self, writer: PersistenceWorker):
+        """ให้การเขียนไฟล์ทั้งหมดทำใน thread เบื้องหลังของ writer"""
+        self.writer = writer
+    
+    def poll_writer(self) -> List[Exception]:
+        """ดึงข้อผิดพลาดจากการเขียนไฟล์เบื้องหลัง (เรียกจาก thread หลัก)"""
+        return self.writer.poll() if self.writer else []
+    
+    def _run_io(self, task, *args):
+        """ทำงานเขียนไฟล์ในเบื้องหลังถ้ามี writer มิฉะนั้นทำทันที"""
+        if self.writer:
+            self.writer.submit(task, *args)
+        else:
+            task(*args)
+    
+    def compact(self):
+        """รวมข้อมูลจาก journal กลับเข้าไฟล์ CSV หลัก แล้วล้าง journal (รอจนเสร็จ)"""
+        if self.writer:
+            self.writer.flush()
+        with self.lock:
+            self._sync_external()
+            if not self.journal.exists():
+                if self._snapshot_stale:
+                    self.save_snapshot()
+                return
+            self.save_complaints()
+            self.save_responses()
+            self.journal.clear()
+            self._journal_entries = 0
+            self.save_snapshot()
+    
+    def _compact_snapshot(self):
+        """เขียน snapshot ของข้อมูลลง CSV แล้วตัด journal ส่วนที่รวมแล้ว (ทำงานใน thread ของ writer)
+        
+        คัดลอกรายการและตำแหน่ง journal ภายใต้ self.lock แล้วเขียนไฟล์ชั่วคราวนอก lock
+        การบันทึกจาก thread หลักจึงไม่ต้องรอการเขียน CSV ทั้งไฟล์ จากนั้นถือ lock เฉพาะตอน
+        แทนที่ไฟล์ ตรวจแบบ optimistic: ถ้า CSV ถูกเขียนหลังคัดลอกรายการ (เช่น instance อื่น
+        รวม journal ไปก่อน) รายการที่คัดลอกไว้อาจขาดข้อมูล จึงยกเลิก รายการที่ต่อท้าย
+        journal หลังตำแหน่งที่คัดลอกยังคงอยู่ใน journal (การนำมาใช้ซ้ำไม่มีผล)
+        """
+        with self.lock:
+            complaints = list(self.complaints)
+            responses = list(self.responses)
+            sources = self._synced_sources
+            position = self.journal.position
+        prepared = []
+        try:
+            if complaints:
+                prepared.append((self.complaint_store,
+                                 self.complaint_store.write_temp(ComplaintRecord.FIELDS, complaints)))
+            if responses:
+                prepared.append((self.response_store,
+                                 self.response_store.write_temp(ResponseRecord.FIELDS, responses)))
+            with self.lock:
+                if self._source_signature() != sources:
+                    return
+                while prepared:
+                    store, temp = prepared.pop(0)
+                    store.replace_with(temp)
+                self.journal.discard_through(position)
+                self._mark_synced()
+        finally:
+            for store, temp in prepared:
+                store.discard_temp(temp)
+    
+    def _record_change(self, entry: Dict[str, Any]):
+        """บันทึกการเปลี่ยนแปลงลง journal และรวมไฟล์เมื่อ journal ใหญ่เกินไป"""
+        self._record_changes([entry])
+    
+    def _record_changes(self, entries: List[Dict[str, Any]]):
+        """บันทึกการเปลี่ยนแปลงหลายรายการลง journal ด้วยการเขียนครั้งเดียว
+        
+        เรียกภายใต้ self.lock หลัง _sync_external ถ้ามี writer การเขียนและ fsync ทำใน
+        thread ของ writer ตามลำดับคิว โดยคงล็อกไฟล์ไว้จนเขียนเสร็จ instance อื่นจึงไม่
+        อ่าน journal หรือจอง ID ก่อนเห็นรายการเหล่านี้
+        """
+        self._journal_entries += len(entries)
+        if self.writer:
+            self.lock.retain()
+            self.writer.submit(self._append_journal, entries)
+        else:
+            self.journal.append_many(entries)
+        if self._journal_entries < self.COMPACT_THRESHOLD:
+            return
+        self._journal_entries = 0
+        if self.writer:
+            self.writer.submit(self._compact_snapshot)
+        else:
+            self.compact()
+    
+    def _append_journal(self, entries: List[Dict[str, Any]]):
+        """เขียนรายการลง journal และปล่อยล็อกไฟล์ที่ _record_changes คงไว้ (ทำงานใน thread ของ writer)"""
+        try:
+            with self.lock:
+                self.journal.append_many(entries)
+        finally:
+            self.lock.release_retained()
     
     def save_complaints(self):
-        """บันทึกข้อมูลการร้องเรียน"""
-        if not self.complaints:
+        """บันทึกข้อมูลการร้องเรียน (รวมรายการของ instance อื่นก่อนเขียนทับไฟล์)"""
+        with self.lock:
+            self._sync_external()
+            self._write_complaints(self.complaints)
+            self._mark_synced()
+    
+    def save_responses(self):
+        """บันทึกข้อมูลการตอบกลับ (รวมรายการของ instance อื่นก่อนเขียนทับไฟล์)"""
+        with self.lock:
+            self._sync_external()
+            self._write_responses(self.responses)
+            self._mark_synced()
+    
+    def _write_complaints(self, complaints: List[Dict[str, Any]]):
+        """เขียนการร้องเรียนทั้งหมดลง complaints.csv"""
+        if not complaints:
             return
         
-        csv_path = os.path.join(self.data_dir, "complaints.csv")
         fieldnames = ['complaint_id', 'stall_id', 'complaint_date', 
                     'problem_type', 'complaint_description', 'status']
         
-        with open(csv_path, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(self.complaints)
+        # เขียนผ่าน store เพื่อให้ดัชนี offset ของรายละเอียดตรงกับไฟล์ใหม่
+        self.complaint_store.rewrite(fieldnames, complaints)
     
-    def save_responses(self):
-        """บันทึกข้อมูลการตอบกลับ"""
-        if not self.responses:
+    def _write_responses(self, responses: List[Dict[str, Any]]):
+        """เขียนการตอบกลับทั้งหมดลง responses.csv"""
+        if not responses:
             return
         
-        csv_path = os.path.join(self.data_dir, "responses.csv")
         fieldnames = ['response_id', 'complaint_id', 'response_date', 'response_text']
         
-        with open(csv_path, 'w', newline='', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(self.responses)
+        self.response_store.rewrite(fieldnames, responses)
     
     # ===== Canteen Operations =====
     def get_all_canteens(self) -> List[Dict[str, Any]]:
@@ -91,10 +661,7 @@ class ComplaintModel:
     
     def get_canteen_by_id(self, canteen_id: str) -> Dict[str, Any] or None:
         """ดึงข้อมูลโรงอาหารตาม ID"""
-        for canteen in self.canteens:
-            if canteen['canteen_id'] == canteen_id:
-                return canteen
-        return None
+        return self._canteen_index.get(canteen_id)
     
     # ===== Stall Operations =====
     def get_all_stalls(self) -> List[Dict[str, Any]]:
@@ -103,10 +670,7 @@ class ComplaintModel:
     
     def get_stall_by_id(self, stall_id: str) -> Dict[str, Any] or None:
         """ดึงข้อมูลร้านอาหารตาม ID"""
-        for stall in self.stalls:
-            if stall['stall_id'] == stall_id:
-                return stall
-        return None
+        return self._stall_index.get(stall_id)
     
     def get_stalls_by_canteen(self, canteen_id: str) -> List[Dict[str, Any]]:
         """ดึงร้านอาหารตามโรงอาหาร"""
@@ -120,123 +684,555 @@ class ComplaintModel:
     # ===== Complaint Operations =====
     def get_all_complaints(self) -> List[Dict[str, Any]]:
         """ดึงข้อมูลการร้องเรียนทั้งหมดเรียงตามวันที่ล่าสุด"""
-        sorted_complaints = sorted(
-            self.complaints,
-            key=lambda x: datetime.strptime(x['complaint_date'], '%Y-%m-%d'),
-            reverse=True
-        )
-        return sorted_complaints
+        return self._by_date[::-1]
+    
+    def get_latest_complaints(self, limit: int) -> List[Dict[str, Any]]:
+        """ดึงการร้องเรียนล่าสุด limit รายการ (O(limit))"""
+        if limit <= 0:
+            return []
+        return self._by_date[:-limit - 1:-1]
     
     def get_complaint_by_id(self, complaint_id: str) -> Dict[str, Any] or None:
         """ดึงข้อมูลการร้องเรียนตาม ID"""
-        for complaint in self.complaints:
-            if complaint['complaint_id'] == complaint_id:
-                return complaint
-        return None
+        return self._complaint_index.get(complaint_id)
     
     def get_complaints_by_stall(self, stall_id: str) -> List[Dict[str, Any]]:
         """ดึงการร้องเรียนของร้านหนึ่ง"""
-        return [c for c in self.get_all_complaints() if c['stall_id'] == stall_id]
+        return self.query_complaints(stall_id=stall_id)['complaints']
     
     def get_complaints_by_status(self, status: str) -> List[Dict[str, Any]]:
         """ดึงการร้องเรียนตามสถานะ"""
-        filtered = [c for c in self.get_all_complaints() if c['status'] == status]
-        return filtered
+        return self.query_complaints(status=status)['complaints']
+    
+    def count_complaints(self, status: str = None) -> int:
+        """นับจำนวนการร้องเรียนทั้งหมด หรือเฉพาะสถานะที่กำหนด"""
+        if status is None:
+            return len(self.complaints)
+        return self._status_totals.get(status, 0)
+    
+    def get_complaints_page(self, offset: int, limit: int, status: str = None) -> List[Dict[str, Any]]:
+        """ดึงการร้องเรียนหนึ่งหน้า (เรียงตามวันที่ล่าสุด) โดยไม่สร้างรายการทั้งหมด"""
+        if limit <= 0 or offset < 0:
+            return []
+        if status is None:
+            end = len(self._by_date) - offset
+            return self._by_date[max(end - limit, 0):max(end, 0)][::-1]
+        return self.query_complaints(status=status, offset=offset, limit=limit)['complaints']
+    
+    def _as_date(self, value) -> date or None:
+        """แปลงวันที่ที่เป็นข้อความ (YYYY-MM-DD) เป็น date (None คงเป็น None)"""
+        if value is None or isinstance(value, date):
+            return value
+        return self._parse_date(value)
+    
+    def get_complaints_between(self, start, end, status: str = None) -> List[Dict[str, Any]]:
+        """ดึงการร้องเรียนตั้งแต่วันที่ start ถึง end (รวมทั้งสองวัน) เรียงตามวันที่ล่าสุด
+        
+        ใช้ bisect บนลำดับตามวันที่ จึงอ่านเฉพาะรายการในช่วงที่ต้องการ
+        """
+        low, high = self._date_bounds(start, end)
+        selected = reversed(self._by_date[low:high])
+        if status is None:
+            return list(selected)
+        return [c for c in selected if c['status'] == status]
+    
+    def _date_bounds(self, start, end) -> Tuple[int, int]:
+        """ช่วง index ใน _by_date ของวันที่ start ถึง end (None = ไม่จำกัด)"""
+        start = self._as_date(start)
+        end = self._as_date(end)
+        low = 0 if start is None else bisect.bisect_left(self._date_keys, (start, -float('inf')))
+        high = len(self._date_keys) if end is None else bisect.bisect_right(self._date_keys, (end, float('inf')))
+        return low, high
+    
+    def iter_complaints(self, status: str = None, start=None, end=None) -> Iterator[Dict[str, Any]]:
+        """วนการร้องเรียนเรียงตามวันที่ล่าสุดทีละรายการโดยไม่สร้าง list (สำหรับ export)
+        
+        start/end: ช่วงวันที่ (รวมทั้งสองวัน) ไม่บังคับ รายละเอียดของแต่ละรายการอ่านจาก
+        ไฟล์เมื่อใช้ผ่าน LRU cache หน่วยความจำจึงไม่เพิ่มตามจำนวนที่ export
+        """
+        by_date = self._by_date
+        low, high = self._date_bounds(start, end)
+        for index in range(high - 1, low - 1, -1):
+            complaint = by_date[index]
+            if status is None or complaint['status'] == status:
+                yield complaint
+    
+    def search_complaints(self, query: str, limit: int = 100, status: str = None) -> List[Dict[str, Any]]:
+        """ค้นหาการร้องเรียนจากประเภทปัญหา รายละเอียด และข้อความตอบกลับ
+        
+        เรียงตามคะแนนความเกี่ยวข้อง คะแนนเท่ากันเรียงตามวันที่ล่าสุด
+        """
+        scores = self.search_index.search(query, self.SEARCH_WEIGHTS, self._search_texts)
+        # เลือกเฉพาะ limit อันดับแรกด้วย heap แทนการเรียงผลทั้งหมด
+        ranked = heapq.nlargest(
+            max(limit, 0),
+            (complaint_id for complaint_id in scores
+             if complaint_id in self._complaint_index
+             and (status is None or self._complaint_index[complaint_id]['status'] == status)),
+            key=lambda cid: (scores[cid], self._complaint_keys[cid])
+        )
+        return [self._complaint_index[cid] for cid in ranked]
+    
+    def _search_texts(self, complaint_ids: List[str], field: str) -> List[str]:
+        """ข้อความของฟิลด์ที่ทำดัชนีค้นหาไว้ของหลายการร้องเรียน ใช้ตรวจผลจาก n-gram
+        
+        response_text รวมข้อความของทุกการตอบกลับ ข้อความที่ยังไม่ได้อ่านอ่านจากไฟล์ในครั้งเดียว
+        """
+        if field == 'response_text':
+            groups = [self._responses_by_complaint.get(cid, ()) for cid in complaint_ids]
+            texts = iter(ResponseRecord.field_values([r for group in groups for r in group], field))
+            return ['\n'.join(itertools.islice(texts, len(group))) for group in groups]
+        complaints = [self._complaint_index.get(cid) for cid in complaint_ids]
+        found = ComplaintRecord.field_values([c for c in complaints if c is not None], field)
+        texts = iter(found)
+        return [next(texts) if complaint is not None else '' for complaint in complaints]
+    
+    def query_complaints(self, status: str = None, canteen_id: str = None, stall_id: str = None,
+                         problem_type: str = None, start=None, end=None, sort: str = 'newest',
+                         offset: int = 0, limit: int = None) -> Dict[str, Any]:
+        """ค้นการร้องเรียนที่ตรงทุกเงื่อนไขที่ระบุ (None = ไม่กรองฟิลด์นั้น)
+        
+        start/end คือช่วงวันที่ (รวมทั้งสองวัน) sort เป็นค่าหนึ่งใน QUERY_SORTS คืน
+        {'complaints': รายการตั้งแต่ offset ไม่เกิน limit รายการ, 'total': จำนวนที่ตรงทั้งหมด}
+        
+        เงื่อนไขของฟิลด์ถูกตอบด้วย intersection ของ posting list (เริ่มจากชุดเล็กสุด)
+        แทนการวนทุกรายการ ถ้าผลเป็นส่วนใหญ่ของช่วงวันที่ จะเดินลำดับตามวันที่แล้วหยุด
+        เมื่อครบหน้าแทนการเรียงผลทั้งหมด
+        """
+        if sort not in self.QUERY_SORTS:
+            raise ValueError(f"ไม่รู้จักการเรียงลำดับ {sort}")
+        offset = max(offset, 0)
+        stop = None if limit is None else offset + max(limit, 0)
+        by_date = self._by_date
+        low, high = self._date_bounds(start, end)
+        high = max(high, low)
+        matched = self._match_postings(status, canteen_id, stall_id, problem_type)
+        
+        if matched is None:
+            # ไม่มีเงื่อนไขของฟิลด์ ผลคือช่วงต่อเนื่องใน _by_date
+            if sort == 'oldest':
+                complaints = by_date[low:high][offset:stop]
+            elif sort == 'newest':
+                complaints = by_date[low:high][::-1][offset:stop]
+            else:
+                complaints = sorted(by_date[low:high][::-1], key=itemgetter(sort))[offset:stop]
+            return {'complaints': complaints, 'total': high - low}
+        
+        keys = self._complaint_keys
+        if low == 0 and high == len(by_date):
+            in_range = matched
+        elif low == high:
+            in_range = []
+        else:
+            first, last = self._date_keys[low], self._date_keys[high - 1]
+            in_range = [cid for cid in matched if first <= keys[cid] <= last]
+        total = len(in_range)
+        
+        if sort in ('newest', 'oldest') and total * self.QUERY_SCAN_RATIO > high - low:
+            # ผลหนาแน่น: เดินตามวันที่และหยุดเมื่อครบหน้า
+            indexes = range(high - 1, low - 1, -1) if sort == 'newest' else range(low, high)
+            walk = (by_date[i] for i in indexes if by_date[i]['complaint_id'] in matched)
+            return {'complaints': list(itertools.islice(walk, offset, stop)), 'total': total}
+        
+        ordered = sorted(in_range, key=keys.__getitem__, reverse=sort != 'oldest')
+        if sort in ('newest', 'oldest'):
+            complaints = [self._complaint_index[cid] for cid in ordered[offset:stop]]
+        else:
+            complaints = sorted((self._complaint_index[cid] for cid in ordered), key=itemgetter(sort))
+            complaints = complaints[offset:stop]
+        return {'complaints': complaints, 'total': total}
+    
+    def _match_postings(self, status: str, canteen_id: str, stall_id: str,
+                        problem_type: str) -> Set[str] or None:
+        """ชุด complaint_id ที่ตรงเงื่อนไขของฟิลด์ (None = ไม่มีเงื่อนไข ห้ามแก้ไขชุดที่คืน)
+        
+        โรงอาหารไม่มี posting list ของตัวเอง จึงใช้ union ของ posting list ของร้านในโรงอาหาร
+        """
+        postings = [
+            self._postings[field].get(value, set())
+            for field, value in (('status', status), ('stall_id', stall_id), ('problem_type', problem_type))
+            if value is not None
+        ]
+        matched = None
+        if postings:
+            postings.sort(key=len)
+            matched = postings[0].intersection(*postings[1:]) if len(postings) > 1 else postings[0]
+        if canteen_id is not None:
+            stall_postings = [
+                self._postings['stall_id'].get(stall['stall_id'], set())
+                for stall in self.get_stalls_by_canteen(canteen_id)
+            ]
+            if matched is None:
+                matched = set().union(*stall_postings)
+            else:
+                matched = set().union(*(matched & stall_set for stall_set in stall_postings))
+        return matched
+    
+    def get_problem_types(self) -> List[str]:
+        """ประเภทปัญหาทั้งหมดที่มีการร้องเรียน (เรียงตามตัวอักษร)"""
+        return sorted(value for value, ids in self._postings['problem_type'].items() if ids)
     
     def add_complaint(self, stall_id: str, problem_type: str, description: str) -> str:
         """เพิ่มการร้องเรียนใหม่"""
-        new_id = f"C{len(self.complaints) + 1:03d}"
-        new_complaint = {
-            'complaint_id': new_id,
-            'stall_id': stall_id,
-            'complaint_date': datetime.now().strftime('%Y-%m-%d'),
-            'problem_type': problem_type,
-            'complaint_description': description,
-            'status': 'รอดำเนินการ'
-        }
-        self.complaints.append(new_complaint)
-        self.save_complaints()
+        with self.lock:
+            # รวมรายการของ instance อื่นก่อนเพื่อไม่ให้ได้ ID ซ้ำกัน
+            self._sync_external()
+            new_id = self._allocate_ids('C', self._complaint_index, 1)[0]
+            new_complaint = ComplaintRecord(
+                complaint_id=new_id,
+                stall_id=stall_id,
+                complaint_date=datetime.now().strftime('%Y-%m-%d'),
+                problem_type=problem_type,
+                complaint_description=description,
+                status='รอดำเนินการ'
+            )
+            self._insert_complaint(new_complaint)
+            self._record_change({'op': 'add_complaint', 'record': new_complaint.to_dict()})
         return new_id
     
+    def add_complaints(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """เพิ่มการร้องเรียนหลายรายการในครั้งเดียว (เช่นนำเข้าจากแบบฟอร์มกระดาษ) คืน ID ตามลำดับแถว
+        
+        แถวใช้ฟิลด์เดียวกับ complaints.csv ยกเว้น complaint_id (ดู prepare_complaint_rows)
+        ตรวจทุกแถวก่อนเพิ่ม ถ้ามีแถวผิดจะโยน ImportValidationError และไม่เพิ่มรายการใด
+        ชุดเล็กเขียนลง journal ครั้งเดียว ชุดที่ใหญ่ถึง COMPACT_THRESHOLD ต่อท้าย
+        complaints.csv โดยตรงแทนการเขียน journal แล้วรวมไฟล์ทั้งไฟล์อีกรอบ
+        """
+        prepared = prepare_complaint_rows(
+            rows, self._stall_index, self.STATUSES, datetime.now().strftime('%Y-%m-%d')
+        )
+        if not prepared:
+            return []
+        with self.lock:
+            self._sync_external()
+            new_ids = self._allocate_ids('C', self._complaint_index, len(prepared))
+            complaints = []
+            for new_id, values in zip(new_ids, prepared):
+                values['complaint_id'] = new_id
+                complaints.append(ComplaintRecord.from_dict(values))
+            self._insert_complaints(complaints)
+            if len(complaints) >= self.COMPACT_THRESHOLD:
+                self._append_complaints(complaints)
+            else:
+                self._record_changes([
+                    {'op': 'add_complaint', 'record': complaint.to_dict()} for complaint in complaints
+                ])
+        return new_ids
+    
+    def _append_complaints(self, complaints: List[ComplaintRecord]):
+        """ต่อท้าย complaints.csv ด้วยการร้องเรียนใหม่ในครั้งเดียว (เรียกภายใต้ self.lock)
+        
+        รายการใน journal ที่ยังไม่รวมเข้า CSV ยังคงอยู่ใน journal ตามเดิม หลังเขียนแล้ว
+        รายละเอียดจะอ่านจากไฟล์แทนการเก็บไว้ในหน่วยความจำ เหมือนแถวที่โหลดจาก CSV
+        ไม่บันทึก snapshot ทุกชุด (ต้องเขียนข้อมูลทั้งหมดใหม่) แต่เขียนครั้งเดียวตอน compact
+        snapshot เดิมใช้ไม่ได้เองเพราะลายเซ็นของ CSV เปลี่ยน
+        """
+        self.complaint_store.append(ComplaintRecord.FIELDS, complaints)
+        for complaint in complaints:
+            complaint.complaint_description = None
+            complaint._store = self.complaint_store
+        self._mark_synced()
+        self._snapshot_stale = True
+    
+    def _allocate_ids(self, prefix: str, index: Dict[str, Any], count: int) -> List[str]:
+        """จอง ID ใหม่ count รายการต่อจากจำนวนรายการเดิม โดยข้าม ID ที่มีอยู่แล้ว
+        
+        เลขขยายเกิน 3 หลักได้ (C999 -> C1000) และตรวจกับดัชนีทุกตัว จึงไม่ซ้ำแม้ข้อมูล
+        เดิมมีเลขข้ามหรือเลขที่กว้างกว่า 3 หลักอยู่แล้ว
+        """
+        new_ids = []
+        number = len(index)
+        while len(new_ids) < count:
+            number += 1
+            new_id = f"{prefix}{number:03d}"
+            if new_id not in index:
+                new_ids.append(new_id)
+        return new_ids
+    
+    def _insert_complaints(self, complaints: List[Dict[str, Any]]):
+        """เพิ่มการร้องเรียนหลายรายการเข้าหน่วยความจำและดัชนี
+        
+        ชุดที่มีอย่างน้อย BULK_INSERT_MIN รายการ จะเรียงรายการใหม่ตามวันที่แล้วรวมกับ
+        ลำดับเดิมครั้งเดียว (คัดลอกช่วงระหว่างตำแหน่งที่แทรก) และนับแนวโน้มเป็นกลุ่ม
+        แทนการแทรกทีละรายการซึ่งต้องเลื่อน list ทุกครั้ง
+        """
+        if len(complaints) < self.BULK_INSERT_MIN:
+            for complaint in complaints:
+                self._insert_complaint(complaint)
+            return
+        self.generation += 1
+        keyed = []
+        groups = Counter()
+        for complaint in complaints:
+            self.complaints.append(complaint)
+            self._complaint_index[complaint['complaint_id']] = complaint
+            key = self._date_key(complaint)
+            keyed.append((key, complaint))
+            self._count_complaint(complaint, 1)
+            self._index_postings(complaint)
+            stall_id = complaint['stall_id']
+            groups[(key[0], stall_id, self._canteen_id_of(stall_id), complaint['status'])] += 1
+            self._index_complaint_text(complaint)
+        keyed.sort(key=itemgetter(0))
+        date_keys = []
+        by_date = []
+        low = 0
+        for key, complaint in keyed:
+            position = bisect.bisect_left(self._date_keys, key, low)
+            date_keys.extend(self._date_keys[low:position])
+            date_keys.append(key)
+            by_date.extend(self._by_date[low:position])
+            by_date.append(complaint)
+            low = position
+        date_keys.extend(self._date_keys[low:])
+        by_date.extend(self._by_date[low:])
+        self._date_keys = date_keys
+        self._by_date = by_date
+        self.time_index.add_many(groups)
+    
+    def _insert_complaint(self, complaint: Dict[str, Any]):
+        """เพิ่มการร้องเรียนเข้าหน่วยความจำและดัชนี"""
+        self.generation += 1
+        self.complaints.append(complaint)
+        self._complaint_index[complaint['complaint_id']] = complaint
+        key = self._date_key(complaint)
+        position = bisect.bisect_left(self._date_keys, key)
+        self._date_keys.insert(position, key)
+        self._by_date.insert(position, complaint)
+        self._count_complaint(complaint, 1)
+        self._index_postings(complaint)
+        self.time_index.add(
+            key[0], complaint['stall_id'], self._canteen_id_of(complaint['stall_id']), complaint['status']
+        )
+        self._index_complaint_text(complaint)
+    
+    def _apply_status(self, complaint: Dict[str, Any], status: str):
+        """เปลี่ยนสถานะของการร้องเรียนในหน่วยความจำ"""
+        old_status = complaint['status']
+        if old_status == status:
+            return
+        self.generation += 1
+        complaint['status'] = status
+        status_postings = self._postings['status']
+        status_postings[old_status].discard(complaint['complaint_id'])
+        status_postings.setdefault(status, set()).add(complaint['complaint_id'])
+        self._count_status_change(complaint, old_status, status)
+    
     def update_complaint_status(self, complaint_id: str, status: str):
         """อัปเดตสถานะการร้องเรียน"""
-        complaint = self.get_complaint_by_id(complaint_id)
-        if complaint:
-            complaint['status'] = status
-            self.save_complaints()
+        with self.lock:
+            self._sync_external()
+            complaint = self.get_complaint_by_id(complaint_id)
+            if complaint:
+                self._apply_status(complaint, status)
+                self._record_change({
+                    'op': 'update_status',
+                    'complaint_id': complaint_id,
+                    'status': status
+                })
     
     # ===== Response Operations =====
     def get_responses_by_complaint(self, complaint_id: str) -> List[Dict[str, Any]]:
         """ดึงการตอบกลับทั้งหมดของการร้องเรียนหนึ่ง"""
-        responses = [r for r in self.responses if r['complaint_id'] == complaint_id]
+        responses = self._responses_by_complaint.get(complaint_id, [])
         # เรียงตามวันที่
         return sorted(responses, key=lambda x: x['response_date'])
     
+    def iter_responses(self) -> Iterator[Dict[str, Any]]:
+        """วนการตอบกลับทั้งหมดตามลำดับที่เพิ่มทีละรายการ (สำหรับ export)"""
+        yield from self.responses
+    
     def add_response(self, complaint_id: str, response_text: str, response_date: str = None) -> str:
         """เพิ่มการตอบกลับการร้องเรียน"""
         if response_date is None:
             response_date = datetime.now().strftime('%Y-%m-%d')
         
-        new_response_id = f"R{len(self.responses) + 1:03d}"
-        new_response = {
-            'response_id': new_response_id,
-            'complaint_id': complaint_id,
-            'response_date': response_date,
-            'response_text': response_text
-        }
-        self.responses.append(new_response)
-        self.save_responses()
-        
-        # อัปเดตสถานะเป็น "ดำเนินการแล้ว"
-        self.update_complaint_status(complaint_id, 'ดำเนินการแล้ว')
+        with self.lock:
+            self._sync_external()
+            new_response_id = self._allocate_ids('R', self._response_index, 1)[0]
+            new_response = ResponseRecord(
+                response_id=new_response_id,
+                complaint_id=complaint_id,
+                response_date=response_date,
+                response_text=response_text
+            )
+            self._insert_response(new_response)
+            self._record_change({'op': 'add_response', 'record': new_response.to_dict()})
+            
+            # อัปเดตสถานะเป็น "ดำเนินการแล้ว"
+            self.update_complaint_status(complaint_id, 'ดำเนินการแล้ว')
         
         return new_response_id
     
+    def _insert_response(self, response: Dict[str, Any]):
+        """เพิ่มการตอบกลับเข้าหน่วยความจำและดัชนี"""
+        self.generation += 1
+        self.responses.append(response)
+        self._index_response(response)
+        self._index_response_text(response)
+    
     # ===== Statistics Operations =====
-    def get_stall_complaint_summary(self) -> List[Dict[str, Any]]:
-        """ดึงข้อมูลร้านทั้งหมด และจำนวนการร้องเรียนแต่ละสัถานะ"""
-        # เริ่มจากร้านทั้งหมด (0 ร้องเรียน)
-        stall_stats = {}
+    def _new_status_count(self) -> Dict[str, int]:
+        """สร้างตัวนับจำนวนการร้องเรียนแยกตามสถานะ"""
+        return {status: 0 for status in self.STATUSES}
+    
+    def _rebuild_summaries(self, groups: Dict[Tuple[date, str, str], int] = None):
+        """สร้างตัวนับสรุปของร้านและโรงอาหาร และตัวนับตามช่วงเวลาใหม่ทั้งหมด
+        
+        groups: จำนวนการร้องเรียนต่อ (วันที่, ร้าน, สถานะ) ถ้าไม่ระบุจะนับจาก self.complaints
+        ตัวนับถูกปรับครั้งเดียวต่อกลุ่ม ไม่ใช่ทีละการร้องเรียน
+        """
+        # เริ่มจากร้านและโรงอาหารทั้งหมด (0 ร้องเรียน)
+        self._stall_stats = {}
         for stall in self.stalls:
             stall_id = stall['stall_id']
-            stall_stats[stall_id] = {
+            self._stall_stats[stall_id] = {
                 'stall_id': stall_id,
                 'stall_name': stall['stall_name'],
                 'complaint_count': 0,
-                'status_count': {'รอดำเนินการ': 0, 'ดำเนินการแล้ว': 0}
+                'status_count': self._new_status_count()
             }
         
-        # เพิ่มจำนวนร้องเรียน
-        for complaint in self.complaints:
-            stall_id = complaint['stall_id']
-            if stall_id in stall_stats:
-                stall_stats[stall_id]['complaint_count'] += 1
-                status = complaint['status']
-                if status in stall_stats[stall_id]['status_count']:
-                    stall_stats[stall_id]['status_count'][status] += 1
-        
-        # เรียงตามจำนวนการร้องเรียนมากไปน้อย
-        return sorted(stall_stats.values(), key=lambda x: x['complaint_count'], reverse=True)
-    
-    def get_canteen_summary(self) -> List[Dict[str, Any]]:
-        """ดึงข้อมูลโรงอาหารทั้งหมด และจำนวนการร้องเรียน"""
-        # เริ่มจากโรงอาหารทั้งหมด (0 ร้องเรียน)
-        canteen_stats = {}
+        self._canteen_stats = {}
         for canteen in self.canteens:
             canteen_id = canteen['canteen_id']
-            canteen_stats[canteen_id] = {
+            self._canteen_stats[canteen_id] = {
                 'canteen_id': canteen_id,
                 'canteen_name': canteen['canteen_name'],
                 'location': canteen['location'],
-                'complaint_count': 0
+                'complaint_count': 0,
+                'status_count': self._new_status_count()
             }
         
-        # นับจำนวนร้องเรียนจากแต่ละโรงอาหาร
-        for complaint in self.complaints:
-            stall = self.get_stall_by_id(complaint['stall_id'])
-            if stall:
-                canteen_id = stall['canteen_id']
-                if canteen_id in canteen_stats:
-                    canteen_stats[canteen_id]['complaint_count'] += 1
+        if groups is None:
+            keys = self._complaint_keys
+            groups = Counter(
+                (keys[c['complaint_id']][0], c['stall_id'], c['status']) for c in self.complaints
+            )
+        self._status_totals = {}
+        for (_, stall_id, status), count in groups.items():
+            self._count_stall_status(stall_id, status, count)
+        self._rebuild_time_index(groups)
+    
+    def _rebuild_time_index(self, groups: Dict[Tuple[date, str, str], int]):
+        """สร้างตัวนับตามช่วงเวลาใหม่ทั้งหมดจากจำนวนการร้องเรียนต่อ (วันที่, ร้าน, สถานะ)
+        
+        จำนวนครั้งที่ต้องปรับตัวนับจึงขึ้นกับจำนวนวันและร้าน ไม่ใช่จำนวนการร้องเรียน
+        """
+        self.time_index = TimeBucketIndex()
+        canteen_ids = {s['stall_id']: s['canteen_id'] for s in self.stalls}
+        self.time_index.add_many({
+            (day, stall_id, canteen_ids.get(stall_id, ''), status): count
+            for (day, stall_id, status), count in groups.items()
+        })
+    
+    def _canteen_id_of(self, stall_id: str) -> str:
+        """รหัสโรงอาหารของร้าน (ว่างถ้าไม่พบร้าน)"""
+        stall = self._stall_index.get(stall_id)
+        return stall['canteen_id'] if stall else ''
+    
+    def _summary_entries(self, stall_id: str) -> List[Dict[str, Any]]:
+        """ดึงตัวนับของร้านและโรงอาหารที่การร้องเรียนของร้านนี้ต้องนับรวม"""
+        entries = []
+        stall_stats = self._stall_stats.get(stall_id)
+        if stall_stats:
+            entries.append(stall_stats)
+        stall = self._stall_index.get(stall_id)
+        if stall:
+            canteen_stats = self._canteen_stats.get(stall['canteen_id'])
+            if canteen_stats:
+                entries.append(canteen_stats)
+        return entries
+    
+    def _count_complaint(self, complaint: Dict[str, Any], delta: int):
+        """ปรับตัวนับสรุปเมื่อเพิ่ม (delta=1) หรือลบ (delta=-1) การร้องเรียน"""
+        self._count_stall_status(complaint['stall_id'], complaint['status'], delta)
+    
+    def _count_stall_status(self, stall_id: str, status: str, delta: int):
+        """ปรับตัวนับสรุปของสถานะ ร้าน และโรงอาหารของร้าน ทีละ delta รายการ"""
+        self._status_totals[status] = self._status_totals.get(status, 0) + delta
+        for stats in self._summary_entries(stall_id):
+            stats['complaint_count'] += delta
+            if status in stats['status_count']:
+                stats['status_count'][status] += delta
+    
+    def _count_status_change(self, complaint: Dict[str, Any], old_status: str, new_status: str):
+        """ย้ายตัวนับจากสถานะเดิมไปสถานะใหม่"""
+        self._status_totals[old_status] = self._status_totals.get(old_status, 0) - 1
+        self._status_totals[new_status] = self._status_totals.get(new_status, 0) + 1
+        for stats in self._summary_entries(complaint['stall_id']):
+            status_count = stats['status_count']
+            if old_status in status_count:
+                status_count[old_status] -= 1
+            if new_status in status_count:
+                status_count[new_status] += 1
+        stall_id = complaint['stall_id']
+        self.time_index.move_status(
+            self._complaint_keys[complaint['complaint_id']][0],
+            stall_id, self._canteen_id_of(stall_id), old_status, new_status
+        )
+    
+    @staticmethod
+    def _copy_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+        """คัดลอกตัวนับเพื่อไม่ให้ผู้เรียกแก้ไขข้อมูลภายใน"""
+        copied = dict(stats)
+        copied['status_count'] = dict(stats['status_count'])
+        return copied
+    
+    def get_stall_complaint_summary(self) -> List[Dict[str, Any]]:
+        """ดึงข้อมูลร้านทั้งหมด และจำนวนการร้องเรียนแต่ละสัถานะ"""
+        stall_stats = [self._copy_stats(s) for s in self._stall_stats.values()]
+        # เรียงตามจำนวนการร้องเรียนมากไปน้อย
+        return sorted(stall_stats, key=lambda x: x['complaint_count'], reverse=True)
+    
+    def get_stall_summary_by_id(self, stall_id: str) -> Dict[str, Any] or None:
+        """ดึงตัวนับการร้องเรียนของร้านหนึ่ง"""
+        stats = self._stall_stats.get(stall_id)
+        return self._copy_stats(stats) if stats else None
+    
+    def get_canteen_summary_by_id(self, canteen_id: str) -> Dict[str, Any] or None:
+        """ดึงตัวนับการร้องเรียนของโรงอาหารหนึ่ง"""
+        stats = self._canteen_stats.get(canteen_id)
+        return self._copy_stats(stats) if stats else None
+    
+    def get_trend(self, granularity: str, dimension: str = 'all', start=None, end=None,
+                  status: str = None) -> List[Dict[str, Any]]:
+        """จำนวนการร้องเรียนต่อวัน/สัปดาห์/เดือน จากตัวนับที่รวมไว้ล่วงหน้า
+        
+        dimension: 'all' (รวม), 'stall' หรือ 'canteen' คืน list ของ
+        {'bucket': 'YYYY-MM-DD' (วันแรกของช่วง), 'counts': {key: จำนวน}}
+        """
+        buckets = self.time_index.counts(
+            granularity, dimension, self._as_date(start), self._as_date(end), status
+        )
+        return [{'bucket': b['bucket'].isoformat(), 'counts': b['counts']} for b in buckets]
+    
+    def get_canteen_summary(self) -> List[Dict[str, Any]]:
+        """ดึงข้อมูลโรงอาหารทั้งหมด และจำนวนการร้องเรียน"""
+        canteen_stats = [self._copy_stats(c) for c in self._canteen_stats.values()]
+        return sorted(canteen_stats, key=lambda x: x['complaint_count'], reverse=True)
+    
+    def get_top_offenders(self, dimension: str = 'stall', metric: str = 'total', limit: int = 10,
+                          days: int = 30, end=None) -> List[Dict[str, Any]]:
+        """ร้าน (dimension='stall') หรือโรงอาหาร ('canteen') ที่มีการร้องเรียนมากที่สุด limit อันดับ
         
-        return sorted(canteen_stats.values(), key=lambda x: x['complaint_count'], reverse=True)
+        metric: 'total' จำนวนทั้งหมด, 'pending' จำนวนที่รอดำเนินการ หรือ 'recent' จำนวนใน
+        days วันล่าสุดถึงวันที่ end (None = วันนี้) คืนข้อมูลสรุปเหมือน get_stall_summary_by_id
+        พร้อม 'rank' และ 'count' (ค่าที่ใช้จัดอันดับ) เลือกด้วย heap จากตัวนับที่อัปเดต
+        ทีละรายการ จึงไม่ต้องเรียงทุกร้านหรือไล่การร้องเรียน
+        """
+        check_ranking(dimension, metric, days)
+        stats = self._stall_stats if dimension == 'stall' else self._canteen_stats
+        if metric == 'total':
+            count_of = itemgetter('complaint_count')
+        elif metric == 'pending':
+            count_of = lambda entry: entry['status_count'][self.STATUSES[0]]
+        else:
+            start, end = recent_window(days, self._as_date(end))
+            counts = self.time_index.window_counts(dimension, start, end)
+            id_field = f'{dimension}_id'
+            count_of = lambda entry: counts.get(entry[id_field], 0)
+        return [
+            dict(self._copy_stats(entry), rank=rank, count=count)
+            for rank, (entry, count) in enumerate(top_entries(stats.values(), count_of, limit), 1)
+        ]
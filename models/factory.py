@@ -0,0 +1,15 @@
+import os
+
+import config
+from models.complaint_model import ComplaintModel
+
+
+def create_model():
+    """สร้าง Model ตามระบบจัดเก็บข้อมูลที่ตั้งค่าไว้ใน config (ไม่ต้องใช้ tkinter)"""
+    if config.STORAGE_BACKEND == "sqlite":
+        from models.sqlite_model import SQLiteComplaintModel, migrate_csv_to_sqlite
+        # ย้ายข้อมูลจาก CSV อัตโนมัติเมื่อยังไม่มีฐานข้อมูล
+        if not os.path.exists(config.SQLITE_PATH):
+            migrate_csv_to_sqlite(config.DATA_DIR, config.SQLITE_PATH)
+        return SQLiteComplaintModel(config.SQLITE_PATH)
+    return ComplaintModel(data_dir=config.DATA_DIR, load_workers=config.LOAD_WORKERS or None)
@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows ไม่มี fcntl ใช้ msvcrt.locking แทน
+    fcntl = None
+    import msvcrt
+
+
+class LockTimeout(TimeoutError):
+    """รอ lock ของโฟลเดอร์ข้อมูลนานเกินกำหนด (instance อื่นกำลังเขียนอยู่)"""
+
+
+class DataDirLock:
+    """Lock ระหว่าง process สำหรับการเขียนไฟล์ในโฟลเดอร์ข้อมูลที่ใช้ร่วมกัน
+    
+    ใช้ advisory lock บนไฟล์ .lock ในโฟลเดอร์ข้อมูล และ RLock สำหรับ thread ใน
+    process เดียวกัน จึงเรียกซ้อนกันได้ใน thread เดียว (เช่น compact -> save_complaints)
+    """
+    
+    FILENAME = ".lock"
+    # เวลารอ lock สูงสุด (วินาที) และระยะห่างระหว่างการลองใหม่
+    TIMEOUT = 30.0
+    RETRY_INTERVAL = 0.01
+    
+    def __init__(self, data_dir: str):
+        self.path = os.path.join(data_dir, self.FILENAME)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        # จำนวนงานที่ขอให้คงล็อกไฟล์ไว้หลัง thread ปล่อย lock (ดู retain)
+        self._retained = 0
+        self._file = None
+    
+    def acquire(self, timeout: float = None) -> bool:
+        """รอ lock ไม่เกิน timeout วินาที (0 = ลองครั้งเดียว) คืน False ถ้าไม่ได้ lock"""
+        if timeout is None:
+            timeout = self.TIMEOUT
+        deadline = time.monotonic() + timeout
+        if timeout > 0:
+            acquired = self._thread_lock.acquire(timeout=timeout)
+        else:
+            acquired = self._thread_lock.acquire(blocking=False)
+        if not acquired:
+            return False
+        if self._file is None:
+            try:
+                locked = self._lock_file(deadline)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+            if not locked:
+                self._thread_lock.release()
+                return False
+        self._depth += 1
+        return True
+    
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0 and not self._retained:
+            self._unlock_file()
+        self._thread_lock.release()
+    
+    def retain(self):
+        """คงล็อกไฟล์ไว้หลังปล่อย lock จนกว่าจะเรียก release_retained (เรียกขณะถือ lock)
+        
+        ใช้เมื่อส่งงานเขียนต่อให้ thread อื่น: thread ใน process เดียวกันใช้ lock ได้ตามปกติ
+        แต่ instance อื่นต้องรอจนงานนั้นเขียนเสร็จ
+        """
+        self._retained += 1
+    
+    def release_retained(self):
+        """ยกเลิก retain หนึ่งครั้ง และปล่อยล็อกไฟล์ถ้าไม่มี thread ใดถือ lock อยู่"""
+        with self._thread_lock:
+            self._retained -= 1
+            if self._depth == 0 and not self._retained:
+                self._unlock_file()
+    
+    def __enter__(self) -> 'DataDirLock':
+        if not self.acquire():
+            raise LockTimeout(f"รอ lock ของ {self.path} นานเกิน {self.TIMEOUT} วินาที")
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+    
+    def _lock_file(self, deadline: float) -> bool:
+        """ล็อกไฟล์ .lock แบบไม่รอ และลองใหม่จนถึง deadline"""
+        file = open(self.path, 'a+b')
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                if time.monotonic() >= deadline:
+                    file.close()
+                    return False
+                time.sleep(self.RETRY_INTERVAL)
+                continue
+            self._file = file
+            return True
+    
+    def _unlock_file(self):
+        try:
+            if fcntl:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,141 @@
+import json
+import os
+from typing import List, Dict, Any, Iterator
+
+
+class ComplaintJournal:
+    """Journal แบบ append-only สำหรับบันทึกการเปลี่ยนแปลงของระบบร้องเรียน
+    
+    แต่ละบรรทัดคือ JSON หนึ่งรายการ เช่น
+    {"op": "add_complaint", "record": {...}}
+    {"op": "add_response", "record": {...}}
+    {"op": "update_status", "complaint_id": "C001", "status": "..."}
+    
+    journal ใช้ร่วมกันระหว่าง instance ที่เปิดโฟลเดอร์ข้อมูลเดียวกัน position คือ
+    ตำแหน่ง (ไบต์) ที่ instance นี้อ่านหรือเขียนถึงแล้ว ส่วนที่เกินมาคือรายการของ
+    instance อื่น (ต้องอ่านและเขียนภายใต้ DataDirLock)
+    """
+    
+    FILENAME = "journal.jsonl"
+    
+    def __init__(self, data_dir: str):
+        self.path = os.path.join(data_dir, self.FILENAME)
+        self.entry_count = 0
+        self.position = 0
+        # True เมื่อพบบรรทัดที่เสียหาย ต้องรวมไฟล์ใหม่ก่อนเขียนต่อท้าย
+        self.needs_repair = False
+    
+    def exists(self) -> bool:
+        """ตรวจสอบว่ามีไฟล์ journal ค้างอยู่หรือไม่"""
+        return os.path.exists(self.path)
+    
+    def size(self) -> int:
+        """ขนาดไฟล์ journal ปัจจุบัน (0 ถ้าไม่มีไฟล์)"""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+    
+    def append(self, entry: Dict[str, Any], sync: bool = True):
+        """เขียนรายการใหม่ต่อท้าย journal (ต้นทุน I/O คงที่)
+        
+        sync=False ไม่รอ fsync (ผู้เรียกสั่ง sync() ภายหลังใน thread เบื้องหลัง)
+        """
+        self.append_many([entry], sync)
+    
+    def append_many(self, entries: List[Dict[str, Any]], sync: bool = True):
+        """เขียนหลายรายการต่อท้าย journal ด้วยการเขียนไฟล์ครั้งเดียว"""
+        if not entries:
+            return
+        data = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries).encode('utf-8')
+        with open(self.path, 'a+b') as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() > 0:
+                # บรรทัดที่เขียนไม่ครบจาก instance ที่ปิดกะทันหันต้องไม่ต่อกับรายการใหม่
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    data = b'\n' + data
+            file.write(data)
+            file.flush()
+            if sync:
+                os.fsync(file.fileno())
+            self.position = file.tell()
+        self.entry_count += len(entries)
+    
+    def sync(self):
+        """fsync ไฟล์ journal (เรียกจาก thread เบื้องหลังหลัง append(sync=False))"""
+        try:
+            fd = os.open(self.path, os.O_RDONLY)
+        except FileNotFoundError:
+            # journal ถูกรวมเข้า CSV ไปแล้ว
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """อ่านรายการทั้งหมดใน journal ตามลำดับ"""
+        self.entry_count = 0
+        self.position = 0
+        self.needs_repair = False
+        yield from self.read_new()
+    
+    def read_new(self) -> Iterator[Dict[str, Any]]:
+        """อ่านรายการที่ถูกเขียนต่อท้ายหลัง position (เช่นจาก instance อื่น)
+        
+        ถ้าไฟล์สั้นกว่า position (ถูกรวมและเริ่มใหม่) จะอ่านตั้งแต่ต้นไฟล์
+        """
+        if not os.path.exists(self.path):
+            self.position = 0
+            return
+        with open(self.path, 'rb') as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() < self.position:
+                self.position = 0
+            file.seek(self.position)
+            data = file.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            # บรรทัดสุดท้ายเขียนไม่ครบเมื่อโปรแกรมปิดกะทันหัน
+            self.needs_repair = True
+        self.position += end
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line.decode('utf-8'))
+            except ValueError:
+                self.needs_repair = True
+                continue
+            self.entry_count += 1
+            yield entry
+    
+    def discard_through(self, position: int):
+        """ลบรายการตั้งแต่ต้นไฟล์ถึง position ที่รวมเข้า CSV แล้ว เก็บส่วนที่เขียนต่อท้ายภายหลังไว้"""
+        if not os.path.exists(self.path):
+            self.position = 0
+            return
+        with open(self.path, 'rb') as file:
+            file.seek(position)
+            remaining = file.read()
+        if not remaining.strip():
+            self.clear()
+            return
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(remaining)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+        self.position = max(self.position - position, 0)
+        self.entry_count = remaining.count(b'\n')
+    
+    def clear(self):
+        """ล้าง journal หลังจากรวมข้อมูลกลับเข้าไฟล์ CSV แล้ว"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.entry_count = 0
+        self.position = 0
+        self.needs_repair = False
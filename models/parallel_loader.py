@@ -0,0 +1,167 @@
+import csv
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Tuple
+
+from models.record_store import OffsetLineReader
+from models.search_index import TextSearchIndex
+
+
+# ขนาดบล็อกที่อ่านระหว่างนับเครื่องหมายคำพูดเพื่อหาจุดแบ่งไฟล์
+SCAN_BLOCK_SIZE = 1 << 20
+
+
+def read_header(path: str) -> Tuple[List[str], int]:
+    """อ่านหัวตาราง CSV คืน (ชื่อคอลัมน์, ตำแหน่งไบต์ที่ข้อมูลแถวแรกเริ่ม)"""
+    with open(path, 'rb') as file:
+        lines = OffsetLineReader(file)
+        fieldnames = next(csv.reader(lines), [])
+        return fieldnames, lines.position
+
+
+def find_record_boundaries(path: str, start: int, parts: int) -> List[int]:
+    """แบ่งไฟล์ตั้งแต่ start เป็นช่วงไบต์ที่ไม่ตัดกลาง record
+    
+    ขึ้นบรรทัดใหม่จะเป็นขอบเขตของ record ก็ต่อเมื่อจำนวนเครื่องหมาย " ก่อนหน้า
+    เป็นเลขคู่ (อยู่นอกข้อความในเครื่องหมายคำพูด) จึงรองรับรายละเอียดหลายบรรทัด
+    """
+    size = os.path.getsize(path)
+    if parts <= 1 or size <= start:
+        return [start, size]
+    
+    step = (size - start) // parts
+    targets = [start + step * i for i in range(1, parts)]
+    boundaries = [start]
+    quotes = 0
+    position = start
+    with open(path, 'rb') as file:
+        file.seek(start)
+        for target in targets:
+            if target <= boundaries[-1]:
+                continue
+            # นับเครื่องหมายคำพูดจนถึงจุดเป้าหมาย
+            while position < target:
+                block = file.read(min(SCAN_BLOCK_SIZE, target - position))
+                if not block:
+                    break
+                quotes += block.count(b'"')
+                position += len(block)
+            # หาขึ้นบรรทัดใหม่ถัดไปที่อยู่นอกเครื่องหมายคำพูด
+            boundary = None
+            while boundary is None:
+                block = file.read(SCAN_BLOCK_SIZE)
+                if not block:
+                    break
+                offset = 0
+                while True:
+                    newline = block.find(b'\n', offset)
+                    if newline < 0:
+                        quotes += block.count(b'"', offset)
+                        position += len(block)
+                        break
+                    quotes += block.count(b'"', offset, newline)
+                    offset = newline + 1
+                    if quotes % 2 == 0:
+                        # เริ่มนับช่วงถัดไปจากขอบเขตนี้
+                        boundary = position + offset
+                        position = boundary
+                        file.seek(boundary)
+                        break
+            if boundary is None or boundary >= size:
+                break
+            boundaries.append(boundary)
+    boundaries.append(size)
+    return boundaries
+
+
+def parse_range(path: str, start: int, end: int, fieldnames: List[str], key_field: str,
+                coded_fields: List[str], date_field: str, text_fields: List[str],
+                ngram: int) -> Dict[str, Any]:
+    """แปลงแถวในช่วงไบต์ [start, end) เป็นผลบางส่วนขนาดเล็กที่ process หลักรวมต่อได้
+    
+    งานต่อแถวทั้งหมดทำใน process นี้: แยก CSV, แปลงวันที่ของ date_field, ทำดัชนีค้นหา
+    ของ text_fields และจัดกลุ่มแถวตามค่าของ coded_fields ข้อความของ text_fields
+    ไม่ถูกส่งกลับ คืน dict ที่มี
+    
+    - 'keys': ค่า key_field ของแต่ละแถว
+    - 'offsets', 'lengths': ตำแหน่งและความยาว (ไบต์) ของแต่ละแถว
+    - 'columns': ฟิลด์ใน coded_fields -> (ค่าที่ไม่ซ้ำ, array ลำดับของค่าของแต่ละแถว)
+    - 'postings': ฟิลด์ใน coded_fields -> array ลำดับแถวของแต่ละค่า (ตามลำดับค่า)
+    - 'dates': date ของค่าที่ไม่ซ้ำใน columns[date_field]
+    - 'search_index': TextSearchIndex ของแถวในช่วงนี้
+    """
+    key_column = fieldnames.index(key_field)
+    coded_columns = [(field, fieldnames.index(field)) for field in coded_fields]
+    text_columns = [(field, fieldnames.index(field)) for field in text_fields]
+    keys = []
+    offsets = array('Q')
+    lengths = array('I')
+    codes = {field: ({}, array('I')) for field in coded_fields}
+    search_index = TextSearchIndex(ngram)
+    with open(path, 'rb') as file:
+        file.seek(start)
+        lines = OffsetLineReader(file, start)
+        reader = csv.reader(lines)
+        while lines.position < end:
+            record_start = lines.position
+            values = next(reader, None)
+            if values is None:
+                break
+            if not values:
+                continue
+            values.extend([''] * (len(fieldnames) - len(values)))
+            key = values[key_column]
+            keys.append(key)
+            offsets.append(record_start)
+            lengths.append(lines.position - record_start)
+            for field, column in coded_columns:
+                numbers, row_codes = codes[field]
+                value = values[column]
+                code = numbers.get(value)
+                if code is None:
+                    code = numbers[value] = len(numbers)
+                row_codes.append(code)
+            for field, column in text_columns:
+                search_index.add(key, field, values[column])
+    
+    columns = {}
+    postings = {}
+    for field, (numbers, row_codes) in codes.items():
+        columns[field] = (list(numbers), row_codes)
+        rows = [array('I') for _ in numbers]
+        for row, code in enumerate(row_codes):
+            rows[code].append(row)
+        postings[field] = rows
+    return {
+        'keys': keys,
+        'offsets': offsets,
+        'lengths': lengths,
+        'columns': columns,
+        'postings': postings,
+        'dates': [datetime.strptime(value, '%Y-%m-%d').date() for value in columns[date_field][0]],
+        'search_index': search_index
+    }
+
+
+def load_csv_parallel(path: str, key_field: str, coded_fields: List[str], date_field: str,
+                      text_fields: List[str], ngram: int, workers: int = None):
+    """อ่าน CSV ขนาดใหญ่แบบขนานด้วย process pool (ดู parse_range)
+    
+    คืน (fieldnames, chunks) โดย chunks เป็นผลของ parse_range ของแต่ละช่วง
+    เรียงตามลำดับในไฟล์ date_field ต้องอยู่ใน coded_fields
+    """
+    workers = workers or os.cpu_count() or 1
+    fieldnames, data_start = read_header(path)
+    boundaries = find_record_boundaries(path, data_start, workers)
+    ranges = list(zip(boundaries, boundaries[1:]))
+    arguments = (fieldnames, key_field, coded_fields, date_field, text_fields, ngram)
+    
+    if len(ranges) <= 1:
+        chunks = [parse_range(path, start, end, *arguments) for start, end in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(parse_range, path, start, end, *arguments) for start, end in ranges]
+            chunks = [future.result() for future in futures]
+    return fieldnames, chunks
@@ -0,0 +1,62 @@
+import queue
+import threading
+from typing import List, Callable
+
+
+class PersistenceWorker:
+    """Thread สำหรับเขียนไฟล์เบื้องหลัง เพื่อไม่ให้ Tk main loop ค้างระหว่างรอดิสก์
+    
+    งานจะถูกทำตามลำดับที่ส่งเข้าคิว (thread เดียว) ผลลัพธ์และข้อผิดพลาดถูกเก็บไว้
+    ให้ thread หลักดึงไปใช้ผ่าน poll() เช่นเรียกจาก root.after
+    """
+    
+    def __init__(self):
+        self.tasks: queue.Queue = queue.Queue()
+        self.results: queue.Queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="persistence-worker", daemon=True)
+        self.thread.start()
+    
+    def submit(self, task: Callable, *args, on_done: Callable = None):
+        """ส่งงานเขียนไฟล์เข้าคิว on_done จะถูกเรียกใน thread ที่เรียก poll()"""
+        self.tasks.put((task, args, on_done))
+    
+    def _run(self):
+        """วนทำงานในคิวจนกว่าจะได้รับสัญญาณหยุด (None)"""
+        while True:
+            item = self.tasks.get()
+            try:
+                if item is None:
+                    return
+                task, args, on_done = item
+                try:
+                    task(*args)
+                except Exception as e:
+                    self.results.put((None, e))
+                else:
+                    if on_done:
+                        self.results.put((on_done, None))
+            finally:
+                self.tasks.task_done()
+    
+    def poll(self) -> List[Exception]:
+        """เรียก callback ของงานที่เสร็จแล้ว และคืนข้อผิดพลาดที่เกิดขึ้น"""
+        errors = []
+        while True:
+            try:
+                on_done, error = self.results.get_nowait()
+            except queue.Empty:
+                return errors
+            if error is not None:
+                errors.append(error)
+            elif on_done:
+                on_done()
+    
+    def flush(self):
+        """รอจนงานที่ค้างในคิวเขียนเสร็จทั้งหมด"""
+        self.tasks.join()
+    
+    def stop(self):
+        """เขียนงานที่ค้างให้เสร็จแล้วหยุด thread"""
+        if self.thread.is_alive():
+            self.tasks.put(None)
+            self.thread.join()
@@ -0,0 +1,34 @@
+import heapq
+from datetime import date, timedelta
+from typing import List, Dict, Any, Callable, Iterable, Tuple
+
+
+# สิ่งที่จัดอันดับได้ และค่าที่ใช้จัดอันดับ: จำนวนทั้งหมด, จำนวนที่รอดำเนินการ, จำนวนในช่วงวันล่าสุด
+RANKING_DIMENSIONS = ('stall', 'canteen')
+RANKING_METRICS = ('total', 'pending', 'recent')
+
+
+def check_ranking(dimension: str, metric: str, days: int):
+    """ตรวจพารามิเตอร์ของการจัดอันดับ (โยน ValueError ถ้าไม่ถูกต้อง)"""
+    if dimension not in RANKING_DIMENSIONS:
+        raise ValueError(f"ไม่รู้จักมิติ: {dimension}")
+    if metric not in RANKING_METRICS:
+        raise ValueError(f"ไม่รู้จักเกณฑ์การจัดอันดับ: {metric}")
+    if days < 1:
+        raise ValueError("จำนวนวันต้องมากกว่า 0")
+
+
+def recent_window(days: int, end: date = None) -> Tuple[date, date]:
+    """วันแรกและวันสุดท้ายของช่วง days วันล่าสุดที่สิ้นสุดวันที่ end (None = วันนี้)"""
+    end = end or date.today()
+    return end - timedelta(days=days - 1), end
+
+
+def top_entries(entries: Iterable[Dict[str, Any]], count_of: Callable[[Dict[str, Any]], int],
+                limit: int) -> List[Tuple[Dict[str, Any], int]]:
+    """เลือก limit รายการที่ count_of มากที่สุดด้วย heap (O(n log limit)) คืน (รายการ, ค่า)
+    
+    ค่าเท่ากันคงลำดับเดิมของ entries เหมือนการเรียงแบบ stable
+    """
+    ranked = heapq.nlargest(max(limit, 0), entries, key=count_of)
+    return [(entry, count_of(entry)) for entry in ranked]
@@ -0,0 +1,479 @@
+import csv
+import io
+import json
+import mmap
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterator, Iterable, Tuple, Optional
+
+
+class OffsetLineReader:
+    """อ่านไฟล์แบบไบนารีทีละบรรทัด และจำตำแหน่งไบต์ปัจจุบัน
+    
+    csv.reader ดึงบรรทัดทีละบรรทัดโดยไม่อ่านล่วงหน้า ตำแหน่งก่อนและหลัง
+    next(reader) จึงเป็นขอบเขตของ record หนึ่งแถว (รวมข้อความหลายบรรทัดในเครื่องหมายคำพูด)
+    """
+    
+    def __init__(self, file, position: int = 0):
+        self.file = file
+        self.position = position
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> str:
+        line = self.file.readline()
+        if not line:
+            raise StopIteration
+        self.position += len(line)
+        return line.decode('utf-8')
+
+
+class CsvRecordStore:
+    """อ่านแถวของไฟล์ CSV ตาม key ได้โดยตรงจากดิสก์ พร้อม LRU cache ขนาดจำกัด
+    
+    เก็บเฉพาะดัชนี key -> (offset, length) ในหน่วยความจำ ข้อความยาว ๆ
+    จะถูกอ่านจากไฟล์ (ผ่าน mmap) เมื่อมีการใช้งานจริงเท่านั้น
+    
+    ดัชนีถูกบันทึกเป็นไฟล์ข้าง ๆ (<ไฟล์>.idx) เพื่อให้เปิด store ใหม่แล้วอ่านแถว
+    ได้ทันทีโดยไม่ต้องอ่านทั้งไฟล์ ถ้ามีแถวต่อท้ายไฟล์ จะอ่านเฉพาะส่วนที่เพิ่มมา
+    
+    ดัชนีใช้ต่อได้เมื่อไฟล์เป็นไฟล์เดิม (inode เดิม) และ crc32 ของทุกไบต์ที่ทำดัชนีแล้ว
+    ยังตรงกัน มิฉะนั้น offset อาจชี้ผิดแถว จึงทิ้งดัชนีและสร้างใหม่ทั้งไฟล์
+    """
+    
+    INDEX_SUFFIX = ".idx"
+    INDEX_VERSION = 2
+    # ขนาดบล็อกที่อ่านต่อครั้งตอนคำนวณ crc32 ของส่วนที่ทำดัชนีแล้ว
+    CHECKSUM_BLOCK_BYTES = 1 << 20
+    
+    def __init__(self, path: str, key_field: str, cache_size: int = 256):
+        self.path = path
+        self.key_field = key_field
+        self.cache_size = cache_size
+        self.fieldnames: List[str] = []
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+        self.file_signature = None
+        self.indexed_bytes = 0
+        self.indexed_crc = 0
+        self._lock = threading.RLock()
+        self._cache: OrderedDict = OrderedDict()
+        self._map = None
+    
+    def _current_signature(self):
+        """ขนาด เวลาแก้ไข และ inode ของไฟล์ (None ถ้าไม่มีไฟล์)"""
+        if not os.path.exists(self.path):
+            return None
+        stat = os.stat(self.path)
+        return (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+    
+    @property
+    def index_path(self) -> str:
+        """ตำแหน่งไฟล์ดัชนีข้าง ๆ ไฟล์ CSV"""
+        return self.path + self.INDEX_SUFFIX
+    
+    def scan(self) -> Iterator[Dict[str, str]]:
+        """อ่านทุกแถวของไฟล์พร้อมสร้างดัชนี offset ใหม่ในรอบเดียว"""
+        with self._lock:
+            self._close_map()
+            self.offsets = {}
+            self._cache.clear()
+            self.fieldnames = []
+            self.indexed_bytes = 0
+            self.file_signature = self._current_signature()
+            if self.file_signature is None:
+                return
+            with open(self.path, 'rb') as file:
+                lines = OffsetLineReader(file)
+                reader = csv.reader(lines)
+                self.fieldnames = next(reader, [])
+                self.indexed_bytes = lines.position
+                self.indexed_crc = self._extend_checksum(file, 0, 0, lines.position)
+                yield from self._index_rows(file, lines, reader, self.offsets)
+            self._save_index()
+    
+    def scan_appended(self) -> Iterator[Dict[str, str]]:
+        """อ่านเฉพาะแถวที่ถูกต่อท้ายไฟล์หลังทำดัชนีครั้งล่าสุด และเพิ่มเข้าดัชนี
+        
+        ถ้าส่วนเดิมของไฟล์ถูกแก้ไข จะสร้างดัชนีใหม่ทั้งไฟล์และคืนทุกแถว
+        """
+        with self._lock:
+            signature = self._current_signature()
+            if signature == self.file_signature:
+                return
+            if not self._is_append_of_index(signature):
+                yield from self.scan()
+                return
+            self._close_map()
+            self.file_signature = signature
+            added = {}
+            with open(self.path, 'rb') as file:
+                file.seek(self.indexed_bytes)
+                lines = OffsetLineReader(file, self.indexed_bytes)
+                reader = csv.reader(lines)
+                yield from self._index_rows(file, lines, reader, added)
+            self.offsets.update(added)
+            self._append_index(added)
+    
+    def _index_rows(self, file, lines: OffsetLineReader, reader, offsets: Dict) -> Iterator[Dict[str, str]]:
+        """อ่านแถวต่อจากตำแหน่งปัจจุบันลง offsets และเลื่อน indexed_bytes
+        
+        แถวสุดท้ายที่ยังไม่จบบรรทัด (กำลังถูกเขียนต่อท้าย) จะยังไม่ถูกนับ
+        """
+        key_column = self.fieldnames.index(self.key_field)
+        size = os.fstat(file.fileno()).st_size
+        checked = self.indexed_bytes
+        while True:
+            start = lines.position
+            values = next(reader, None)
+            if values is None:
+                break
+            if lines.position >= size:
+                file.seek(size - 1)
+                if file.read(1) != b'\n':
+                    break
+            if values:
+                offsets[values[key_column]] = (start, lines.position - start)
+                self.indexed_bytes = lines.position
+                yield dict(zip(self.fieldnames, values))
+            else:
+                self.indexed_bytes = lines.position
+        self.indexed_crc = self._extend_checksum(file, self.indexed_crc, checked, self.indexed_bytes)
+    
+    def adopt_index(self, fieldnames: List[str], offsets: Dict[str, Tuple[int, int]]):
+        """ใช้ดัชนี offset ที่สร้างจากภายนอก (เช่นจากการอ่านไฟล์แบบขนาน)"""
+        with self._lock:
+            self._close_map()
+            self.fieldnames = list(fieldnames)
+            self.offsets = offsets
+            self.file_signature = self._current_signature()
+            self._cache.clear()
+            end = max((offset + length for offset, length in offsets.values()), default=0)
+            self.indexed_bytes = end or (self.file_signature[0] if self.file_signature else 0)
+            self.indexed_crc = self._prefix_checksum(self.indexed_bytes)
+            self._save_index()
+    
+    def _extend_checksum(self, file, crc: int, start: int, end: int) -> int:
+        """ต่อ crc32 ด้วยข้อมูลช่วง [start, end) ของไฟล์ที่เปิดอยู่ (คืนตำแหน่งอ่านเดิม)"""
+        position = file.tell()
+        file.seek(start)
+        while start < end:
+            block = file.read(min(self.CHECKSUM_BLOCK_BYTES, end - start))
+            if not block:
+                break
+            crc = zlib.crc32(block, crc)
+            start += len(block)
+        file.seek(position)
+        return crc
+    
+    def _prefix_checksum(self, end: int, path: str = None) -> int:
+        """crc32 ของข้อมูลตั้งแต่ต้นไฟล์ถึงตำแหน่ง end"""
+        path = path or self.path
+        if end <= 0 or not os.path.exists(path):
+            return 0
+        with open(path, 'rb') as file:
+            return self._extend_checksum(file, 0, 0, end)
+    
+    def _is_append_of_index(self, signature) -> bool:
+        """ตรวจว่าไฟล์ปัจจุบันคือไฟล์ที่ทำดัชนีไว้แล้วบวกแถวต่อท้ายเท่านั้น
+        
+        ไฟล์ต้องเป็น inode เดิม ยาวไม่น้อยกว่าส่วนที่ทำดัชนีแล้ว และส่วนนั้นต้องมี crc32
+        เท่าเดิมทุกไบต์ (การเขียนใหม่ที่แก้เฉพาะช่วงต้นไฟล์ก็ทำให้ offset ใช้ไม่ได้)
+        """
+        if self.file_signature is None or signature is None or not self.fieldnames:
+            return False
+        if len(self.file_signature) != len(signature) or self.file_signature[2] != signature[2]:
+            return False
+        if signature[0] < self.indexed_bytes:
+            return False
+        return self._prefix_checksum(self.indexed_bytes) == self.indexed_crc
+    
+    def mark(self) -> Tuple[int, int, Optional[int]]:
+        """ตำแหน่งท้ายไฟล์ crc32 ของทั้งไฟล์ถึงตำแหน่งนั้น และ inode สำหรับ scan_since ภายหลัง
+        
+        ถ้าดัชนีของ store ตรงกับไฟล์ทั้งไฟล์อยู่แล้ว (เช่นหลัง append) ใช้ crc32 ของดัชนี
+        โดยไม่อ่านไฟล์ซ้ำ
+        """
+        with self._lock:
+            signature = self._current_signature()
+            if signature is None:
+                return (0, 0, None)
+            if signature == self.file_signature and signature[0] == self.indexed_bytes:
+                return (self.indexed_bytes, self.indexed_crc, signature[2])
+            return (signature[0], self._prefix_checksum(signature[0]), signature[2])
+    
+    def scan_since(self, mark: Optional[Tuple[int, int, Optional[int]]]) -> Iterator[Dict[str, str]]:
+        """อ่านแถวที่ถูกต่อท้ายหลัง mark (จาก mark()) โดยไม่แตะดัชนีของ store
+        
+        ถ้าไฟล์ถูกแทนที่ (inode เปลี่ยน) ส่วนก่อน mark ถูกแก้ไข หรือไม่มี mark จะคืนทุกแถว
+        ผู้เรียกจึงเก็บ mark ของตัวเองได้ แม้ดัชนีของ store จะอ่านส่วนที่ต่อท้ายไปแล้วก็ตาม
+        """
+        signature = self._current_signature()
+        if signature is None:
+            return
+        position = 0
+        if (mark is not None and 0 < mark[0] <= signature[0] and mark[2] == signature[2]
+                and self._prefix_checksum(mark[0]) == mark[1]):
+            position = mark[0]
+        with open(self.path, 'rb') as file:
+            lines = OffsetLineReader(file)
+            fieldnames = next(csv.reader(lines), [])
+            file.seek(max(position, lines.position))
+            for values in csv.reader(OffsetLineReader(file)):
+                if values:
+                    yield dict(zip(fieldnames, values))
+    
+    def append(self, fieldnames: List[str], rows: Iterable[Dict[str, Any]]):
+        """เขียนแถวต่อท้ายไฟล์ในครั้งเดียว (ไม่เขียนส่วนเดิมซ้ำ) และต่อท้ายดัชนี
+        
+        ถ้ายังไม่มีไฟล์จะเขียน header ก่อน ถ้ามีแล้วใช้ลำดับคอลัมน์เดิมของไฟล์
+        """
+        with self._lock:
+            self._ensure_index()
+            self._close_map()
+            buffer = io.StringIO()
+            with open(self.path, 'a+b') as file:
+                file.seek(0, os.SEEK_END)
+                position = file.tell()
+                if position == 0:
+                    self.fieldnames = list(fieldnames)
+                    csv.writer(buffer).writerow(self.fieldnames)
+                    position = self._write_buffer(buffer, file)
+                checked = position
+                writer = csv.DictWriter(buffer, fieldnames=self.fieldnames)
+                added = {}
+                for row in rows:
+                    writer.writerow({field: row[field] for field in self.fieldnames})
+                    length = self._write_buffer(buffer, file)
+                    added[row[self.key_field]] = (position, length)
+                    position += length
+                if checked != self.indexed_bytes:
+                    # ไฟล์ว่างหรือมีแถวที่เขียนไม่จบค้างท้ายไฟล์: คำนวณใหม่ตั้งแต่ต้น
+                    self.indexed_crc, checked = 0, 0
+                self.indexed_crc = self._extend_checksum(file, self.indexed_crc, checked, position)
+            self.offsets.update(added)
+            self.file_signature = self._current_signature()
+            self.indexed_bytes = position
+            self._append_index(added)
+    
+    # ===== Sidecar Index =====
+    
+    def _index_header(self) -> str:
+        """บรรทัดสรุปสถานะของดัชนี (ขึ้นต้นด้วย #)"""
+        return '#' + json.dumps({
+            'version': self.INDEX_VERSION,
+            'key_field': self.key_field,
+            'fieldnames': self.fieldnames,
+            'signature': self.file_signature,
+            'indexed_bytes': self.indexed_bytes,
+            'indexed_crc': self.indexed_crc
+        }, ensure_ascii=False) + '\n'
+    
+    @staticmethod
+    def _index_lines(offsets: Dict[str, Tuple[int, int]]) -> Iterator[str]:
+        for key, (offset, length) in offsets.items():
+            yield f"{key}\t{offset}\t{length}\n"
+    
+    def _save_index(self):
+        """เขียนไฟล์ดัชนีใหม่ทั้งไฟล์ (ผ่านไฟล์ชั่วคราว)"""
+        temp_path = self.index_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8', newline='') as file:
+                file.writelines(self._index_lines(self.offsets))
+                file.write(self._index_header())
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            # ดัชนีเป็นเพียง cache หากเขียนไม่ได้ก็สร้างใหม่จาก CSV ครั้งถัดไป
+            pass
+    
+    def _append_index(self, offsets: Dict[str, Tuple[int, int]]):
+        """ต่อท้ายไฟล์ดัชนีด้วยแถวใหม่และบรรทัดสรุปสถานะล่าสุด"""
+        if not os.path.exists(self.index_path):
+            self._save_index()
+            return
+        try:
+            with open(self.index_path, 'a', encoding='utf-8', newline='') as file:
+                file.writelines(self._index_lines(offsets))
+                file.write(self._index_header())
+        except OSError:
+            pass
+    
+    def load_index(self) -> bool:
+        """โหลดดัชนีจากไฟล์ข้าง ๆ คืน False ถ้าไม่มีหรือใช้ไม่ได้
+        
+        แถวที่อยู่หลังบรรทัดสรุปสถานะล่าสุด (เขียนไม่เสร็จ) จะถูกตัดทิ้ง
+        """
+        if not os.path.exists(self.index_path):
+            return False
+        offsets = {}
+        pending = {}
+        header = None
+        try:
+            with open(self.index_path, 'r', encoding='utf-8', newline='') as file:
+                for line in file:
+                    if not line.endswith('\n'):
+                        break
+                    if line.startswith('#'):
+                        header = json.loads(line[1:])
+                        offsets.update(pending)
+                        pending = {}
+                        continue
+                    key, offset, length = line[:-1].rsplit('\t', 2)
+                    pending[key] = (int(offset), int(length))
+        except (OSError, ValueError):
+            return False
+        if (header is None or header.get('version') != self.INDEX_VERSION
+                or header.get('key_field') != self.key_field or not header.get('signature')):
+            return False
+        with self._lock:
+            self._close_map()
+            self._cache.clear()
+            self.offsets = offsets
+            self.fieldnames = header['fieldnames']
+            self.file_signature = tuple(header['signature'])
+            self.indexed_bytes = header['indexed_bytes']
+            self.indexed_crc = header['indexed_crc']
+        return True
+    
+    def _ensure_index(self):
+        """ปรับดัชนีให้ตรงกับไฟล์ปัจจุบัน
+        
+        ใช้ไฟล์ดัชนีข้าง ๆ ถ้ายังไม่เคยทำดัชนี และอ่านเฉพาะแถวที่ต่อท้ายถ้าทำได้
+        """
+        if self.file_signature is None and not self.offsets:
+            self.load_index()
+        if self._current_signature() != self.file_signature:
+            for _ in self.scan_appended():
+                pass
+    
+    # ===== Record Access =====
+    
+    def _mapped(self) -> mmap.mmap:
+        """mmap แบบอ่านอย่างเดียวของไฟล์ปัจจุบัน (สร้างเมื่อใช้ครั้งแรก)"""
+        if self._map is None:
+            with open(self.path, 'rb') as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+    
+    def _close_map(self):
+        """ปิด mmap ก่อนไฟล์ถูกแทนที่หรือขยาย (Windows ไม่ยอมให้แทนที่ไฟล์ที่ map อยู่)"""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+    
+    def fetch(self, key: str) -> Optional[Dict[str, str]]:
+        """อ่านแถวตาม key (ใช้ cache ถ้ามี)"""
+        with self._lock:
+            row = self._cache.get(key)
+            if row is not None:
+                self._cache.move_to_end(key)
+                return row
+            self._ensure_index()
+            location = self.offsets.get(key)
+            if location is None:
+                return None
+            offset, length = location
+            text = self._mapped()[offset:offset + length].decode('utf-8')
+            values = next(csv.reader(io.StringIO(text)), [])
+            row = dict(zip(self.fieldnames, values))
+            self._cache[key] = row
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return row
+    
+    def fetch_field(self, keys: List[str], field: str) -> List[str]:
+        """อ่านฟิลด์เดียวของหลายแถวในครั้งเดียว ('' ถ้าไม่พบ key)
+        
+        ตรวจดัชนีครั้งเดียวและไม่เพิ่มแถวเข้า LRU cache จึงใช้กับงานที่อ่านหลายหมื่นแถว
+        (เช่นตรวจผลค้นหา) ได้โดยไม่ไล่แถวที่หน้าจอใช้อยู่ออกจาก cache
+        """
+        with self._lock:
+            self._ensure_index()
+            if field not in self.fieldnames:
+                return [''] * len(keys)
+            column = self.fieldnames.index(field)
+            values = [''] * len(keys)
+            locations = []
+            for position, key in enumerate(keys):
+                location = self.offsets.get(key)
+                if location is not None:
+                    locations.append((position, location))
+            if not locations:
+                return values
+            mapped = self._mapped()
+            # แต่ละช่วงคือหนึ่ง record พอดี (รวมข้อความหลายบรรทัด) จึงใช้ reader ตัวเดียวอ่านต่อกันได้
+            texts = (mapped[offset:offset + length].decode('utf-8') for _, (offset, length) in locations)
+            for (position, _), row in zip(locations, csv.reader(texts)):
+                if column < len(row):
+                    values[position] = row[column]
+            return values
+    
+    def close(self):
+        """ปิด mmap ของไฟล์"""
+        with self._lock:
+            self._close_map()
+    
+    def rewrite(self, fieldnames: List[str], rows: Iterable[Dict[str, Any]]):
+        """เขียนไฟล์ใหม่ทั้งหมด (ผ่านไฟล์ชั่วคราว) และสร้างดัชนีจากตำแหน่งที่เขียน
+        
+        ไฟล์เดิมยังอ่านได้ระหว่างเขียน จึงใช้ rows ที่ยังโหลดข้อความแบบ lazy ได้
+        """
+        self.replace_with(self.write_temp(fieldnames, rows))
+    
+    def write_temp(self, fieldnames: List[str], rows: Iterable[Dict[str, Any]]) -> Tuple:
+        """เขียนแถวทั้งหมดลงไฟล์ชั่วคราวข้างไฟล์จริง คืนข้อมูลที่ส่งต่อให้ replace_with
+        
+        ไม่แตะไฟล์จริงและดัชนี จึงเรียกได้โดยไม่ถือ lock ของโฟลเดอร์ข้อมูล ชื่อไฟล์
+        ชั่วคราวแยกตาม process และ thread เพื่อไม่ให้การเขียนพร้อมกันทับกัน
+        """
+        temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        offsets = {}
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+        try:
+            with open(temp_path, 'wb') as file:
+                writer.writeheader()
+                position = self._write_buffer(buffer, file)
+                for row in rows:
+                    writer.writerow(row)
+                    length = self._write_buffer(buffer, file)
+                    offsets[row[self.key_field]] = (position, length)
+                    position += length
+            crc = self._prefix_checksum(position, temp_path)
+        except BaseException:
+            self.discard_temp((temp_path,))
+            raise
+        return temp_path, list(fieldnames), offsets, position, crc
+    
+    def replace_with(self, prepared: Tuple):
+        """แทนที่ไฟล์จริงด้วยไฟล์ชั่วคราวจาก write_temp และใช้ดัชนีที่สร้างไว้"""
+        temp_path, fieldnames, offsets, position, crc = prepared
+        with self._lock:
+            self._close_map()
+            os.replace(temp_path, self.path)
+            self.fieldnames = fieldnames
+            self.offsets = offsets
+            self.file_signature = self._current_signature()
+            self.indexed_bytes = position
+            self.indexed_crc = crc
+            self._cache.clear()
+            self._save_index()
+    
+    @staticmethod
+    def discard_temp(prepared: Tuple):
+        """ลบไฟล์ชั่วคราวจาก write_temp ที่ไม่ได้ใช้ (เช่นการรวม journal ถูกยกเลิก)"""
+        try:
+            os.remove(prepared[0])
+        except FileNotFoundError:
+            pass
+    
+    @staticmethod
+    def _write_buffer(buffer: io.StringIO, file) -> int:
+        """เขียนข้อความใน buffer ลงไฟล์เป็น utf-8 แล้วล้าง buffer คืนจำนวนไบต์"""
+        data = buffer.getvalue().encode('utf-8')
+        file.write(data)
+        buffer.seek(0)
+        buffer.truncate()
+        return len(data)
@@ -0,0 +1,138 @@
+import sys
+from collections.abc import Mapping
+from typing import List, Dict, Any, Iterator
+
+
+class Record(Mapping):
+    """Record ขนาดเล็กแบบ __slots__ ที่ยังเข้าถึงแบบ dict ได้ (record['field'])
+    
+    ใช้แทน dict จาก csv.DictReader เพื่อลดหน่วยความจำ: ไม่มี dict ต่อแถว
+    และฟิลด์ที่มีค่าซ้ำกันมาก (INTERNED) จะใช้ string object ร่วมกัน
+    
+    ฟิลด์ใน LAZY_FIELDS ที่มีค่า None จะถูกอ่านจาก store (CsvRecordStore)
+    ตาม KEY_FIELD เมื่อมีการเข้าถึงเท่านั้น
+    """
+    
+    __slots__ = ()
+    FIELDS: tuple = ()
+    INTERNED: frozenset = frozenset()
+    KEY_FIELD: str = ''
+    LAZY_FIELDS: frozenset = frozenset()
+    
+    def __init__(self, **values):
+        self._store = None
+        for field in self.FIELDS:
+            self[field] = values.get(field, '')
+    
+    @classmethod
+    def from_dict(cls, row: Dict[str, Any]) -> 'Record':
+        """สร้าง record จาก dict (เช่นแถวจาก csv.DictReader หรือ journal)"""
+        if isinstance(row, cls):
+            return row
+        record = cls.__new__(cls)
+        record._store = None
+        for field in cls.FIELDS:
+            record[field] = row.get(field, '')
+        return record
+    
+    @classmethod
+    def header_from_dict(cls, row: Dict[str, Any], store) -> 'Record':
+        """สร้าง record ที่ไม่เก็บฟิลด์ใน LAZY_FIELDS ไว้ในหน่วยความจำ"""
+        record = cls.from_dict(row)
+        for field in cls.LAZY_FIELDS:
+            setattr(record, field, None)
+        record._store = store
+        return record
+    
+    def to_row(self) -> List[Any]:
+        """ค่าของทุกฟิลด์ตามลำดับ FIELDS โดยไม่อ่านฟิลด์ lazy จาก store (None = ยังไม่ได้อ่าน)"""
+        return [getattr(self, field) for field in self.FIELDS]
+    
+    @classmethod
+    def from_row(cls, values: List[Any], store) -> 'Record':
+        """สร้าง record จากผลของ to_row ฟิลด์ lazy ที่เป็น None อ่านจาก store เมื่อใช้"""
+        if len(values) != len(cls.FIELDS):
+            raise ValueError(f"จำนวนฟิลด์ไม่ตรงกับ {cls.__name__}")
+        record = cls.__new__(cls)
+        record._store = store
+        interned = cls.INTERNED
+        # ตั้งค่าตรงแทน __setitem__ เพราะใช้ตอนโหลดทีละหลายแสนแถว
+        for field, value in zip(cls.FIELDS, values):
+            if field in interned and isinstance(value, str):
+                value = sys.intern(value)
+            setattr(record, field, value)
+        return record
+    
+    def __getitem__(self, field: str) -> Any:
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        value = getattr(self, field)
+        if value is None and self._store is not None and field in self.LAZY_FIELDS:
+            row = self._store.fetch(getattr(self, self.KEY_FIELD))
+            value = row.get(field, '') if row else ''
+        return value
+    
+    def __setitem__(self, field: str, value: Any):
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        if field in self.INTERNED and isinstance(value, str):
+            value = sys.intern(value)
+        setattr(self, field, value)
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+    
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+    
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """แปลงเป็น dict ธรรมดา (เช่นสำหรับ json)"""
+        return {field: self[field] for field in self.FIELDS}
+    
+    @classmethod
+    def field_values(cls, records: List['Record'], field: str) -> List[Any]:
+        """ค่าฟิลด์เดียวของหลาย record ตามลำดับ ฟิลด์ lazy ที่ยังไม่ได้อ่านจะอ่านจาก store
+        ทีละ store ในครั้งเดียว (CsvRecordStore.fetch_field) แทนการ fetch ทีละแถว
+        """
+        if field not in cls.FIELDS:
+            raise KeyError(field)
+        values = [getattr(record, field) for record in records]
+        if field not in cls.LAZY_FIELDS:
+            return values
+        pending: Dict[Any, List[int]] = {}
+        for position, value in enumerate(values):
+            if value is None:
+                pending.setdefault(records[position]._store, []).append(position)
+        for store, positions in pending.items():
+            if store is None:
+                fetched = [''] * len(positions)
+            else:
+                keys = [getattr(records[position], cls.KEY_FIELD) for position in positions]
+                fetched = store.fetch_field(keys, field)
+            for position, value in zip(positions, fetched):
+                values[position] = value
+        return values
+
+
+class ComplaintRecord(Record):
+    """ข้อมูลการร้องเรียนหนึ่งรายการ"""
+    
+    FIELDS = ('complaint_id', 'stall_id', 'complaint_date',
+              'problem_type', 'complaint_description', 'status')
+    __slots__ = FIELDS + ('_store',)
+    INTERNED = frozenset(('stall_id', 'complaint_date', 'problem_type', 'status'))
+    KEY_FIELD = 'complaint_id'
+    LAZY_FIELDS = frozenset(('complaint_description',))
+
+
+class ResponseRecord(Record):
+    """ข้อมูลการตอบกลับหนึ่งรายการ"""
+    
+    FIELDS = ('response_id', 'complaint_id', 'response_date', 'response_text')
+    __slots__ = FIELDS + ('_store',)
+    INTERNED = frozenset(('complaint_id', 'response_date'))
+    KEY_FIELD = 'response_id'
+    LAZY_FIELDS = frozenset(('response_text',))
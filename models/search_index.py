@@ -0,0 +1,178 @@
+import base64
+import math
+import re
+import sys
+from array import array
+from typing import List, Dict, Any, Set, Callable
+
+
+class TextSearchIndex:
+    """Inverted index แบบ character n-gram สำหรับค้นหาข้อความภาษาไทย
+    
+    ภาษาไทยไม่มีช่องว่างระหว่างคำ จึงแตกข้อความเป็น n-gram ของตัวอักษร
+    (ค่าเริ่มต้น 2 ตัวอักษร) แทนการตัดคำ เอกสารที่มี n-gram ของคำค้นครบทุกตัว
+    ในฟิลด์เดียวกันเป็นเพียงผู้สมัคร ซึ่งถูกตรวจกับข้อความจริงก่อนให้คะแนน
+    (ดัชนีไม่เก็บข้อความ ผู้เรียกจึงส่งฟังก์ชันอ่านข้อความมากับ search)
+    
+    posting list ของแต่ละ n-gram เก็บเป็น array ของเลขเอกสาร (int) แยกตามฟิลด์
+    และเพิ่มเอกสารทีละรายการได้โดยไม่ต้องสร้างดัชนีใหม่
+    """
+    
+    # อักขระที่ใช้แบ่งคำ (ช่องว่างและเครื่องหมายวรรคตอน ASCII)
+    # ไม่ใช้ \W เพราะสระบน/ล่างและวรรณยุกต์ไทยไม่นับเป็นตัวอักษรใน regex
+    SEPARATORS = re.compile(r'[\s!-/:-@\[-`{-~]+')
+    
+    def __init__(self, n: int = 2):
+        self.n = n
+        self.keys: List[str] = []
+        self._doc_numbers: Dict[str, int] = {}
+        # field -> n-gram -> เลขเอกสาร
+        self.postings: Dict[str, Dict[str, array]] = {}
+    
+    def tokenize(self, text: str) -> List[str]:
+        """แยกข้อความเป็นคำตามช่องว่าง/เครื่องหมายวรรคตอน (ตัวพิมพ์เล็กทั้งหมด)"""
+        return [token for token in self.SEPARATORS.split(text.casefold()) if token]
+    
+    def grams(self, token: str) -> Set[str]:
+        """แตกคำเป็น n-gram (คำที่สั้นกว่า n ใช้ทั้งคำ)"""
+        if len(token) <= self.n:
+            return {token}
+        return {token[i:i + self.n] for i in range(len(token) - self.n + 1)}
+    
+    def _doc_number(self, key: str) -> int:
+        """เลขเอกสารของ key (สร้างใหม่ถ้ายังไม่มี)"""
+        number = self._doc_numbers.get(key)
+        if number is None:
+            number = len(self.keys)
+            self._doc_numbers[key] = number
+            self.keys.append(key)
+        return number
+    
+    def add(self, key: str, field: str, text: str):
+        """เพิ่มข้อความของฟิลด์หนึ่งให้เอกสาร key (เรียกซ้ำได้ เช่นการตอบกลับหลายครั้ง)"""
+        if not text:
+            return
+        grams = set()
+        for token in self.tokenize(text):
+            grams |= self.grams(token)
+        if not grams:
+            return
+        number = self._doc_number(key)
+        field_postings = self.postings.setdefault(field, {})
+        for gram in grams:
+            posting = field_postings.get(gram)
+            if posting is None:
+                field_postings[gram] = array('I', (number,))
+            elif posting[-1] != number:
+                posting.append(number)
+    
+    def merge(self, other: 'TextSearchIndex'):
+        """เพิ่มเอกสารทั้งหมดของดัชนีอื่น (เช่นดัชนีของช่วงไฟล์ที่ process อื่นสร้าง)
+        
+        ผลเหมือนการ add ข้อความเดียวกันตามลำดับเอกสารของ other เลขเอกสารของ other
+        ถูกแปลงเป็นเลขของดัชนีนี้
+        """
+        if other.n != self.n:
+            raise ValueError(f"ขนาด n-gram ไม่ตรงกัน ({other.n} กับ {self.n})")
+        numbers = [self._doc_number(key) for key in other.keys]
+        for field, other_postings in other.postings.items():
+            field_postings = self.postings.setdefault(field, {})
+            for gram, other_posting in other_postings.items():
+                posting = array('I', map(numbers.__getitem__, other_posting))
+                existing = field_postings.get(gram)
+                if existing is None:
+                    field_postings[gram] = posting
+                else:
+                    existing.extend(posting)
+    
+    def to_state(self) -> Dict[str, Any]:
+        """ข้อมูลของดัชนีในรูปที่เขียนเป็น JSON ได้ (posting list เป็น base64 ของ uint32 little-endian)"""
+        return {
+            'n': self.n,
+            'keys': self.keys,
+            'postings': {
+                field: {gram: self._encode_posting(posting) for gram, posting in field_postings.items()}
+                for field, field_postings in self.postings.items()
+            }
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> 'TextSearchIndex':
+        """สร้างดัชนีจากผลของ to_state"""
+        index = cls(state['n'])
+        index.keys = list(state['keys'])
+        index._doc_numbers = {key: number for number, key in enumerate(index.keys)}
+        index.postings = {
+            field: {gram: cls._decode_posting(text) for gram, text in field_postings.items()}
+            for field, field_postings in state['postings'].items()
+        }
+        return index
+    
+    @staticmethod
+    def _encode_posting(posting: array) -> str:
+        if sys.byteorder == 'big':
+            posting = array(posting.typecode, posting)
+            posting.byteswap()
+        return base64.b64encode(posting.tobytes()).decode('ascii')
+    
+    @staticmethod
+    def _decode_posting(text: str) -> array:
+        posting = array('I')
+        posting.frombytes(base64.b64decode(text))
+        if sys.byteorder == 'big':
+            posting.byteswap()
+        return posting
+    
+    def clear_field(self, field: str):
+        """ลบดัชนีของฟิลด์หนึ่ง (ใช้ก่อนโหลดไฟล์ใหม่ทั้งไฟล์)"""
+        self.postings.pop(field, None)
+    
+    def _match_token(self, field_postings: Dict[str, array], token: str) -> Set[int]:
+        """เลขเอกสารที่มี n-gram ของคำค้นครบทุกตัว (เริ่มตัดจาก posting ที่สั้นที่สุด)"""
+        postings = []
+        for gram in self.grams(token):
+            posting = field_postings.get(gram)
+            if posting is None:
+                return set()
+            postings.append(posting)
+        postings.sort(key=len)
+        matched = set(postings[0])
+        for posting in postings[1:]:
+            matched.intersection_update(posting)
+            if not matched:
+                break
+        return matched
+    
+    def search(self, query: str, weights: Dict[str, float],
+               field_texts: Callable[[List[str], str], List[str]]) -> Dict[str, float]:
+        """ค้นหาคำค้น (คั่นด้วยช่องว่าง) คืน key -> คะแนน
+        
+        field_texts(keys, field) คืนข้อความของฟิลด์นั้นของแต่ละเอกสารใน keys ตามลำดับ
+        (อ่านเป็นชุดเพราะผู้สมัครของคำที่พบบ่อยมีหลายหมื่นเอกสาร) คำค้นที่ยาวกว่า n
+        ต้องปรากฏต่อกันในข้อความจริง (n-gram ครบอาจมาจากคนละตำแหน่ง เช่น 'aba'
+        กับ 'axbxab ba') คำค้นที่ยาวไม่เกิน n ตรงกับ n-gram เดียวจึงไม่ต้องตรวจ
+        
+        คะแนนของแต่ละคำค้นในแต่ละฟิลด์คือ น้ำหนักฟิลด์ x idf ของคำค้น
+        คำค้นที่พบในเอกสารน้อยจึงมีผลต่ออันดับมากกว่า
+        """
+        scores: Dict[int, float] = {}
+        total = len(self.keys) or 1
+        for token in self.tokenize(query):
+            for field, weight in weights.items():
+                field_postings = self.postings.get(field)
+                if not field_postings:
+                    continue
+                matched = self._match_token(field_postings, token)
+                if matched and len(token) > self.n:
+                    numbers = list(matched)
+                    texts = field_texts([self.keys[number] for number in numbers], field)
+                    matched = {number for number, text in zip(numbers, texts) if token in text.casefold()}
+                if not matched:
+                    continue
+                score = weight * math.log(1 + total / len(matched))
+                for number in matched:
+                    scores[number] = scores.get(number, 0.0) + score
+        return {self.keys[number]: score for number, score in scores.items()}
+    
+    def __len__(self) -> int:
+        return len(self.keys)
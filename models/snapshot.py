@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+from typing import Dict, Any, List
+
+
+class ModelSnapshot:
+    """Cache ของข้อมูลที่แปลงและทำดัชนีแล้ว เพื่อให้เปิดโปรแกรมได้เร็ว
+    
+    snapshot ใช้ได้เมื่อไฟล์ CSV ต้นทางไม่เปลี่ยน โดยตรวจขนาดและเวลาแก้ไขก่อน
+    ถ้าเวลาแก้ไขเปลี่ยนแต่ขนาดเท่าเดิม จะตรวจ hash ของเนื้อหาอีกครั้ง
+    
+    เก็บเป็น JSON (state ต้องประกอบด้วย dict/list/str/ตัวเลขเท่านั้น) ไม่ใช้ pickle
+    เพราะโฟลเดอร์ข้อมูลใช้ร่วมกันหลาย instance ผู้ที่เขียนไฟล์ในโฟลเดอร์ได้จึงต้อง
+    ไม่สามารถทำให้ instance อื่นรันโค้ดตอนโหลด snapshot ได้
+    """
+    
+    FILENAME = "snapshot.json"
+    # snapshot แบบ pickle ของรุ่นก่อน (ไม่โหลดแล้ว ลบทิ้งเมื่อบันทึก snapshot ใหม่)
+    LEGACY_FILENAMES = ("snapshot.pickle",)
+    # เพิ่มเลขนี้เมื่อโครงสร้างข้อมูลใน snapshot เปลี่ยน
+    VERSION = 7
+    
+    def __init__(self, data_dir: str, sources: List[str]):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, self.FILENAME)
+        self.sources = sources
+    
+    @staticmethod
+    def _file_hash(path: str) -> str:
+        """คำนวณ sha256 ของไฟล์"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def _stat_sources(self) -> Dict[str, Any]:
+        """ดึงขนาดและเวลาแก้ไขของไฟล์ต้นทาง (None ถ้าไม่มีไฟล์)"""
+        stats = {}
+        for name in self.sources:
+            path = os.path.join(self.data_dir, name)
+            if os.path.exists(path):
+                stat = os.stat(path)
+                stats[name] = (stat.st_size, stat.st_mtime_ns)
+            else:
+                stats[name] = None
+        return stats
+    
+    def signature(self) -> Dict[str, Any]:
+        """สร้างลายเซ็นของไฟล์ต้นทาง (ขนาด, เวลาแก้ไข, hash)"""
+        signature = {}
+        for name, stat in self._stat_sources().items():
+            if stat is None:
+                signature[name] = None
+            else:
+                path = os.path.join(self.data_dir, name)
+                signature[name] = stat + (self._file_hash(path),)
+        return signature
+    
+    def _is_valid(self, saved: Dict[str, Any]) -> bool:
+        """ตรวจว่าไฟล์ต้นทางยังตรงกับตอนสร้าง snapshot หรือไม่"""
+        if set(saved) != set(self.sources):
+            return False
+        for name, stat in self._stat_sources().items():
+            old = saved[name]
+            if stat is None or old is None:
+                if stat != old:
+                    return False
+                continue
+            size, mtime = stat
+            if size != old[0]:
+                return False
+            if mtime != old[1]:
+                # ถูกแตะไฟล์แต่เนื้อหาอาจไม่เปลี่ยน
+                if self._file_hash(os.path.join(self.data_dir, name)) != old[2]:
+                    return False
+        return True
+    
+    def load(self) -> Dict[str, Any] or None:
+        """โหลด state จาก snapshot ถ้ายังใช้ได้ มิฉะนั้นคืน None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                payload = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(payload, dict) or payload.get('version') != self.VERSION:
+            return None
+        if not self._is_valid(payload.get('signature', {})):
+            return None
+        return payload['state']
+    
+    def save(self, state: Dict[str, Any]):
+        """บันทึก state พร้อมลายเซ็นของไฟล์ต้นทางปัจจุบัน"""
+        payload = {
+            'version': self.VERSION,
+            'signature': self.signature(),
+            'state': state
+        }
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump(payload, file, ensure_ascii=False, separators=(',', ':'))
+        os.replace(temp_path, self.path)
+        for name in self.LEGACY_FILENAMES:
+            legacy_path = os.path.join(self.data_dir, name)
+            if os.path.exists(legacy_path):
+                os.remove(legacy_path)
+    
+    def clear(self):
+        """ลบ snapshot"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,787 @@
+import os
+import sqlite3
+import sys
+from contextlib import contextmanager
+from datetime import datetime, date
+from typing import List, Dict, Any, Iterator, Tuple
+
+from models.complaint_import import prepare_complaint_rows
+from models.ranking import check_ranking, recent_window, top_entries
+from models.search_index import TextSearchIndex
+from models.time_index import GRANULARITIES, DIMENSIONS, bucket_start, next_bucket, iter_buckets
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS canteens (
+    canteen_id TEXT PRIMARY KEY,
+    canteen_name TEXT NOT NULL,
+    location TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS stalls (
+    stall_id TEXT PRIMARY KEY,
+    stall_name TEXT NOT NULL,
+    canteen_id TEXT NOT NULL,
+    owner_name TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS complaints (
+    complaint_id TEXT PRIMARY KEY,
+    stall_id TEXT NOT NULL,
+    complaint_date TEXT NOT NULL,
+    problem_type TEXT NOT NULL,
+    complaint_description TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    response_id TEXT PRIMARY KEY,
+    complaint_id TEXT NOT NULL,
+    response_date TEXT NOT NULL,
+    response_text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_stalls_canteen ON stalls (canteen_id);
+CREATE INDEX IF NOT EXISTS idx_complaints_stall ON complaints (stall_id, complaint_date);
+CREATE INDEX IF NOT EXISTS idx_complaints_status ON complaints (status, complaint_date);
+CREATE INDEX IF NOT EXISTS idx_complaints_date ON complaints (complaint_date);
+CREATE INDEX IF NOT EXISTS idx_complaints_problem ON complaints (problem_type, complaint_date);
+CREATE INDEX IF NOT EXISTS idx_responses_complaint ON responses (complaint_id, response_date);
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    record_id TEXT NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS log_complaint_insert AFTER INSERT ON complaints
+BEGIN
+    INSERT INTO change_log (kind, record_id) VALUES ('complaints_added', NEW.complaint_id);
+END;
+CREATE TRIGGER IF NOT EXISTS log_complaint_status AFTER UPDATE OF status ON complaints
+WHEN OLD.status IS NOT NEW.status
+BEGIN
+    INSERT INTO change_log (kind, record_id) VALUES ('complaints_updated', NEW.complaint_id);
+END;
+CREATE TRIGGER IF NOT EXISTS log_response_insert AFTER INSERT ON responses
+BEGIN
+    INSERT INTO change_log (kind, record_id) VALUES ('responses_added', NEW.response_id);
+END;
+"""
+
+# ดัชนีค้นหาข้อความแบบ FTS5 trigram (ต้องใช้ SQLite 3.34 ขึ้นไป) อ้างแถวด้วย rowid ของตารางหลัก
+# (external content จึงไม่เก็บข้อความซ้ำ) และปรับตามตารางหลักด้วย trigger
+SEARCH_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS complaint_fts USING fts5(
+    problem_type, complaint_description, content='complaints', tokenize='trigram'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS response_fts USING fts5(
+    response_text, content='responses', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS complaint_fts_insert AFTER INSERT ON complaints
+BEGIN
+    INSERT INTO complaint_fts (rowid, problem_type, complaint_description)
+    VALUES (NEW.rowid, NEW.problem_type, NEW.complaint_description);
+END;
+CREATE TRIGGER IF NOT EXISTS complaint_fts_delete AFTER DELETE ON complaints
+BEGIN
+    INSERT INTO complaint_fts (complaint_fts, rowid, problem_type, complaint_description)
+    VALUES ('delete', OLD.rowid, OLD.problem_type, OLD.complaint_description);
+END;
+CREATE TRIGGER IF NOT EXISTS complaint_fts_update AFTER UPDATE OF problem_type, complaint_description ON complaints
+BEGIN
+    INSERT INTO complaint_fts (complaint_fts, rowid, problem_type, complaint_description)
+    VALUES ('delete', OLD.rowid, OLD.problem_type, OLD.complaint_description);
+    INSERT INTO complaint_fts (rowid, problem_type, complaint_description)
+    VALUES (NEW.rowid, NEW.problem_type, NEW.complaint_description);
+END;
+CREATE TRIGGER IF NOT EXISTS response_fts_insert AFTER INSERT ON responses
+BEGIN
+    INSERT INTO response_fts (rowid, response_text) VALUES (NEW.rowid, NEW.response_text);
+END;
+CREATE TRIGGER IF NOT EXISTS response_fts_delete AFTER DELETE ON responses
+BEGIN
+    INSERT INTO response_fts (response_fts, rowid, response_text) VALUES ('delete', OLD.rowid, OLD.response_text);
+END;
+CREATE TRIGGER IF NOT EXISTS response_fts_update AFTER UPDATE OF response_text ON responses
+BEGIN
+    INSERT INTO response_fts (response_fts, rowid, response_text) VALUES ('delete', OLD.rowid, OLD.response_text);
+    INSERT INTO response_fts (rowid, response_text) VALUES (NEW.rowid, NEW.response_text);
+END;
+"""
+SEARCH_TRIGGERS = ('complaint_fts_insert', 'complaint_fts_delete', 'complaint_fts_update',
+                   'response_fts_insert', 'response_fts_delete', 'response_fts_update')
+
+COMPLAINT_COLUMNS = ('complaint_id', 'stall_id', 'complaint_date',
+                     'problem_type', 'complaint_description', 'status')
+RESPONSE_COLUMNS = ('response_id', 'complaint_id', 'response_date', 'response_text')
+
+# เรียงวันที่ใหม่ -> เก่า และรายการที่เพิ่มก่อนมาก่อนเมื่อวันที่เท่ากัน (เหมือน ComplaintModel)
+NEWEST_FIRST = "ORDER BY complaint_date DESC, rowid ASC"
+
+# วันแรกของช่วงเวลาที่ complaint_date อยู่ (สัปดาห์เริ่มวันจันทร์)
+BUCKET_EXPRESSIONS = {
+    'day': "c.complaint_date",
+    'week': "date(c.complaint_date, 'weekday 0', '-6 days')",
+    'month': "substr(c.complaint_date, 1, 7) || '-01'"
+}
+
+# key ของแต่ละมิติในผลลัพธ์แนวโน้ม
+DIMENSION_EXPRESSIONS = {
+    'all': "''",
+    'stall': "c.stall_id",
+    'canteen': "s.canteen_id"
+}
+
+
+def _as_date(value) -> date or None:
+    """แปลงวันที่ที่เป็นข้อความ (YYYY-MM-DD) เป็น date"""
+    if value is None or isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class SQLiteComplaintModel:
+    """Model ระบบร้องเรียนที่เก็บข้อมูลใน SQLite (public method เหมือน ComplaintModel)"""
+    
+    STATUSES = ('รอดำเนินการ', 'ดำเนินการแล้ว')
+    
+    # น้ำหนักของแต่ละฟิลด์ในการจัดอันดับผลการค้นหา (เหมือน ComplaintModel)
+    SEARCH_WEIGHTS = {'problem_type': 3.0, 'complaint_description': 2.0, 'response_text': 1.0}
+    
+    # ลำดับที่ query_complaints รองรับ (เหมือน ComplaintModel)
+    QUERY_SORTS = ('newest', 'oldest', 'stall_id', 'problem_type', 'status')
+    
+    # จำนวนรายการล่าสุดใน change_log ที่เก็บไว้หลัง compact
+    CHANGE_LOG_KEEP = 10000
+    
+    # connection เดียวใช้พร้อมกันหลาย thread ไม่ได้ (API server จึงอ่านทีละคำขอ)
+    THREAD_SAFE_READS = False
+    
+    # ความยาวคำค้นขั้นต่ำที่ดัชนี FTS5 แบบ trigram ค้นได้ (คำที่สั้นกว่าค้นจากตารางหลักด้วย LIKE)
+    FTS_MIN_TOKEN = 3
+    
+    def __init__(self, db_path: str = os.path.join("data", "complaints.db")):
+        self.db_path = db_path
+        # ใช้จาก thread อื่นได้ (เช่น executor ของ API server) แต่ผู้เรียกต้องไม่ใช้พร้อมกัน
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self._fts = self._create_search_tables()
+        # สำหรับตรวจการเปลี่ยนแปลงจาก connection อื่น (process อื่นที่เปิดฐานข้อมูลเดียวกัน):
+        # seq ล่าสุดใน change_log ที่อ่านแล้ว และ seq ที่ connection นี้เขียนเอง
+        self._data_version = self._pragma_data_version()
+        self._seen_seq = self._last_change()
+        self._own_seqs = set()
+        self._write_start = 0
+        self._writes = 0
+    
+    @property
+    def generation(self) -> Tuple[int, int]:
+        """เปลี่ยนทุกครั้งที่ connection นี้หรือ connection อื่น commit (ใช้ตรวจว่าผลที่ cache ไว้ยังใช้ได้)"""
+        return (self._writes, self._pragma_data_version())
+    
+    def _fetch_all(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """รัน query และคืนผลลัพธ์เป็น list ของ dict"""
+        return [dict(row) for row in self.conn.execute(sql, params)]
+    
+    def _fetch_one(self, sql: str, params: tuple = ()) -> Dict[str, Any] or None:
+        """รัน query และคืนแถวแรกเป็น dict"""
+        row = self.conn.execute(sql, params).fetchone()
+        return dict(row) if row else None
+    
+    def load_all_data(self):
+        """ข้อมูลอยู่ในฐานข้อมูลแล้ว ไม่ต้องโหลดล่วงหน้า"""
+    
+    def save_complaints(self):
+        """บันทึกข้อมูลการร้องเรียน (ทุกการเขียน commit ทันที)"""
+        self.conn.commit()
+    
+    def save_responses(self):
+        """บันทึกข้อมูลการตอบกลับ (ทุกการเขียน commit ทันที)"""
+        self.conn.commit()
+    
+    def attach_writer(self, writer):
+        """SQLite commit ใน thread ที่เรียกเสมอ (การเขียนแต่ละครั้งมีขนาดเล็ก)"""
+    
+    def poll_writer(self) -> List[Exception]:
+        """ไม่มีงานเขียนเบื้องหลังสำหรับ SQLite"""
+        return []
+    
+    def compact(self):
+        """ตัด change_log ให้เหลือ CHANGE_LOG_KEEP รายการล่าสุด แล้วเขียน WAL กลับเข้าไฟล์ฐานข้อมูลหลัก"""
+        self.conn.execute(
+            "DELETE FROM change_log WHERE seq <= ?", (self._last_change() - self.CHANGE_LOG_KEEP,)
+        )
+        self.conn.commit()
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    
+    def close(self):
+        """ปิดการเชื่อมต่อฐานข้อมูล"""
+        self.conn.close()
+    
+    def _create_search_tables(self) -> bool:
+        """สร้างดัชนี FTS5 สำหรับ search_complaints คืน False ถ้า SQLite ไม่รองรับ trigram
+        
+        ถ้ายังไม่มี trigger ของดัชนี (ฐานข้อมูลเดิม หรือการย้ายข้อมูลที่ทำดัชนีไม่เสร็จ)
+        จะทำดัชนีจากข้อมูลทั้งหมดครั้งเดียว ห้าม VACUUM ฐานข้อมูลโดยไม่ 'rebuild' ดัชนี
+        เพราะ VACUUM อาจเปลี่ยน rowid
+        """
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (SEARCH_TRIGGERS[0],)
+        ).fetchone()
+        try:
+            self.conn.executescript(SEARCH_SCHEMA)
+        except sqlite3.OperationalError:
+            return False
+        if not exists:
+            self.conn.execute("INSERT INTO complaint_fts (complaint_fts) VALUES ('rebuild')")
+            self.conn.execute("INSERT INTO response_fts (response_fts) VALUES ('rebuild')")
+            self.conn.commit()
+        return True
+    
+    def _begin_write(self):
+        """เริ่ม transaction ที่จอง lock การเขียนทันที เพื่อให้การนับ ID และ INSERT
+        ไม่ถูก process อื่นแทรกระหว่างกลาง (เรียกผ่าน _write)"""
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN IMMEDIATE")
+            self._write_start = self._last_change()
+    
+    def _commit_write(self):
+        """commit transaction ที่เริ่มด้วย _begin_write และจำ seq ใน change_log ที่เขียนใน
+        transaction นี้ไว้ (ถือ lock การเขียนอยู่ จึงเป็นของ connection นี้ทั้งหมด)"""
+        self._own_seqs.update(row[0] for row in self.conn.execute(
+            "SELECT seq FROM change_log WHERE seq > ?", (self._write_start,)
+        ))
+        self.conn.commit()
+        self._writes += 1
+    
+    @contextmanager
+    def _write(self):
+        """ทำงานเขียนใน transaction ของ _begin_write: commit เมื่อสำเร็จ rollback เมื่อผิดพลาด
+        
+        ต้องไม่ค้าง transaction (และ lock การเขียน) ไว้หลังข้อผิดพลาด มิฉะนั้น instance อื่น
+        จะเขียนไม่ได้จนกว่า process นี้ปิด ถ้าเรียกซ้อนกัน transaction นอกสุดเป็นผู้ commit
+        """
+        if self.conn.in_transaction:
+            yield
+            return
+        self._begin_write()
+        try:
+            yield
+            self._commit_write()
+        except BaseException:
+            self.conn.rollback()
+            raise
+    
+    # ===== Change Detection =====
+    def _pragma_data_version(self) -> int:
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _last_change(self) -> int:
+        """seq ล่าสุดใน change_log (0 ถ้ายังไม่มี)"""
+        return self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+    
+    def has_external_changes(self) -> bool:
+        """data_version เปลี่ยนเมื่อ connection อื่น commit"""
+        return self._pragma_data_version() != self._data_version
+    
+    def check_external_changes(self) -> Dict[str, List[str]]:
+        """คืน ID ที่ connection อื่นเพิ่มหรือแก้ไขตั้งแต่การเรียกครั้งก่อน (รูปแบบเดียวกับ ComplaintModel)
+        
+        ตรวจ data_version ก่อน แล้วอ่านเฉพาะรายการใน change_log (เขียนโดย trigger ของ
+        INSERT และการเปลี่ยนสถานะ) ที่ใหม่กว่า seq ที่เห็นล่าสุด ข้าม seq ที่ connection นี้
+        เขียนเอง การร้องเรียนที่ได้รับการตอบกลับใหม่นับเป็น 'complaints_updated' ด้วย
+        """
+        changes = {'complaints_added': [], 'complaints_updated': [], 'responses_added': []}
+        version = self._pragma_data_version()
+        if version == self._data_version and not self._own_seqs:
+            return changes
+        self._data_version = version
+        for seq, kind, record_id, complaint_id in self.conn.execute(
+                "SELECT l.seq, l.kind, l.record_id, r.complaint_id FROM change_log l"
+                " LEFT JOIN responses r ON l.kind = 'responses_added' AND r.response_id = l.record_id"
+                " WHERE l.seq > ? ORDER BY l.seq", (self._seen_seq,)):
+            self._seen_seq = seq
+            if seq in self._own_seqs:
+                self._own_seqs.discard(seq)
+                continue
+            changes[kind].append(record_id)
+            if complaint_id is not None:
+                changes['complaints_updated'].append(complaint_id)
+        # seq ของตัวเองที่ถูกตัดออกจาก change_log ไปแล้วไม่ต้องรออีก
+        self._own_seqs = {seq for seq in self._own_seqs if seq > self._seen_seq}
+        return {key: list(dict.fromkeys(ids)) for key, ids in changes.items()}
+    
+    # ===== Canteen Operations =====
+    def get_all_canteens(self) -> List[Dict[str, Any]]:
+        """ดึงข้อมูลโรงอาหารทั้งหมด"""
+        return self._fetch_all("SELECT * FROM canteens ORDER BY rowid")
+    
+    def get_canteen_by_id(self, canteen_id: str) -> Dict[str, Any] or None:
+        """ดึงข้อมูลโรงอาหารตาม ID"""
+        return self._fetch_one("SELECT * FROM canteens WHERE canteen_id = ?", (canteen_id,))
+    
+    # ===== Stall Operations =====
+    def get_all_stalls(self) -> List[Dict[str, Any]]:
+        """ดึงข้อมูลร้านอาหารทั้งหมด"""
+        return self._fetch_all("SELECT * FROM stalls ORDER BY rowid")
+    
+    def get_stall_by_id(self, stall_id: str) -> Dict[str, Any] or None:
+        """ดึงข้อมูลร้านอาหารตาม ID"""
+        return self._fetch_one("SELECT * FROM stalls WHERE stall_id = ?", (stall_id,))
+    
+    def get_stalls_by_canteen(self, canteen_id: str) -> List[Dict[str, Any]]:
+        """ดึงร้านอาหารตามโรงอาหาร"""
+        return self._fetch_all(
+            "SELECT * FROM stalls WHERE canteen_id = ? ORDER BY rowid", (canteen_id,)
+        )
+    
+    def get_stall_name(self, stall_id: str) -> str:
+        """ดึงชื่อร้านจาก stall_id"""
+        stall = self.get_stall_by_id(stall_id)
+        return stall['stall_name'] if stall else 'ไม่พบร้าน'
+    
+    # ===== Complaint Operations =====
+    def get_all_complaints(self) -> List[Dict[str, Any]]:
+        """ดึงข้อมูลการร้องเรียนทั้งหมดเรียงตามวันที่ล่าสุด"""
+        return self._fetch_all(f"SELECT * FROM complaints {NEWEST_FIRST}")
+    
+    def get_latest_complaints(self, limit: int) -> List[Dict[str, Any]]:
+        """ดึงการร้องเรียนล่าสุด limit รายการ"""
+        if limit <= 0:
+            return []
+        return self._fetch_all(f"SELECT * FROM complaints {NEWEST_FIRST} LIMIT ?", (limit,))
+    
+    def get_complaint_by_id(self, complaint_id: str) -> Dict[str, Any] or None:
+        """ดึงข้อมูลการร้องเรียนตาม ID"""
+        return self._fetch_one(
+            "SELECT * FROM complaints WHERE complaint_id = ?", (complaint_id,)
+        )
+    
+    def get_complaints_by_stall(self, stall_id: str) -> List[Dict[str, Any]]:
+        """ดึงการร้องเรียนของร้านหนึ่ง"""
+        return self._fetch_all(
+            f"SELECT * FROM complaints WHERE stall_id = ? {NEWEST_FIRST}", (stall_id,)
+        )
+    
+    def get_complaints_by_status(self, status: str) -> List[Dict[str, Any]]:
+        """ดึงการร้องเรียนตามสถานะ"""
+        return self._fetch_all(
+            f"SELECT * FROM complaints WHERE status = ? {NEWEST_FIRST}", (status,)
+        )
+    
+    def count_complaints(self, status: str = None) -> int:
+        """นับจำนวนการร้องเรียนทั้งหมด หรือเฉพาะสถานะที่กำหนด"""
+        if status is None:
+            return self.conn.execute("SELECT COUNT(*) FROM complaints").fetchone()[0]
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM complaints WHERE status = ?", (status,)
+        ).fetchone()[0]
+    
+    def get_complaints_page(self, offset: int, limit: int, status: str = None) -> List[Dict[str, Any]]:
+        """ดึงการร้องเรียนหนึ่งหน้า (เรียงตามวันที่ล่าสุด)"""
+        if limit <= 0 or offset < 0:
+            return []
+        if status is None:
+            return self._fetch_all(
+                f"SELECT * FROM complaints {NEWEST_FIRST} LIMIT ? OFFSET ?", (limit, offset)
+            )
+        return self._fetch_all(
+            f"SELECT * FROM complaints WHERE status = ? {NEWEST_FIRST} LIMIT ? OFFSET ?",
+            (status, limit, offset)
+        )
+    
+    def get_complaints_between(self, start, end, status: str = None) -> List[Dict[str, Any]]:
+        """ดึงการร้องเรียนตั้งแต่วันที่ start ถึง end (รวมทั้งสองวัน) เรียงตามวันที่ล่าสุด"""
+        return self._fetch_all(*self._between_query(start, end, status))
+    
+    def iter_complaints(self, status: str = None, start=None, end=None) -> Iterator[Dict[str, Any]]:
+        """วนการร้องเรียนเรียงตามวันที่ล่าสุดทีละแถวจาก cursor โดยไม่โหลดทั้งหมด (สำหรับ export)"""
+        for row in self.conn.execute(*self._between_query(start, end, status)):
+            yield dict(row)
+    
+    def _between_query(self, start, end, status: str = None) -> Tuple[str, tuple]:
+        """SQL และพารามิเตอร์ของการร้องเรียนในช่วงวันที่ (ไม่ระบุ = ไม่จำกัด) และสถานะ"""
+        conditions = []
+        params = []
+        if start is not None:
+            conditions.append("complaint_date >= ?")
+            params.append(str(start))
+        if end is not None:
+            conditions.append("complaint_date <= ?")
+            params.append(str(end))
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"SELECT * FROM complaints {where} {NEWEST_FIRST}", tuple(params)
+    
+    def query_complaints(self, status: str = None, canteen_id: str = None, stall_id: str = None,
+                         problem_type: str = None, start=None, end=None, sort: str = 'newest',
+                         offset: int = 0, limit: int = None) -> Dict[str, Any]:
+        """ค้นการร้องเรียนที่ตรงทุกเงื่อนไขที่ระบุ (None = ไม่กรองฟิลด์นั้น)
+        
+        คืน {'complaints': หนึ่งหน้า, 'total': จำนวนที่ตรงทั้งหมด} เหมือน ComplaintModel
+        SQLite เลือก index ของฟิลด์ที่ระบุเอง โรงอาหารกรองผ่านร้านใน idx_stalls_canteen
+        """
+        if sort not in self.QUERY_SORTS:
+            raise ValueError(f"ไม่รู้จักการเรียงลำดับ {sort}")
+        conditions = []
+        params = []
+        for field, value in (('status', status), ('stall_id', stall_id), ('problem_type', problem_type)):
+            if value is not None:
+                conditions.append(f"{field} = ?")
+                params.append(value)
+        if canteen_id is not None:
+            conditions.append("stall_id IN (SELECT stall_id FROM stalls WHERE canteen_id = ?)")
+            params.append(canteen_id)
+        if start is not None:
+            conditions.append("complaint_date >= ?")
+            params.append(str(start))
+        if end is not None:
+            conditions.append("complaint_date <= ?")
+            params.append(str(end))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if sort == 'newest':
+            order = NEWEST_FIRST
+        elif sort == 'oldest':
+            order = "ORDER BY complaint_date ASC, rowid DESC"
+        else:
+            order = f"ORDER BY {sort}, complaint_date DESC, rowid ASC"
+        total = self.conn.execute(f"SELECT COUNT(*) FROM complaints {where}", params).fetchone()[0]
+        offset = max(offset, 0)
+        limit = -1 if limit is None else max(limit, 0)
+        complaints = self._fetch_all(
+            f"SELECT * FROM complaints {where} {order} LIMIT ? OFFSET ?", tuple(params) + (limit, offset)
+        )
+        return {'complaints': complaints, 'total': total}
+    
+    def get_problem_types(self) -> List[str]:
+        """ประเภทปัญหาทั้งหมดที่มีการร้องเรียน (เรียงตามตัวอักษร)"""
+        rows = self.conn.execute("SELECT DISTINCT problem_type FROM complaints ORDER BY problem_type")
+        return [row[0] for row in rows]
+    
+    def search_complaints(self, query: str, limit: int = 100, status: str = None) -> List[Dict[str, Any]]:
+        """ค้นหาการร้องเรียนจากประเภทปัญหา รายละเอียด และข้อความตอบกลับ
+        
+        คะแนนคือผลรวมน้ำหนักของฟิลด์ที่พบคำค้น (ข้อความต่อกันแบบไม่สนตัวพิมพ์)
+        คะแนนเท่ากันเรียงตามวันที่ล่าสุด ใช้ดัชนี FTS5 ถ้ามี มิฉะนั้นใช้ LIKE กับทุกแถว
+        """
+        tokens = TextSearchIndex().tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+        if self._fts:
+            scores, params = self._fts_scores(tokens)
+        else:
+            scores, params = self._like_scores(tokens)
+        where = "m.score > 0"
+        if status is not None:
+            where += " AND c.status = ?"
+            params.append(status)
+        return self._fetch_all(
+            f"SELECT c.* FROM ({scores}) m JOIN complaints c ON c.rowid = m.ref WHERE {where}"
+            f" ORDER BY m.score DESC, c.complaint_date DESC, c.rowid ASC LIMIT ?",
+            tuple(params) + (limit,)
+        )
+    
+    def _fts_scores(self, tokens: List[str]) -> Tuple[str, List[str]]:
+        """query (ref = rowid ของการร้องเรียน, score) จากดัชนี FTS5 เฉพาะแถวที่พบคำค้น
+        
+        tokenize ตัดเครื่องหมาย % _ และ \\ ออกแล้ว คำค้นจึงใช้เป็นรูปแบบ LIKE ได้โดยตรง
+        คำที่สั้นกว่า FTS_MIN_TOKEN ไม่พบในดัชนี trigram จึงค้นจากตารางหลักแทน
+        """
+        weights = self.SEARCH_WEIGHTS
+        branches = []
+        params = []
+        for token in tokens:
+            if len(token) >= self.FTS_MIN_TOKEN:
+                complaint_source, response_source = "complaint_fts", "response_fts"
+            else:
+                complaint_source, response_source = "complaints", "responses"
+            branches.extend([
+                f"SELECT rowid AS ref, {weights['problem_type']} AS weight"
+                f" FROM {complaint_source} WHERE problem_type LIKE ?",
+                f"SELECT rowid, {weights['complaint_description']}"
+                f" FROM {complaint_source} WHERE complaint_description LIKE ?",
+                f"SELECT DISTINCT c.rowid, {weights['response_text']} FROM {response_source} f"
+                f" JOIN responses r ON r.rowid = f.rowid JOIN complaints c ON c.complaint_id = r.complaint_id"
+                f" WHERE f.response_text LIKE ?",
+            ])
+            params.extend(['%' + token + '%'] * 3)
+        return (f"SELECT ref, SUM(weight) AS score FROM ({' UNION ALL '.join(branches)}) GROUP BY ref",
+                params)
+    
+    def _like_scores(self, tokens: List[str]) -> Tuple[str, List[str]]:
+        """query (ref, score) ด้วย LIKE ต่อคำค้นกับทุกแถว (เมื่อ SQLite ไม่รองรับ FTS5 trigram)"""
+        terms = []
+        params = []
+        for token in tokens:
+            pattern = '%' + token.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            terms.append(
+                f"(CASE WHEN c.problem_type LIKE ? ESCAPE '\\' THEN {self.SEARCH_WEIGHTS['problem_type']} ELSE 0 END"
+                f" + CASE WHEN c.complaint_description LIKE ? ESCAPE '\\'"
+                f" THEN {self.SEARCH_WEIGHTS['complaint_description']} ELSE 0 END"
+                f" + CASE WHEN EXISTS (SELECT 1 FROM responses r WHERE r.complaint_id = c.complaint_id"
+                f" AND r.response_text LIKE ? ESCAPE '\\')"
+                f" THEN {self.SEARCH_WEIGHTS['response_text']} ELSE 0 END)"
+            )
+            params.extend([pattern] * 3)
+        return f"SELECT c.rowid AS ref, {' + '.join(terms)} AS score FROM complaints c", params
+    
+    def add_complaint(self, stall_id: str, problem_type: str, description: str) -> str:
+        """เพิ่มการร้องเรียนใหม่"""
+        with self._write():
+            new_id = self._allocate_ids('complaints', 'complaint_id', 'C', 1)[0]
+            self.conn.execute(
+                "INSERT INTO complaints VALUES (?, ?, ?, ?, ?, ?)",
+                (new_id, stall_id, datetime.now().strftime('%Y-%m-%d'),
+                 problem_type, description, 'รอดำเนินการ')
+            )
+        return new_id
+    
+    def add_complaints(self, rows: List[Dict[str, Any]]) -> List[str]:
+        """เพิ่มการร้องเรียนหลายรายการใน transaction เดียว คืน ID ตามลำดับแถว
+        
+        ตรวจแถวแบบเดียวกับ ComplaintModel.add_complaints (ผิดแถวใดก็ไม่เพิ่มเลย)
+        """
+        stall_ids = {row[0] for row in self.conn.execute("SELECT stall_id FROM stalls")}
+        prepared = prepare_complaint_rows(
+            rows, stall_ids, self.STATUSES, datetime.now().strftime('%Y-%m-%d')
+        )
+        if not prepared:
+            return []
+        with self._write():
+            new_ids = self._allocate_ids('complaints', 'complaint_id', 'C', len(prepared))
+            self.conn.executemany(
+                "INSERT INTO complaints VALUES (?, ?, ?, ?, ?, ?)",
+                [(new_id, values['stall_id'], values['complaint_date'], values['problem_type'],
+                  values['complaint_description'], values['status'])
+                 for new_id, values in zip(new_ids, prepared)]
+            )
+        return new_ids
+    
+    def _allocate_ids(self, table: str, key: str, prefix: str, count: int) -> List[str]:
+        """จอง ID ใหม่ count รายการต่อจากจำนวนแถวเดิม ข้าม ID ที่มีอยู่แล้ว (เรียกหลัง _begin_write)"""
+        number = self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        new_ids = []
+        while len(new_ids) < count:
+            number += 1
+            new_id = f"{prefix}{number:03d}"
+            if self.conn.execute(f"SELECT 1 FROM {table} WHERE {key} = ?", (new_id,)).fetchone() is None:
+                new_ids.append(new_id)
+        return new_ids
+    
+    def update_complaint_status(self, complaint_id: str, status: str):
+        """อัปเดตสถานะการร้องเรียน"""
+        with self._write():
+            self.conn.execute(
+                "UPDATE complaints SET status = ? WHERE complaint_id = ?", (status, complaint_id)
+            )
+    
+    # ===== Response Operations =====
+    def get_responses_by_complaint(self, complaint_id: str) -> List[Dict[str, Any]]:
+        """ดึงการตอบกลับทั้งหมดของการร้องเรียนหนึ่ง"""
+        return self._fetch_all(
+            "SELECT * FROM responses WHERE complaint_id = ? ORDER BY response_date, rowid",
+            (complaint_id,)
+        )
+    
+    def iter_responses(self) -> Iterator[Dict[str, Any]]:
+        """วนการตอบกลับทั้งหมดตามลำดับที่เพิ่มทีละแถว (สำหรับ export)"""
+        for row in self.conn.execute("SELECT * FROM responses ORDER BY rowid"):
+            yield dict(row)
+    
+    def add_response(self, complaint_id: str, response_text: str, response_date: str = None) -> str:
+        """เพิ่มการตอบกลับการร้องเรียน"""
+        if response_date is None:
+            response_date = datetime.now().strftime('%Y-%m-%d')
+        
+        with self._write():
+            new_response_id = self._allocate_ids('responses', 'response_id', 'R', 1)[0]
+            self.conn.execute(
+                "INSERT INTO responses VALUES (?, ?, ?, ?)",
+                (new_response_id, complaint_id, response_date, response_text)
+            )
+            
+            # อัปเดตสถานะเป็น "ดำเนินการแล้ว" (ใน transaction เดียวกัน)
+            self.update_complaint_status(complaint_id, 'ดำเนินการแล้ว')
+        
+        return new_response_id
+    
+    # ===== Statistics Operations =====
+    def _status_columns(self) -> str:
+        """สร้างคอลัมน์ SUM แยกตามสถานะสำหรับ query สรุป"""
+        return ", ".join(
+            f"SUM(CASE WHEN c.status = '{status}' THEN 1 ELSE 0 END) AS status_{i}"
+            for i, status in enumerate(self.STATUSES)
+        )
+    
+    def _with_status_count(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """ย้ายคอลัมน์ status_i เข้า dict status_count"""
+        row['status_count'] = {
+            status: row.pop(f"status_{i}") or 0 for i, status in enumerate(self.STATUSES)
+        }
+        return row
+    
+    def _stall_summary_rows(self, where: str = "", params: tuple = ()) -> List[Dict[str, Any]]:
+        """query สรุปจำนวนการร้องเรียนของร้าน (กรองด้วย where ได้)"""
+        rows = self._fetch_all(f"""
+            SELECT s.stall_id, s.stall_name, COUNT(c.complaint_id) AS complaint_count,
+                   {self._status_columns()}
+            FROM stalls s LEFT JOIN complaints c ON c.stall_id = s.stall_id
+            {where}
+            GROUP BY s.stall_id
+            ORDER BY complaint_count DESC, s.rowid
+        """, params)
+        return [self._with_status_count(row) for row in rows]
+    
+    def _canteen_summary_rows(self, where: str = "", params: tuple = ()) -> List[Dict[str, Any]]:
+        """query สรุปจำนวนการร้องเรียนของโรงอาหาร (กรองด้วย where ได้)"""
+        rows = self._fetch_all(f"""
+            SELECT t.canteen_id, t.canteen_name, t.location,
+                   COUNT(c.complaint_id) AS complaint_count,
+                   {self._status_columns()}
+            FROM canteens t
+            LEFT JOIN stalls s ON s.canteen_id = t.canteen_id
+            LEFT JOIN complaints c ON c.stall_id = s.stall_id
+            {where}
+            GROUP BY t.canteen_id
+            ORDER BY complaint_count DESC, t.rowid
+        """, params)
+        return [self._with_status_count(row) for row in rows]
+    
+    def get_stall_complaint_summary(self) -> List[Dict[str, Any]]:
+        """ดึงข้อมูลร้านทั้งหมด และจำนวนการร้องเรียนแต่ละสัถานะ"""
+        return self._stall_summary_rows()
+    
+    def get_stall_summary_by_id(self, stall_id: str) -> Dict[str, Any] or None:
+        """ดึงตัวนับการร้องเรียนของร้านหนึ่ง"""
+        rows = self._stall_summary_rows("WHERE s.stall_id = ?", (stall_id,))
+        return rows[0] if rows else None
+    
+    def get_canteen_summary_by_id(self, canteen_id: str) -> Dict[str, Any] or None:
+        """ดึงตัวนับการร้องเรียนของโรงอาหารหนึ่ง"""
+        rows = self._canteen_summary_rows("WHERE t.canteen_id = ?", (canteen_id,))
+        return rows[0] if rows else None
+    
+    def get_trend(self, granularity: str, dimension: str = 'all', start=None, end=None,
+                  status: str = None) -> List[Dict[str, Any]]:
+        """จำนวนการร้องเรียนต่อวัน/สัปดาห์/เดือน (GROUP BY ช่วงเวลา)"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"ไม่รู้จักช่วงเวลา: {granularity}")
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"ไม่รู้จักมิติ: {dimension}")
+        start = _as_date(start)
+        end = _as_date(end)
+        conditions = []
+        params = []
+        # ช่วงที่คร่อม start/end นับทั้งช่วง (เหมือน ComplaintModel)
+        if start is not None:
+            conditions.append("c.complaint_date >= ?")
+            params.append(bucket_start(start, granularity).isoformat())
+        if end is not None:
+            conditions.append("c.complaint_date < ?")
+            params.append(next_bucket(bucket_start(end, granularity), granularity).isoformat())
+        if status is not None:
+            conditions.append("c.status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.conn.execute(f"""
+            SELECT {BUCKET_EXPRESSIONS[granularity]} AS bucket,
+                   {DIMENSION_EXPRESSIONS[dimension]} AS key, COUNT(*) AS count
+            FROM complaints c LEFT JOIN stalls s ON s.stall_id = c.stall_id
+            {where}
+            GROUP BY bucket, key
+        """, params).fetchall()
+        counts: Dict[str, Dict[str, int]] = {}
+        for bucket, key, count in rows:
+            if key is not None:
+                counts.setdefault(bucket, {})[key] = count
+        # ช่วงเริ่มต้น/สิ้นสุดที่ไม่ระบุใช้วันที่ของการร้องเรียนทั้งหมด (ไม่ขึ้นกับสถานะ)
+        oldest, newest = self.conn.execute(
+            "SELECT MIN(complaint_date), MAX(complaint_date) FROM complaints"
+        ).fetchone()
+        if oldest is None:
+            return []
+        first = start or _as_date(oldest)
+        last = end or _as_date(newest)
+        return [
+            {'bucket': bucket.isoformat(), 'counts': counts.get(bucket.isoformat(), {})}
+            for bucket in iter_buckets(granularity, first, last)
+        ]
+    
+    def get_canteen_summary(self) -> List[Dict[str, Any]]:
+        """ดึงข้อมูลโรงอาหารทั้งหมด และจำนวนการร้องเรียน"""
+        return self._canteen_summary_rows()
+    
+    def get_top_offenders(self, dimension: str = 'stall', metric: str = 'total', limit: int = 10,
+                          days: int = 30, end=None) -> List[Dict[str, Any]]:
+        """ร้านหรือโรงอาหารที่มีการร้องเรียนมากที่สุด limit อันดับ (ผลเหมือน ComplaintModel)
+        
+        จำนวนในช่วงวันล่าสุดนับด้วย GROUP BY บน idx_complaints_date
+        """
+        check_ranking(dimension, metric, days)
+        if dimension == 'stall':
+            entries = self._stall_summary_rows()
+        else:
+            entries = self._canteen_summary_rows()
+        # เรียงตามลำดับที่เพิ่มเหมือน ComplaintModel เพื่อให้ค่าเท่ากันได้ลำดับเดียวกัน
+        rowids = dict(self.conn.execute(f"SELECT {dimension}_id, rowid FROM {dimension}s"))
+        id_field = f'{dimension}_id'
+        entries.sort(key=lambda entry: rowids[entry[id_field]])
+        if metric == 'total':
+            count_of = lambda entry: entry['complaint_count']
+        elif metric == 'pending':
+            count_of = lambda entry: entry['status_count'][self.STATUSES[0]]
+        else:
+            start, end = recent_window(days, _as_date(end))
+            counts = dict(self.conn.execute(f"""
+                SELECT {DIMENSION_EXPRESSIONS[dimension]} AS key, COUNT(*)
+                FROM complaints c LEFT JOIN stalls s ON s.stall_id = c.stall_id
+                WHERE c.complaint_date BETWEEN ? AND ?
+                GROUP BY key
+            """, (start.isoformat(), end.isoformat())))
+            count_of = lambda entry: counts.get(entry[id_field], 0)
+        return [
+            dict(entry, rank=rank, count=count)
+            for rank, (entry, count) in enumerate(top_entries(entries, count_of, limit), 1)
+        ]
+
+
+def migrate_csv_to_sqlite(data_dir: str, db_path: str) -> Dict[str, int]:
+    """ย้ายข้อมูลจากไฟล์ CSV ทั้งสี่ไฟล์เข้าฐานข้อมูล SQLite (ครั้งเดียว)"""
+    # ใช้ ComplaintModel เพื่อให้รายการที่ค้างใน journal ถูกนำเข้าด้วย
+    from models.complaint_model import ComplaintModel
+    
+    source = ComplaintModel(data_dir)
+    tables = {
+        'canteens': (('canteen_id', 'canteen_name', 'location'), source.canteens),
+        'stalls': (('stall_id', 'stall_name', 'canteen_id', 'owner_name'), source.stalls),
+        'complaints': (COMPLAINT_COLUMNS, source.complaints),
+        'responses': (RESPONSE_COLUMNS, source.responses),
+    }
+    
+    target = SQLiteComplaintModel(db_path)
+    counts = {}
+    with target.conn:
+        # ทำดัชนีค้นหาครั้งเดียวหลังนำเข้า (เร็วกว่า trigger ทีละแถวหลายเท่า)
+        for trigger in SEARCH_TRIGGERS:
+            target.conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        for table, (columns, rows) in tables.items():
+            placeholders = ", ".join("?" for _ in columns)
+            target.conn.execute(f"DELETE FROM {table}")
+            target.conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                ([row.get(column, '') for column in columns] for row in rows)
+            )
+            counts[table] = len(rows)
+        # แถวที่ย้ายมาไม่ใช่การเปลี่ยนแปลงที่ instance อื่นต้องแสดง
+        target.conn.execute("DELETE FROM change_log")
+    target._create_search_tables()
+    target.close()
+    return counts
+
+
+if __name__ == "__main__":
+    # python -m models.sqlite_model [data_dir] [db_path]
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data"
+    db_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(data_dir, "complaints.db")
+    for table, count in migrate_csv_to_sqlite(data_dir, db_path).items():
+        print(f"{table}: {count} แถว")
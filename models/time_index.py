@@ -0,0 +1,186 @@
+import bisect
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Any, Iterator, Tuple
+
+
+# ช่วงเวลาที่รวมจำนวนการร้องเรียนไว้ล่วงหน้า
+GRANULARITIES = ('day', 'week', 'month')
+
+# มิติที่แยกนับ: ทั้งหมด, ร้าน, โรงอาหาร
+DIMENSIONS = ('all', 'stall', 'canteen')
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    """วันแรกของช่วงเวลาที่วันนั้นอยู่ (สัปดาห์เริ่มวันจันทร์)"""
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"ไม่รู้จักช่วงเวลา: {granularity}")
+
+
+def next_bucket(start: date, granularity: str) -> date:
+    """วันแรกของช่วงเวลาถัดไป"""
+    if granularity == 'day':
+        return start + timedelta(days=1)
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    if granularity == 'month':
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    raise ValueError(f"ไม่รู้จักช่วงเวลา: {granularity}")
+
+
+def iter_buckets(granularity: str, first: date, last: date) -> Iterator[date]:
+    """วันแรกของทุกช่วงเวลาตั้งแต่ช่วงที่มี first จนถึงช่วงที่มี last"""
+    current = bucket_start(first, granularity)
+    while current <= last:
+        yield current
+        current = next_bucket(current, granularity)
+
+
+class TimeBucketIndex:
+    """จำนวนการร้องเรียนที่รวมไว้ล่วงหน้าตามวัน สัปดาห์ และเดือน
+    
+    แต่ละช่วงเวลาเก็บตัวนับ (มิติ, key, สถานะ) -> จำนวน การสรุปแนวโน้มจึงอ่านจาก
+    ตัวนับโดยไม่ต้องไล่การร้องเรียนทุกรายการ (จำนวนรวมทุกสถานะคำนวณตอนดึงข้อมูล)
+    """
+    
+    def __init__(self):
+        # granularity -> วันแรกของช่วง -> (มิติ, key, สถานะ) -> จำนวน
+        self.buckets: Dict[str, Dict[date, Dict[Tuple[str, str, str], int]]] = {
+            granularity: {} for granularity in GRANULARITIES
+        }
+        # วันแรกของช่วงที่มีข้อมูล เรียงจากเก่าไปใหม่ (ใช้หาช่วงแรกและช่วงสุดท้าย)
+        self.bucket_keys: Dict[str, List[date]] = {
+            granularity: [] for granularity in GRANULARITIES
+        }
+    
+    def _counter(self, granularity: str, day: date) -> Dict[Tuple[str, str, str], int]:
+        """ตัวนับของช่วงเวลาที่วันนั้นอยู่ (สร้างใหม่ถ้ายังไม่มี)"""
+        start = bucket_start(day, granularity)
+        counter = self.buckets[granularity].get(start)
+        if counter is None:
+            counter = self.buckets[granularity][start] = {}
+            bisect.insort(self.bucket_keys[granularity], start)
+        return counter
+    
+    @staticmethod
+    def _keys(stall_id: str, canteen_id: str) -> List[Tuple[str, str]]:
+        keys = [('all', ''), ('stall', stall_id)]
+        if canteen_id:
+            keys.append(('canteen', canteen_id))
+        return keys
+    
+    def add(self, day: date, stall_id: str, canteen_id: str, status: str, delta: int = 1):
+        """นับการร้องเรียน delta รายการของร้าน/โรงอาหารในวันนั้น"""
+        keys = self._keys(stall_id, canteen_id)
+        for granularity in GRANULARITIES:
+            counter = self._counter(granularity, day)
+            for dimension, key in keys:
+                counter_key = (dimension, key, status)
+                counter[counter_key] = counter.get(counter_key, 0) + delta
+    
+    def add_many(self, groups: Dict[Tuple[date, str, str, str], int]):
+        """เพิ่มจำนวนที่จัดกลุ่มแล้ว {(วันที่, ร้าน, โรงอาหาร, สถานะ): จำนวน} ในครั้งเดียว
+        
+        รวมตัวนับรายวันก่อน แล้วจึงรวมตัวนับรายวันขึ้นเป็นสัปดาห์และเดือน
+        """
+        daily: Dict[date, Dict[Tuple[str, str, str], int]] = {}
+        for (day, stall_id, canteen_id, status), count in groups.items():
+            counter = daily.get(day)
+            if counter is None:
+                counter = daily[day] = {}
+            for dimension, key in self._keys(stall_id, canteen_id):
+                counter_key = (dimension, key, status)
+                counter[counter_key] = counter.get(counter_key, 0) + count
+        self._add_daily(daily)
+    
+    def _add_daily(self, daily: Dict[date, Dict[Tuple[str, str, str], int]]):
+        """เพิ่มตัวนับรายวัน {วันที่: {(มิติ, key, สถานะ): จำนวน}} เข้าทุกช่วงเวลา"""
+        for day, counts in daily.items():
+            for granularity in GRANULARITIES:
+                counter = self._counter(granularity, day)
+                for counter_key, count in counts.items():
+                    counter[counter_key] = counter.get(counter_key, 0) + count
+    
+    def to_state(self) -> List[List[Any]]:
+        """ตัวนับรายวันในรูปที่เขียนเป็น JSON ได้ [[วันที่, มิติ, key, สถานะ, จำนวน], ...]"""
+        return [
+            [day.isoformat(), dimension, key, status, count]
+            for day, counter in self.buckets['day'].items()
+            for (dimension, key, status), count in counter.items()
+        ]
+    
+    @classmethod
+    def from_state(cls, rows: List[List[Any]]) -> 'TimeBucketIndex':
+        """สร้างดัชนีจากผลของ to_state (ตัวนับรายสัปดาห์และรายเดือนรวมจากตัวนับรายวัน)"""
+        index = cls()
+        by_text: Dict[str, Dict[Tuple[str, str, str], int]] = {}
+        for day, dimension, key, status, count in rows:
+            by_text.setdefault(day, {})[(dimension, key, status)] = count
+        index._add_daily({
+            datetime.strptime(day, '%Y-%m-%d').date(): counts for day, counts in by_text.items()
+        })
+        return index
+    
+    def move_status(self, day: date, stall_id: str, canteen_id: str, old_status: str, new_status: str):
+        """ย้ายตัวนับของการร้องเรียนหนึ่งรายการจากสถานะเดิมไปสถานะใหม่"""
+        keys = self._keys(stall_id, canteen_id)
+        for granularity in GRANULARITIES:
+            counter = self._counter(granularity, day)
+            for dimension, key in keys:
+                old_key = (dimension, key, old_status)
+                new_key = (dimension, key, new_status)
+                counter[old_key] = counter.get(old_key, 0) - 1
+                counter[new_key] = counter.get(new_key, 0) + 1
+    
+    def window_counts(self, dimension: str, start: date, end: date, status: str = None) -> Dict[str, int]:
+        """จำนวนการร้องเรียนของแต่ละ key ตั้งแต่วันที่ start ถึง end (รวมทั้งสองวัน)
+        
+        เดือนที่อยู่ในช่วงทั้งเดือนใช้ตัวนับรายเดือน เหลือเฉพาะวันที่ขอบช่วงที่ใช้ตัวนับรายวัน
+        ช่วงยาวเท่าใดก็อ่านตัวนับไม่เกินประมาณ 62 วันบวกจำนวนเดือน
+        """
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"ไม่รู้จักมิติ: {dimension}")
+        result: Dict[str, int] = {}
+        day = start
+        while day <= end:
+            month_end = next_bucket(bucket_start(day, 'month'), 'month')
+            if day.day == 1 and month_end - timedelta(days=1) <= end:
+                counter, day = self.buckets['month'].get(day), month_end
+            else:
+                counter, day = self.buckets['day'].get(day), day + timedelta(days=1)
+            for (counted_dimension, key, counted_status), count in (counter or {}).items():
+                if counted_dimension == dimension and count and (status is None or counted_status == status):
+                    result[key] = result.get(key, 0) + count
+        return result
+    
+    def counts(self, granularity: str, dimension: str = 'all', start: date = None,
+               end: date = None, status: str = None) -> List[Dict[str, Any]]:
+        """จำนวนการร้องเรียนแต่ละช่วงเวลา (รวมช่วงที่ไม่มีการร้องเรียน)
+        
+        คืน list ของ {'bucket': วันแรกของช่วง, 'counts': {key: จำนวน}} เรียงจากเก่าไปใหม่
+        มิติ 'all' ใช้ key '' สำหรับจำนวนรวม ช่วงที่คร่อม start/end นับทั้งช่วง
+        """
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"ไม่รู้จักช่วงเวลา: {granularity}")
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"ไม่รู้จักมิติ: {dimension}")
+        keys = self.bucket_keys[granularity]
+        if not keys:
+            return []
+        first = bucket_start(start, granularity) if start else keys[0]
+        last = end or keys[-1]
+        buckets = self.buckets[granularity]
+        result = []
+        for bucket in iter_buckets(granularity, first, last):
+            counts = {}
+            for (counted_dimension, key, counted_status), count in buckets.get(bucket, {}).items():
+                if counted_dimension == dimension and count and (status is None or counted_status == status):
+                    counts[key] = counts.get(key, 0) + count
+            result.append({'bucket': bucket, 'counts': counts})
+        return result
@@ -0,0 +1,317 @@
+"""
+รายงานการร้องเรียนของแต่ละโรงอาหาร (เช่นรายงานประจำเดือน)
+
+แต่ละโรงอาหารได้ไฟล์ HTML ที่เปิดได้โดยไม่ต้องใช้ไฟล์อื่น (จำนวนต่อร้าน ประเภทปัญหา
+ระยะเวลาตอบกลับ และข้อความการร้องเรียน) และ/หรือไฟล์ CSV ของการร้องเรียนทีละรายการ
+พร้อมหน้า index.html ที่ลิงก์ไปทุกโรงอาหาร
+
+process หลักดึงข้อมูลจาก model (ตัวนับสรุป query_complaints และการตอบกลับ) เป็น dict
+ธรรมดา แล้วส่งให้ process pool คำนวณสถิติ สร้าง HTML/CSV และเขียนไฟล์พร้อมกันหลายโรงอาหาร
+"""
+
+import csv
+import html
+import os
+import re
+import statistics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Iterable, Optional
+
+
+REPORT_FORMATS = ('html', 'csv')
+
+# คอลัมน์ของไฟล์ CSV (หนึ่งแถวต่อการร้องเรียน)
+CSV_FIELDS = ('complaint_id', 'stall_id', 'stall_name', 'complaint_date', 'problem_type', 'status',
+              'first_response_date', 'response_days', 'complaint_description', 'responses')
+
+STYLE = """
+body { font-family: sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; margin-bottom: 2em; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: top; }
+th { background: #f0f0f0; }
+td.number { text-align: right; }
+"""
+
+
+def _parse_date(value: str):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def period_label(start: str = None, end: str = None) -> str:
+    """ข้อความช่วงเวลาของรายงาน"""
+    if start and end:
+        return f"{start} ถึง {end}"
+    if start:
+        return f"ตั้งแต่ {start}"
+    if end:
+        return f"ถึง {end}"
+    return "ทั้งหมด"
+
+
+def report_filename(canteen_id: str, fmt: str) -> str:
+    """ชื่อไฟล์รายงานของโรงอาหาร (ตัดอักขระที่ใช้ในชื่อไฟล์ไม่ได้)"""
+    return f"{re.sub(r'[^0-9A-Za-z_.-]', '_', canteen_id)}.{fmt}"
+
+
+# ===== Data Collection (process หลัก) =====
+
+def collect_canteen_data(model, canteen_id: str, start: str = None, end: str = None) -> Dict[str, Any]:
+    """ดึงข้อมูลรายงานของโรงอาหารหนึ่งจาก model เป็น dict ธรรมดา (ส่งข้าม process ได้)"""
+    canteen = model.get_canteen_summary_by_id(canteen_id)
+    stalls = []
+    for stall in model.get_stalls_by_canteen(canteen_id):
+        summary = model.get_stall_summary_by_id(stall['stall_id'])
+        stalls.append({
+            'stall_id': stall['stall_id'],
+            'stall_name': stall['stall_name'],
+            'owner_name': stall.get('owner_name', ''),
+            'all_time_count': summary['complaint_count'] if summary else 0
+        })
+    stall_names = {stall['stall_id']: stall['stall_name'] for stall in stalls}
+    
+    complaints = []
+    result = model.query_complaints(canteen_id=canteen_id, start=start, end=end, sort='oldest')
+    for complaint in result['complaints']:
+        responses = model.get_responses_by_complaint(complaint['complaint_id'])
+        complaints.append({
+            'complaint_id': complaint['complaint_id'],
+            'stall_id': complaint['stall_id'],
+            'stall_name': stall_names.get(complaint['stall_id'], ''),
+            'complaint_date': complaint['complaint_date'],
+            'problem_type': complaint['problem_type'],
+            'status': complaint['status'],
+            'complaint_description': complaint['complaint_description'],
+            'response_dates': [response['response_date'] for response in responses],
+            'response_texts': [response['response_text'] for response in responses]
+        })
+    return {
+        'canteen_id': canteen_id,
+        'canteen_name': canteen['canteen_name'],
+        'location': canteen.get('location', ''),
+        'all_time_count': canteen['complaint_count'],
+        'statuses': list(model.STATUSES),
+        'start': start,
+        'end': end,
+        'stalls': stalls,
+        'complaints': complaints
+    }
+
+
+# ===== Statistics and Rendering (process ใน pool) =====
+
+def response_days(complaint: Dict[str, Any]) -> Optional[int]:
+    """จำนวนวันจากวันที่ร้องเรียนถึงการตอบกลับครั้งแรก (None ถ้ายังไม่ตอบกลับ)"""
+    if not complaint['response_dates']:
+        return None
+    first = min(complaint['response_dates'])
+    return (_parse_date(first) - _parse_date(complaint['complaint_date'])).days
+
+
+def response_stats(days: Iterable[Optional[int]]) -> Dict[str, Any]:
+    """ค่าเฉลี่ย มัธยฐาน สูงสุดของระยะเวลาตอบกลับ และจำนวนที่ยังไม่ตอบกลับ"""
+    days = list(days)
+    answered = [value for value in days if value is not None]
+    return {
+        'answered': len(answered),
+        'unanswered': len(days) - len(answered),
+        'mean': round(statistics.mean(answered), 1) if answered else None,
+        'median': statistics.median(answered) if answered else None,
+        'max': max(answered) if answered else None
+    }
+
+
+def summarize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """สถิติของรายงาน: จำนวนต่อร้านแยกสถานะ ประเภทปัญหา และระยะเวลาตอบกลับ"""
+    complaints = data['complaints']
+    days = {c['complaint_id']: response_days(c) for c in complaints}
+    by_stall: Dict[str, List[Dict[str, Any]]] = {}
+    for c in complaints:
+        by_stall.setdefault(c['stall_id'], []).append(c)
+    stalls = []
+    for stall in data['stalls']:
+        own = by_stall.get(stall['stall_id'], [])
+        status_count = Counter(c['status'] for c in own)
+        stalls.append(dict(
+            stall,
+            complaint_count=len(own),
+            status_count={status: status_count.get(status, 0) for status in data['statuses']},
+            response=response_stats(days[c['complaint_id']] for c in own)
+        ))
+    stalls.sort(key=lambda s: s['complaint_count'], reverse=True)
+    status_count = Counter(c['status'] for c in complaints)
+    return {
+        'complaint_count': len(complaints),
+        'status_count': {status: status_count.get(status, 0) for status in data['statuses']},
+        'problem_types': Counter(c['problem_type'] for c in complaints).most_common(),
+        'response': response_stats(days.values()),
+        'response_days': days,
+        'stalls': stalls
+    }
+
+
+def _cell(value, number: bool = False) -> str:
+    text = '-' if value is None else html.escape(str(value))
+    return f'<td class="number">{text}</td>' if number else f'<td>{text}</td>'
+
+
+def _table(headers: List[str], rows: Iterable[str]) -> str:
+    head = ''.join(f'<th>{html.escape(header)}</th>' for header in headers)
+    return f'<table>\n<tr>{head}</tr>\n' + ''.join(f'<tr>{row}</tr>\n' for row in rows) + '</table>\n'
+
+
+def _page(title: str, body: str) -> str:
+    return (
+        '<!DOCTYPE html>\n<html lang="th">\n<head>\n<meta charset="utf-8">\n'
+        f'<title>{html.escape(title)}</title>\n<style>{STYLE}</style>\n</head>\n'
+        f'<body>\n{body}</body>\n</html>\n'
+    )
+
+
+def render_html(data: Dict[str, Any], summary: Dict[str, Any]) -> str:
+    """สร้างหน้า HTML ของรายงานโรงอาหารหนึ่ง (CSS อยู่ในไฟล์ ไม่อ้างอิงไฟล์อื่น)"""
+    statuses = data['statuses']
+    response = summary['response']
+    title = f"รายงานการร้องเรียน {data['canteen_name']}"
+    parts = [
+        f"<h1>{html.escape(title)}</h1>\n",
+        f"<p>{html.escape(data['location'])} | ช่วงเวลา: {html.escape(period_label(data['start'], data['end']))}</p>\n",
+        "<h2>สรุป</h2>\n",
+        _table(
+            ['จำนวนการร้องเรียน'] + statuses + ['ตอบกลับเฉลี่ย (วัน)', 'มัธยฐาน (วัน)', 'ยังไม่ตอบกลับ',
+                                                'ทั้งหมดตั้งแต่เริ่มบันทึก'],
+            [''.join([_cell(summary['complaint_count'], True)]
+                     + [_cell(summary['status_count'][status], True) for status in statuses]
+                     + [_cell(response['mean'], True), _cell(response['median'], True),
+                        _cell(response['unanswered'], True), _cell(data['all_time_count'], True)])]
+        ),
+        "<h2>จำนวนการร้องเรียนของแต่ละร้าน</h2>\n",
+        _table(
+            ['ID', 'ร้านอาหาร', 'จำนวน'] + statuses + ['ตอบกลับเฉลี่ย (วัน)', 'ยังไม่ตอบกลับ',
+                                                       'ทั้งหมดตั้งแต่เริ่มบันทึก'],
+            (''.join([_cell(s['stall_id']), _cell(s['stall_name']), _cell(s['complaint_count'], True)]
+                     + [_cell(s['status_count'][status], True) for status in statuses]
+                     + [_cell(s['response']['mean'], True), _cell(s['response']['unanswered'], True),
+                        _cell(s['all_time_count'], True)])
+             for s in summary['stalls'])
+        ),
+        "<h2>ประเภทปัญหา</h2>\n",
+        _table(
+            ['ประเภทปัญหา', 'จำนวน', 'ร้อยละ'],
+            (_cell(problem_type) + _cell(count, True)
+             + _cell(round(100 * count / summary['complaint_count'], 1), True)
+             for problem_type, count in summary['problem_types'])
+        ),
+        "<h2>รายการการร้องเรียน</h2>\n",
+        _table(
+            ['ID', 'วันที่', 'ร้านอาหาร', 'ประเภทปัญหา', 'สถานะ', 'ตอบกลับ (วัน)', 'รายละเอียด', 'การตอบกลับ'],
+            (''.join([_cell(c['complaint_id']), _cell(c['complaint_date']), _cell(c['stall_name']),
+                      _cell(c['problem_type']), _cell(c['status']),
+                      _cell(summary['response_days'][c['complaint_id']], True),
+                      _cell(c['complaint_description']),
+                      '<td>' + '<br>'.join(
+                          f"{html.escape(day)}: {html.escape(text)}"
+                          for day, text in zip(c['response_dates'], c['response_texts'])
+                      ) + '</td>'])
+             for c in data['complaints'])
+        )
+    ]
+    return _page(title, ''.join(parts))
+
+
+def write_csv(data: Dict[str, Any], summary: Dict[str, Any], path: str):
+    """เขียนการร้องเรียนของโรงอาหารเป็น CSV หนึ่งแถวต่อรายการ (utf-8-sig เพื่อให้ Excel อ่านภาษาไทยได้)"""
+    with open(path, 'w', encoding='utf-8-sig', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_FIELDS)
+        for c in data['complaints']:
+            days = summary['response_days'][c['complaint_id']]
+            writer.writerow([
+                c['complaint_id'], c['stall_id'], c['stall_name'], c['complaint_date'], c['problem_type'],
+                c['status'], min(c['response_dates']) if c['response_dates'] else '',
+                '' if days is None else days, c['complaint_description'], ' | '.join(c['response_texts'])
+            ])
+
+
+def write_canteen_report(data: Dict[str, Any], output_dir: str, formats: Iterable[str]) -> Dict[str, Any]:
+    """สร้างไฟล์รายงานของโรงอาหารหนึ่ง (ทำงานใน process ของ pool) คืนข้อมูลสำหรับหน้า index"""
+    summary = summarize(data)
+    files = {}
+    for fmt in formats:
+        name = report_filename(data['canteen_id'], fmt)
+        path = os.path.join(output_dir, name)
+        if fmt == 'html':
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(render_html(data, summary))
+        else:
+            write_csv(data, summary, path)
+        files[fmt] = name
+    return {
+        'canteen_id': data['canteen_id'],
+        'canteen_name': data['canteen_name'],
+        'location': data['location'],
+        'complaint_count': summary['complaint_count'],
+        'status_count': summary['status_count'],
+        'response': summary['response'],
+        'files': files
+    }
+
+
+# ===== Index and Entry Point =====
+
+def write_index(entries: List[Dict[str, Any]], output_dir: str, statuses: List[str],
+                start: str = None, end: str = None) -> str:
+    """เขียน index.html ที่สรุปและลิงก์ไปรายงานของทุกโรงอาหาร คืน path ของไฟล์"""
+    title = "รายงานการร้องเรียนของโรงอาหาร"
+    rows = []
+    for entry in entries:
+        links = ' '.join(
+            f'<a href="{html.escape(name)}">{fmt.upper()}</a>' for fmt, name in sorted(entry['files'].items())
+        )
+        rows.append(''.join(
+            [_cell(entry['canteen_id']), _cell(entry['canteen_name']), _cell(entry['location']),
+             _cell(entry['complaint_count'], True)]
+            + [_cell(entry['status_count'][status], True) for status in statuses]
+            + [_cell(entry['response']['mean'], True), f'<td>{links}</td>']
+        ))
+    body = (
+        f"<h1>{html.escape(title)}</h1>\n"
+        f"<p>ช่วงเวลา: {html.escape(period_label(start, end))}"
+        f" | สร้างเมื่อ {datetime.now().strftime('%Y-%m-%d %H:%M')}</p>\n"
+        + _table(['ID', 'โรงอาหาร', 'ตำแหน่ง', 'จำนวน'] + statuses + ['ตอบกลับเฉลี่ย (วัน)', 'รายงาน'], rows)
+    )
+    path = os.path.join(output_dir, 'index.html')
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(_page(title, body))
+    return path
+
+
+def generate_canteen_reports(model, output_dir: str, start: str = None, end: str = None,
+                             formats: Iterable[str] = REPORT_FORMATS, workers: int = None) -> List[Dict[str, Any]]:
+    """สร้างรายงานของทุกโรงอาหารใน output_dir พร้อม index.html คืนข้อมูลของแต่ละโรงอาหาร
+    
+    start/end: ช่วงวันที่ YYYY-MM-DD (รวมทั้งสองวัน ไม่ระบุ = ไม่จำกัด)
+    workers: จำนวน process ที่สร้างไฟล์พร้อมกัน (None = จำนวน CPU, 1 = ไม่ใช้ pool)
+    """
+    formats = tuple(formats)
+    unknown = [fmt for fmt in formats if fmt not in REPORT_FORMATS]
+    if unknown or not formats:
+        raise ValueError(f"ไม่รู้จักรูปแบบรายงาน: {', '.join(unknown) or '(ว่าง)'}")
+    os.makedirs(output_dir, exist_ok=True)
+    datasets = [
+        collect_canteen_data(model, canteen['canteen_id'], start, end) for canteen in model.get_all_canteens()
+    ]
+    workers = min(workers or os.cpu_count() or 1, len(datasets))
+    if workers <= 1:
+        entries = [write_canteen_report(data, output_dir, formats) for data in datasets]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            entries = list(pool.map(
+                write_canteen_report,
+                datasets,
+                [output_dir] * len(datasets),
+                [formats] * len(datasets)
+            ))
+    write_index(entries, output_dir, list(model.STATUSES), start, end)
+    return entries
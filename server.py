@@ -0,0 +1,63 @@
+"""
+ระบบติดตามการร้องเรียนคุณภาพอาหาร
+Entry Point ของ HTTP/JSON API (ไม่ต้องใช้ tkinter)
+
+รัน: python3 server.py [--host 127.0.0.1] [--port 8080]
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+import os
+
+# เพิ่ม path สำหรับ import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from models.factory import create_model
+from controllers.complaint_controller import ComplaintController
+from models.persistence_worker import PersistenceWorker
+from api.server import ApiServer
+
+
+def main():
+    """เปิด HTTP API จนกว่าจะกด Ctrl+C"""
+    parser = argparse.ArgumentParser(description="HTTP/JSON API ของระบบร้องเรียน")
+    parser.add_argument("--host", default=config.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT)
+    args = parser.parse_args()
+    
+    # สร้าง Model และ Controller แบบเดียวกับ GUI
+    model = create_model()
+    writer = PersistenceWorker()
+    model.attach_writer(writer)
+    controller = ComplaintController(model)
+    
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    server = ApiServer(controller, loop)
+    host, port = server.start(args.host, args.port)[:2]
+    print(f"เปิด API ที่ http://{host}:{port}", flush=True)
+    
+    # หยุด loop ระหว่างคำขอแทนการโยน KeyboardInterrupt กลางการทำงาน (Windows ไม่รองรับ)
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, loop.stop)
+        except NotImplementedError:
+            pass
+    
+    try:
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        loop.close()
+        # เขียนงานที่ค้างให้เสร็จ และรวม journal กลับเข้าไฟล์ CSV ก่อนปิดโปรแกรม
+        model.compact()
+        writer.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,43 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from datetime import datetime
 from views.complaint_detail_view import ComplaintDetailView
 
 
 class ComplaintListView:
-    """View แสดงรายการการร้องเรียนทั้งหมด (เรียงตามวันที่)"""
+    """View แสดงรายการการร้องเรียนทั้งหมด (เรียงตามวันที่) ทีละหน้า"""
+    
+    # จำนวนแถวที่สร้างใน Treeview ต่อหนึ่งหน้า
+    PAGE_SIZE = 100
+    
+    # จำนวนผลการค้นหาสูงสุดที่แสดง (เรียงตามความเกี่ยวข้อง ไม่แบ่งหน้า)
+    SEARCH_LIMIT = 200
+    
+    # ตัวเลือกในช่องกรองที่หมายถึงไม่กรองฟิลด์นั้น
+    ALL = "ทั้งหมด"
+    
+    # การเรียงลำดับ (ชื่อที่แสดง -> sort ของ query_complaints)
+    SORTS = {
+        'วันที่ล่าสุด': 'newest',
+        'วันที่เก่าสุด': 'oldest',
+        'รหัสร้าน': 'stall_id',
+        'ประเด็นปัญหา': 'problem_type',
+        'สถานะ': 'status'
+    }
+    
+    # คอลัมน์ใน row_values ที่เป็นค่าที่ใช้เรียงของแต่ละ sort
+    SORT_COLUMNS = {'newest': 2, 'oldest': 2, 'stall_id': 1, 'problem_type': 3, 'status': 4}
     
     def __init__(self, parent, controller):
         self.controller = controller
         self.parent = parent
         self.current_selected_complaint = None
+        self.current_page = 0
+        self.page_count = 1
+        # ตัวกรองที่ใช้อยู่ (ส่งให้ controller.query_complaints) และร้านที่ผ่านตัวกรองโรงอาหาร
+        self.filters = {}
+        self.filter_stall_ids = None
+        self.sort = 'newest'
         
         # สร้างเฟรมหลัก
         self.frame = ttk.Frame(parent)
@@ -21,7 +49,7 @@ class ComplaintListView:
         self.setup_table()
         
         # ลงทะเบียน callback
-        self.controller.register_callback('complaints_updated', self.refresh_table)
+        self.controller.register_callback('complaints_updated', self.on_complaints_updated)
     
     def setup_toolbar(self):
         """สร้าง toolbar ด้านบน"""
@@ -32,19 +60,153 @@ class ComplaintListView:
         ttk.Label(toolbar_frame, text="สถานะ:").pack(side=tk.LEFT, padx=5)
         
         # Combobox สำหรับเลือกสถานะ
-        self.status_var = tk.StringVar(value="ทั้งหมด")
+        self.status_var = tk.StringVar(value=self.ALL)
         self.status_combo = ttk.Combobox(
             toolbar_frame,
             textvariable=self.status_var,
-            values=["ทั้งหมด", "รอดำเนินการ", "ดำเนินการแล้ว"],
+            values=[self.ALL, "รอดำเนินการ", "ดำเนินการแล้ว"],
             state="readonly",
             width=15
         )
         self.status_combo.pack(side=tk.LEFT, padx=5)
-        self.status_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh_table())
+        self.status_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
         
         # ปุ่ม Refresh
         ttk.Button(toolbar_frame, text="รีเฟรช", command=self.refresh_table).pack(side=tk.LEFT, padx=5)
+        
+        # ช่องค้นหาข้อความ (ประเภทปัญหา รายละเอียด และข้อความตอบกลับ)
+        ttk.Button(toolbar_frame, text="ล้าง", command=self.clear_search).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(toolbar_frame, text="ค้นหา", command=lambda: self.go_to_page(0)).pack(side=tk.RIGHT, padx=5)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(toolbar_frame, textvariable=self.search_var, width=30)
+        search_entry.pack(side=tk.RIGHT, padx=5)
+        search_entry.bind('<Return>', lambda e: self.go_to_page(0))
+        ttk.Label(toolbar_frame, text="ค้นหา:").pack(side=tk.RIGHT, padx=5)
+        
+        self.setup_filter_bar()
+    
+    def setup_filter_bar(self):
+        """สร้างแถวตัวกรองโรงอาหาร ร้าน ประเด็นปัญหา ช่วงวันที่ และการเรียงลำดับ"""
+        filter_frame = ttk.Frame(self.frame)
+        filter_frame.pack(side=tk.TOP, fill=tk.X, padx=5)
+        
+        ttk.Label(filter_frame, text="โรงอาหาร:").pack(side=tk.LEFT, padx=5)
+        self.canteen_ids = {c['canteen_name']: c['canteen_id'] for c in self.controller.get_all_canteens()}
+        self.canteen_var = tk.StringVar(value=self.ALL)
+        canteen_combo = ttk.Combobox(
+            filter_frame,
+            textvariable=self.canteen_var,
+            values=[self.ALL] + list(self.canteen_ids),
+            state="readonly",
+            width=15
+        )
+        canteen_combo.pack(side=tk.LEFT, padx=5)
+        canteen_combo.bind("<<ComboboxSelected>>", lambda e: self.on_canteen_selected())
+        
+        ttk.Label(filter_frame, text="ร้าน:").pack(side=tk.LEFT, padx=5)
+        self.stall_ids = {}
+        self.stall_var = tk.StringVar(value=self.ALL)
+        self.stall_combo = ttk.Combobox(filter_frame, textvariable=self.stall_var, state="readonly", width=15)
+        self.stall_combo.pack(side=tk.LEFT, padx=5)
+        self.stall_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+        self.update_stall_choices()
+        
+        ttk.Label(filter_frame, text="ประเด็นปัญหา:").pack(side=tk.LEFT, padx=5)
+        self.problem_var = tk.StringVar(value=self.ALL)
+        self.problem_combo = ttk.Combobox(filter_frame, textvariable=self.problem_var, state="readonly", width=18)
+        self.problem_combo.pack(side=tk.LEFT, padx=5)
+        self.problem_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+        
+        # ช่วงวันที่ (เว้นว่างเพื่อแสดงทั้งหมด)
+        ttk.Label(filter_frame, text="ตั้งแต่:").pack(side=tk.LEFT, padx=5)
+        self.start_var = tk.StringVar()
+        start_entry = ttk.Entry(filter_frame, textvariable=self.start_var, width=11)
+        start_entry.pack(side=tk.LEFT)
+        start_entry.bind('<Return>', lambda e: self.apply_filters())
+        ttk.Label(filter_frame, text="ถึง:").pack(side=tk.LEFT, padx=5)
+        self.end_var = tk.StringVar()
+        end_entry = ttk.Entry(filter_frame, textvariable=self.end_var, width=11)
+        end_entry.pack(side=tk.LEFT)
+        end_entry.bind('<Return>', lambda e: self.apply_filters())
+        
+        ttk.Label(filter_frame, text="เรียงตาม:").pack(side=tk.LEFT, padx=5)
+        self.sort_var = tk.StringVar(value=next(iter(self.SORTS)))
+        sort_combo = ttk.Combobox(
+            filter_frame,
+            textvariable=self.sort_var,
+            values=list(self.SORTS),
+            state="readonly",
+            width=12
+        )
+        sort_combo.pack(side=tk.LEFT, padx=5)
+        sort_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_filters())
+        
+        ttk.Button(filter_frame, text="ล้างตัวกรอง", command=self.clear_filters).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(filter_frame, text="กรอง", command=self.apply_filters).pack(side=tk.RIGHT, padx=5)
+    
+    def update_stall_choices(self):
+        """แสดงเฉพาะร้านในโรงอาหารที่เลือกในช่องเลือกร้าน"""
+        canteen_id = self.canteen_ids.get(self.canteen_var.get())
+        if canteen_id is None:
+            stalls = self.controller.get_all_stalls()
+        else:
+            stalls = self.controller.get_stalls_by_canteen(canteen_id)
+        self.stall_ids = {s['stall_name']: s['stall_id'] for s in stalls}
+        self.stall_combo['values'] = [self.ALL] + list(self.stall_ids)
+        if self.stall_var.get() not in self.stall_ids:
+            self.stall_var.set(self.ALL)
+    
+    def update_problem_choices(self):
+        """อัปเดตรายการประเด็นปัญหา (อาจมีประเภทใหม่จากการร้องเรียนที่เพิ่ม)"""
+        self.problem_combo['values'] = [self.ALL] + self.controller.get_problem_types()
+    
+    def on_canteen_selected(self):
+        self.update_stall_choices()
+        self.apply_filters()
+    
+    def read_date(self, var):
+        """อ่านวันที่จากช่องกรอก (None ถ้าว่าง) แจ้งเตือนถ้ารูปแบบไม่ถูกต้อง"""
+        value = var.get().strip()
+        if not value:
+            return None
+        try:
+            datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            messagebox.showwarning("แจ้งเตือน", "กรุณากรอกวันที่ในรูปแบบ YYYY-MM-DD")
+            raise
+        return value
+    
+    def apply_filters(self):
+        """อ่านค่าจากแถบตัวกรองแล้วแสดงหน้าแรกของผลลัพธ์"""
+        try:
+            start = self.read_date(self.start_var)
+            end = self.read_date(self.end_var)
+        except ValueError:
+            return
+        status = self.status_var.get()
+        problem_type = self.problem_var.get()
+        canteen_id = self.canteen_ids.get(self.canteen_var.get())
+        self.filters = {
+            'status': None if status == self.ALL else status,
+            'canteen_id': canteen_id,
+            'stall_id': self.stall_ids.get(self.stall_var.get()),
+            'problem_type': None if problem_type in ("", self.ALL) else problem_type,
+            'start': start,
+            'end': end
+        }
+        self.filter_stall_ids = None if canteen_id is None else set(self.stall_ids.values())
+        self.sort = self.SORTS[self.sort_var.get()]
+        self.go_to_page(0)
+    
+    def clear_filters(self):
+        """ล้างตัวกรองทั้งหมดและกลับไปเรียงตามวันที่ล่าสุด"""
+        for var in (self.status_var, self.canteen_var, self.problem_var):
+            var.set(self.ALL)
+        self.start_var.set("")
+        self.end_var.set("")
+        self.sort_var.set(next(iter(self.SORTS)))
+        self.update_stall_choices()
+        self.apply_filters()
     
     def setup_table(self):
         """สร้างตารางแสดงการร้องเรียน"""
@@ -76,12 +238,17 @@ class ComplaintListView:
         
         # ผูก Double-Click event
         self.tree.bind('<Double-1>', self.on_complaint_selected)
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        
+        # เลื่อนเมาส์เลยขอบตารางเพื่อไปหน้าถัดไป/ก่อนหน้า
+        self.tree.bind('<MouseWheel>', self.on_mouse_wheel)
+        self.tree.bind('<Button-4>', self.on_mouse_wheel)
+        self.tree.bind('<Button-5>', self.on_mouse_wheel)
         
         # สร้าง Scrollbar
         scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.tree.configure(yscroll=scrollbar.set)
+        self.tree.pack(fill=tk.BOTH, expand=True)
         
         # Bottom Frame สำหรับปุ่ม
         button_frame = ttk.Frame(self.frame)
@@ -93,32 +260,195 @@ class ComplaintListView:
             command=self.show_detail
         ).pack(side=tk.LEFT, padx=5)
         
+        # ปุ่มเปลี่ยนหน้า
+        ttk.Button(button_frame, text="▶", width=3,
+                   command=lambda: self.go_to_page(self.current_page + 1)).pack(side=tk.RIGHT, padx=2)
+        self.page_var = tk.StringVar(value="1")
+        page_entry = ttk.Entry(button_frame, textvariable=self.page_var, width=6, justify=tk.CENTER)
+        page_entry.bind('<Return>', lambda e: self.jump_to_page())
+        self.page_label = ttk.Label(button_frame, text="/ 1")
+        self.page_label.pack(side=tk.RIGHT, padx=2)
+        page_entry.pack(side=tk.RIGHT, padx=2)
+        ttk.Button(button_frame, text="◀", width=3,
+                   command=lambda: self.go_to_page(self.current_page - 1)).pack(side=tk.RIGHT, padx=2)
+        self.total_label = ttk.Label(button_frame, text="")
+        self.total_label.pack(side=tk.RIGHT, padx=10)
+        
         # โหลดข้อมูลครั้งแรก
         self.refresh_table()
     
+    def search_query(self):
+        """คำค้นปัจจุบัน (ว่างถ้าไม่ได้ค้นหา)"""
+        return self.search_var.get().strip()
+    
+    def clear_search(self):
+        """ล้างคำค้นและกลับไปแสดงรายการตามวันที่"""
+        self.search_var.set("")
+        self.go_to_page(0)
+    
+    def go_to_page(self, page):
+        """เปลี่ยนไปหน้าที่กำหนด (เริ่มที่ 0)"""
+        self.current_page = page
+        self.refresh_table()
+    
+    def jump_to_page(self):
+        """ไปหน้าที่ผู้ใช้พิมพ์ในช่องเลขหน้า"""
+        try:
+            page = int(self.page_var.get()) - 1
+        except ValueError:
+            self.page_var.set(str(self.current_page + 1))
+            return
+        self.go_to_page(page)
+    
+    def on_mouse_wheel(self, event):
+        """โหลดหน้าถัดไป/ก่อนหน้าเมื่อเลื่อนจนสุดตาราง"""
+        scroll_down = event.num == 5 or event.delta < 0
+        top, bottom = self.tree.yview()
+        if scroll_down and bottom >= 1.0 and self.current_page < self.page_count - 1:
+            self.go_to_page(self.current_page + 1)
+            self.tree.yview_moveto(0)
+            return "break"
+        if not scroll_down and top <= 0.0 and self.current_page > 0:
+            self.go_to_page(self.current_page - 1)
+            self.tree.yview_moveto(1)
+            return "break"
+    
     def refresh_table(self):
-        """อัปเดตตารางด้วยข้อมูลล่าสุด"""
-        # ลบข้อมูลเก่า
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        """อัปเดตตารางด้วยข้อมูลหน้าปัจจุบัน"""
+        # ลบข้อมูลเก่า (สูงสุดหนึ่งหน้า)
+        self.tree.delete(*self.tree.get_children())
+        self.update_problem_choices()
         
-        # ดึงข้อมูลตามสถานะที่เลือก
-        status = self.status_var.get()
-        if status == "ทั้งหมด":
-            complaints = self.controller.get_all_complaints_sorted()
-        else:
-            complaints = self.controller.get_complaints_by_status(status)
-        
-        # เพิ่มข้อมูลลงตาราง
-        for complaint in complaints:
-            stall_name = self.controller.get_stall_name(complaint['stall_id'])
-            self.tree.insert('', tk.END, values=(
-                complaint['complaint_id'],
-                stall_name,
-                complaint['complaint_date'],
-                complaint['problem_type'],
-                complaint['status']
-            ))
+        if self.search_query():
+            self.show_search_results(self.filters.get('status'))
+            return
+        
+        # ดึงข้อมูลหน้าปัจจุบันตามตัวกรองที่ใช้อยู่
+        result = self.controller.query_complaints(self.current_page, self.PAGE_SIZE, self.sort, **self.filters)
+        self.current_page = result['page']
+        self.page_count = result['page_count']
+        self.page_var.set(str(self.current_page + 1))
+        self.page_label.config(text=f"/ {self.page_count}")
+        self.total_label.config(text=f"ทั้งหมด {result['total']} รายการ")
+        
+        # เพิ่มข้อมูลลงตาราง (ใช้ complaint_id เป็น iid เพื่อแก้ไขทีละแถวได้)
+        for complaint in result['complaints']:
+            self.tree.insert('', tk.END, iid=complaint['complaint_id'],
+                             values=self.row_values(complaint))
+    
+    def show_search_results(self, status):
+        """แสดงผลการค้นหาเรียงตามความเกี่ยวข้องในหน้าเดียว"""
+        results = self.controller.search_complaints(self.search_query(), self.SEARCH_LIMIT, status)
+        self.current_page = 0
+        self.page_count = 1
+        self.page_var.set("1")
+        self.page_label.config(text="/ 1")
+        self.total_label.config(text=f"พบ {len(results)} รายการ")
+        for complaint in results:
+            self.tree.insert('', tk.END, iid=complaint['complaint_id'],
+                             values=self.row_values(complaint))
+    
+    def row_values(self, complaint):
+        """แปลงการร้องเรียนเป็นค่าของแถวในตาราง"""
+        return (
+            complaint['complaint_id'],
+            self.controller.get_stall_name(complaint['stall_id']),
+            complaint['complaint_date'],
+            complaint['problem_type'],
+            complaint['status']
+        )
+    
+    def matches_filter(self, complaint):
+        """ตรวจสอบว่าการร้องเรียนตรงกับตัวกรองที่ใช้อยู่หรือไม่"""
+        filters = self.filters
+        for field in ('status', 'stall_id', 'problem_type'):
+            if filters.get(field) is not None and complaint[field] != filters[field]:
+                return False
+        if self.filter_stall_ids is not None and complaint['stall_id'] not in self.filter_stall_ids:
+            return False
+        if filters.get('start') and complaint['complaint_date'] < filters['start']:
+            return False
+        if filters.get('end') and complaint['complaint_date'] > filters['end']:
+            return False
+        return True
+    
+    def on_complaints_updated(self, change):
+        """แก้ไขเฉพาะแถวที่เปลี่ยนแปลงแทนการโหลดทั้งหน้าใหม่"""
+        if not change.get('complaint_ids') or self.search_query():
+            # อันดับผลการค้นหาอาจเปลี่ยน (เช่นมีข้อความตอบกลับใหม่) จึงค้นหาใหม่
+            self.refresh_table()
+            return
+        if len(change['complaint_ids']) > self.PAGE_SIZE:
+            # การนำเข้าชุดใหญ่ โหลดหน้าใหม่ครั้งเดียวเร็วกว่าแทรกทีละแถว
+            self.refresh_table()
+            return
+        
+        for complaint_id in change['complaint_ids']:
+            complaint = self.controller.get_complaint_detail(complaint_id)
+            if not complaint:
+                continue
+            if change.get('action') == 'added':
+                if not self.insert_new_row(complaint):
+                    # แถวใหม่อยู่ในหน้าก่อนหน้า ทำให้ทุกแถวในหน้านี้เลื่อน
+                    self.refresh_table()
+                    return
+            elif self.tree.exists(complaint_id):
+                if not self.matches_filter(complaint):
+                    if len(self.tree.get_children()) >= self.PAGE_SIZE:
+                        # หน้าเต็ม ต้องเติมแถวแรกของหน้าถัดไปเข้ามาแทน
+                        self.refresh_table()
+                        return
+                    self.tree.delete(complaint_id)
+                    continue
+                values = self.row_values(complaint)
+                column = self.SORT_COLUMNS[self.sort]
+                if str(values[column]) != str(self.tree.item(complaint_id, 'values')[column]):
+                    # ค่าที่ใช้เรียงเปลี่ยน (เช่นสถานะเมื่อเรียงตามสถานะ) ตำแหน่งของแถวจึงเปลี่ยน
+                    self.refresh_table()
+                    return
+                self.tree.item(complaint_id, values=values)
+            elif self.matches_filter(complaint):
+                # การร้องเรียนเพิ่งเข้าตัวกรองนี้ ตำแหน่งในหน้าต้องคำนวณใหม่
+                self.refresh_table()
+                return
+        self.update_page_labels()
+    
+    def insert_new_row(self, complaint):
+        """แทรกการร้องเรียนใหม่ในตำแหน่งตามวันที่ คืน False ถ้าต้องโหลดหน้าใหม่"""
+        if not self.matches_filter(complaint):
+            return True
+        if self.sort != 'newest':
+            return False
+        
+        # เรียงวันที่ใหม่ -> เก่า รายการใหม่อยู่หลังรายการที่มีวันที่เดียวกัน
+        rows = self.tree.get_children()
+        index = len(rows)
+        for i, item in enumerate(rows):
+            if self.tree.item(item, 'values')[2] < complaint['complaint_date']:
+                index = i
+                break
+        
+        if index == 0 and self.current_page > 0:
+            return False
+        if index >= self.PAGE_SIZE:
+            return True
+        
+        self.tree.insert('', index, iid=complaint['complaint_id'],
+                         values=self.row_values(complaint))
+        # ตัดแถวที่เกินหนึ่งหน้าออก
+        rows = self.tree.get_children()
+        if len(rows) > self.PAGE_SIZE:
+            self.tree.delete(rows[-1])
+        return True
+    
+    def update_page_labels(self):
+        """อัปเดตจำนวนทั้งหมดและจำนวนหน้า"""
+        total = self.controller.query_complaints(
+            self.current_page, self.PAGE_SIZE, self.sort, **self.filters
+        )['total']
+        self.page_count = max((total + self.PAGE_SIZE - 1) // self.PAGE_SIZE, 1)
+        self.page_label.config(text=f"/ {self.page_count}")
+        self.total_label.config(text=f"ทั้งหมด {total} รายการ")
     
     def on_complaint_selected(self, event):
         """เมื่อผู้ใช้คลิกที่แถว"""
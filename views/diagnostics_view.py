@@ -0,0 +1,108 @@
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+
+class DiagnosticsView:
+    """View แสดงสถิติเวลาการทำงานของ model, controller และ view พร้อมสถิติ cache ผลการอ่าน"""
+    
+    # ระยะเวลา (ms) ระหว่างการอัปเดตตารางอัตโนมัติ
+    REFRESH_INTERVAL = 1000
+    
+    COLUMNS = ('การทำงาน', 'จำนวนครั้ง', 'รวม (ms)', 'เฉลี่ย (ms)',
+               'p50 (ms)', 'p90 (ms)', 'p99 (ms)', 'สูงสุด (ms)')
+    
+    def __init__(self, parent, metrics, cache=None):
+        self.parent = parent
+        self.metrics = metrics
+        self.cache = cache
+        
+        # สร้าง UI
+        self.setup_ui()
+        self.auto_refresh()
+    
+    def setup_ui(self):
+        """สร้างตารางสถิติและปุ่มควบคุม"""
+        if not self.metrics.enabled:
+            ttk.Label(
+                self.parent,
+                text="ยังไม่ได้เปิดการวัดประสิทธิภาพ (ตั้งค่า COMPLAINT_INSTRUMENT=1 ก่อนรันโปรแกรม)"
+            ).pack(side=tk.TOP, anchor=tk.W, padx=10, pady=5)
+        
+        self.cache_label = ttk.Label(self.parent, text="")
+        self.cache_label.pack(side=tk.TOP, anchor=tk.W, padx=10, pady=(5, 0))
+        
+        table_frame = ttk.Frame(self.parent)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.tree = ttk.Treeview(table_frame, columns=self.COLUMNS, show='headings', height=20)
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=80, anchor=tk.E)
+        self.tree.column('การทำงาน', width=320, anchor=tk.W)
+        
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.configure(yscroll=scrollbar.set)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+        
+        button_frame = ttk.Frame(self.parent)
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=5)
+        ttk.Button(button_frame, text="รีเฟรช", command=self.refresh).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="รีเซ็ต", command=self.reset).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="บันทึก JSON", command=self.save_json).pack(side=tk.LEFT, padx=5)
+    
+    def auto_refresh(self):
+        """อัปเดตตารางเป็นระยะจนกว่าหน้าต่างจะถูกปิด"""
+        if not self.tree.winfo_exists():
+            return
+        self.refresh()
+        self.parent.after(self.REFRESH_INTERVAL, self.auto_refresh)
+    
+    def refresh(self):
+        """อัปเดตตารางจากสถิติปัจจุบัน (เรียงตามเวลารวมมากไปน้อย)"""
+        self.refresh_cache_label()
+        self.tree.delete(*self.tree.get_children())
+        for name, stats in self.metrics.snapshot().items():
+            self.tree.insert('', tk.END, values=(
+                name,
+                stats['count'],
+                stats['total_ms'],
+                stats['mean_ms'],
+                stats['p50_ms'],
+                stats['p90_ms'],
+                stats['p99_ms'],
+                stats['max_ms']
+            ))
+    
+    def refresh_cache_label(self):
+        """แสดงสถิติ hit/miss ของ cache ผลการอ่านใน controller"""
+        if self.cache is None:
+            return
+        stats = self.cache.stats()
+        self.cache_label.config(text=(
+            f"cache ผลการอ่าน: hit {stats['hits']}  miss {stats['misses']}  "
+            f"({stats['hit_rate'] * 100:.1f}%)  รายการ {stats['entries']}/{stats['max_entries']}  "
+            f"ล้างเมื่อข้อมูลเปลี่ยน {stats['invalidations']} ครั้ง"
+        ))
+    
+    def reset(self):
+        """ล้างสถิติทั้งหมด"""
+        self.metrics.reset()
+        if self.cache is not None:
+            self.cache.reset_stats()
+            self.refresh_cache_label()
+        self.tree.delete(*self.tree.get_children())
+    
+    def save_json(self):
+        """บันทึกสถิติเป็นไฟล์ JSON"""
+        path = filedialog.asksaveasfilename(
+            parent=self.parent,
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            self.metrics.dump(path)
+        except OSError as e:
+            messagebox.showerror("ข้อผิดพลาด", f"บันทึกไฟล์ไม่สำเร็จ: {e}", parent=self.parent)
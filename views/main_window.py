@@ -1,12 +1,20 @@
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 from views.complaint_list_view import ComplaintListView
 from views.restaurant_view import RestaurantView
+from views.trend_view import TrendView
+from views.diagnostics_view import DiagnosticsView
+from instrumentation import metrics
 
 
 class MainWindow:
     """หน้าหลักที่บรรจุแท็บต่างๆ"""
     
+    # ระยะเวลา (ms) ระหว่างการตรวจผลการเขียนไฟล์เบื้องหลัง
+    POLL_INTERVAL = 200
+    # ระยะเวลา (ms) ระหว่างการตรวจการเปลี่ยนแปลงจาก instance อื่น
+    WATCH_INTERVAL = 1000
+    
     def __init__(self, root: tk.Tk, controller):
         self.root = root
         self.controller = controller
@@ -37,6 +45,20 @@ class MainWindow:
             self.restaurant_view.frame,
             text="ร้านอาหาร"
         )
+        
+        # Tab 3: แนวโน้มการร้องเรียน
+        self.trend_view = TrendView(
+            self.notebook, self.controller
+        )
+        self.notebook.add(
+            self.trend_view.frame,
+            text="แนวโน้ม"
+        )
+        
+        # แสดงข้อผิดพลาดจากการเขียนไฟล์เบื้องหลัง
+        self.controller.register_callback('persistence_error', self.on_persistence_error)
+        self.root.after(self.POLL_INTERVAL, self.poll_persistence)
+        self.root.after(self.WATCH_INTERVAL, self.watch_external_changes)
     
     def setup_menu(self):
         """สร้างเมนูหลัก"""
@@ -47,13 +69,38 @@ class MainWindow:
         menubar.add_cascade(label="ไฟล์", menu=file_menu)
         file_menu.add_command(label="ออก", command=self.root.quit)
         
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="เครื่องมือ", menu=tools_menu)
+        tools_menu.add_command(label="การวัดประสิทธิภาพ", command=self.show_diagnostics)
+        
         help_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="ช่วยเหลือ", menu=help_menu)
         help_menu.add_command(label="เกี่ยวกับ", command=self.show_about)
     
+    def poll_persistence(self):
+        """ตรวจผลการเขียนไฟล์เบื้องหลังเป็นระยะใน Tk main loop"""
+        self.controller.poll_persistence()
+        self.root.after(self.POLL_INTERVAL, self.poll_persistence)
+    
+    def watch_external_changes(self):
+        """รวมข้อมูลที่ instance อื่นเขียนเป็นระยะ view จะอัปเดตเฉพาะแถวที่เปลี่ยนผ่าน callback"""
+        self.controller.poll_external_changes()
+        self.root.after(self.WATCH_INTERVAL, self.watch_external_changes)
+    
+    def on_persistence_error(self, change):
+        """แจ้งผู้ใช้เมื่อบันทึกข้อมูลไม่สำเร็จ"""
+        messagebox.showerror("ข้อผิดพลาด", f"บันทึกข้อมูลไม่สำเร็จ: {change.get('error', '')}")
+    
+    def show_diagnostics(self):
+        """แสดงหน้าต่างสถิติเวลาการทำงาน"""
+        diagnostics_window = tk.Toplevel(self.root)
+        diagnostics_window.title("การวัดประสิทธิภาพ")
+        diagnostics_window.geometry("900x500")
+        
+        DiagnosticsView(diagnostics_window, metrics, self.controller.cache)
+    
     def show_about(self):
         """แสดง About Dialog"""
-        from tkinter import messagebox
         messagebox.showinfo(
             "เกี่ยวกับ",
             "ระบบติดตามการร้องเรียนคุณภาพอาหาร\nเวอร์ชัน 1.0\n\nMVC Design Pattern"
@@ -5,6 +5,13 @@ from tkinter import ttk
 class RestaurantView:
     """View แสดงข้อมูลร้านอาหารและจำนวนการร้องเรียน"""
     
+    # เกณฑ์ของตารางร้านที่ถูกร้องเรียนมากที่สุด (ชื่อที่แสดง -> metric ของ get_top_offenders)
+    OFFENDER_METRICS = {
+        'ช่วงวันล่าสุด': 'recent',
+        'รอดำเนินการ': 'pending',
+        'ทั้งหมด': 'total'
+    }
+    
     def __init__(self, parent, controller):
         self.controller = controller
         self.parent = parent
@@ -23,7 +30,7 @@ class RestaurantView:
         self.setup_canteens_tab()
         
         # ลงทะเบียน callback
-        self.controller.register_callback('complaints_updated', self.refresh_all)
+        self.controller.register_callback('complaints_updated', self.on_complaints_updated)
     
     def setup_stalls_tab(self):
         """สร้าง Tab สำหรับร้านอาหาร"""
@@ -62,8 +69,76 @@ class RestaurantView:
         # Bind click event
         self.stall_tree.bind('<Button-1>', self.on_stall_selected)
         
+        self.setup_offenders_panel(stall_frame)
         self.refresh_stalls()
     
+    def setup_offenders_panel(self, parent):
+        """สร้างตารางร้านที่ถูกร้องเรียนมากที่สุด (ทั้งหมด รอดำเนินการ หรือในช่วงวันล่าสุด)"""
+        panel = ttk.LabelFrame(parent, text="ร้านที่ถูกร้องเรียนมากที่สุด")
+        panel.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=5)
+        
+        options = ttk.Frame(panel)
+        options.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        ttk.Label(options, text="เกณฑ์:").pack(side=tk.LEFT, padx=5)
+        self.offender_metric_var = tk.StringVar(value=next(iter(self.OFFENDER_METRICS)))
+        metric_combo = ttk.Combobox(
+            options,
+            textvariable=self.offender_metric_var,
+            values=list(self.OFFENDER_METRICS),
+            state="readonly",
+            width=12
+        )
+        metric_combo.pack(side=tk.LEFT, padx=5)
+        metric_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh_offenders())
+        
+        ttk.Label(options, text="จำนวนวัน:").pack(side=tk.LEFT, padx=5)
+        self.offender_days_var = tk.StringVar(value="30")
+        days_spin = tk.Spinbox(options, from_=1, to=365, textvariable=self.offender_days_var, width=5,
+                               command=self.refresh_offenders)
+        days_spin.pack(side=tk.LEFT, padx=5)
+        days_spin.bind('<Return>', lambda e: self.refresh_offenders())
+        
+        ttk.Label(options, text="แสดง:").pack(side=tk.LEFT, padx=5)
+        self.offender_limit_var = tk.StringVar(value="10")
+        limit_combo = ttk.Combobox(
+            options,
+            textvariable=self.offender_limit_var,
+            values=["5", "10", "20"],
+            state="readonly",
+            width=4
+        )
+        limit_combo.pack(side=tk.LEFT, padx=5)
+        limit_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh_offenders())
+        
+        columns = ('อันดับ', 'ID', 'ร้านอาหาร', 'จำนวน')
+        self.offender_tree = ttk.Treeview(panel, columns=columns, show='headings', height=5)
+        self.offender_tree.column('อันดับ', width=50, anchor=tk.CENTER)
+        self.offender_tree.column('ID', width=50, anchor=tk.CENTER)
+        self.offender_tree.column('ร้านอาหาร', width=200, anchor=tk.W)
+        self.offender_tree.column('จำนวน', width=100, anchor=tk.CENTER)
+        for col in columns:
+            self.offender_tree.heading(col, text=col)
+        self.offender_tree.pack(fill=tk.X, padx=5, pady=5)
+    
+    def refresh_offenders(self):
+        """อัปเดตตารางร้านที่ถูกร้องเรียนมากที่สุดตามเกณฑ์ที่เลือก"""
+        try:
+            days = max(int(self.offender_days_var.get()), 1)
+        except ValueError:
+            days = 30
+            self.offender_days_var.set(str(days))
+        offenders = self.controller.get_top_offenders(
+            'stall',
+            self.OFFENDER_METRICS[self.offender_metric_var.get()],
+            int(self.offender_limit_var.get()),
+            days
+        )
+        self.offender_tree.delete(*self.offender_tree.get_children())
+        for stall in offenders:
+            self.offender_tree.insert('', tk.END, values=(
+                stall['rank'], stall['stall_id'], stall['stall_name'], stall['count']
+            ))
+    
     def setup_canteens_tab(self):
         """สร้าง Tab สำหรับโรงอาหาร"""
         canteen_frame = ttk.Frame(self.notebook)
@@ -107,13 +182,9 @@ class RestaurantView:
         stalls = self.controller.get_stall_summary()
         
         for stall in stalls:
-            self.stall_tree.insert('', tk.END, values=(
-                stall['stall_id'],
-                stall['stall_name'],
-                stall['complaint_count'],
-                stall['status_count']['รอดำเนินการ'],
-                stall['status_count']['ดำเนินการแล้ว']
-            ))
+            self.stall_tree.insert('', tk.END, iid=stall['stall_id'],
+                                   values=self.stall_row_values(stall))
+        self.refresh_offenders()
     
     def refresh_canteens(self):
         """อัปเดตตารางโรงอาหาร"""
@@ -123,18 +194,69 @@ class RestaurantView:
         canteens = self.controller.get_canteen_summary()
         
         for canteen in canteens:
-            self.canteen_tree.insert('', tk.END, values=(
-                canteen['canteen_id'],
-                canteen['canteen_name'],
-                canteen['location'],
-                canteen['complaint_count']
-            ))
+            self.canteen_tree.insert('', tk.END, iid=canteen['canteen_id'],
+                                     values=self.canteen_row_values(canteen))
+    
+    def stall_row_values(self, stall):
+        """แปลงข้อมูลสรุปของร้านเป็นค่าของแถวในตาราง"""
+        return (
+            stall['stall_id'],
+            stall['stall_name'],
+            stall['complaint_count'],
+            stall['status_count']['รอดำเนินการ'],
+            stall['status_count']['ดำเนินการแล้ว']
+        )
+    
+    def canteen_row_values(self, canteen):
+        """แปลงข้อมูลสรุปของโรงอาหารเป็นค่าของแถวในตาราง"""
+        return (
+            canteen['canteen_id'],
+            canteen['canteen_name'],
+            canteen['location'],
+            canteen['complaint_count']
+        )
     
     def refresh_all(self):
         """รีเฟรชทุกตาราง"""
         self.refresh_stalls()
         self.refresh_canteens()
     
+    def on_complaints_updated(self, change):
+        """อัปเดตเฉพาะแถวของร้านและโรงอาหารที่ได้รับผลกระทบ"""
+        if 'stall_ids' not in change:
+            self.refresh_all()
+            return
+        
+        for stall_id in change['stall_ids']:
+            stall = self.controller.get_stall_summary_by_id(stall_id)
+            if stall:
+                self.patch_row(self.stall_tree, stall_id, self.stall_row_values(stall), 2)
+        
+        for canteen_id in change.get('canteen_ids', []):
+            canteen = self.controller.get_canteen_summary_by_id(canteen_id)
+            if canteen:
+                self.patch_row(self.canteen_tree, canteen_id, self.canteen_row_values(canteen), 3)
+        
+        # อันดับอาจเปลี่ยนจากร้านใดก็ได้ ตารางมีเพียงไม่กี่แถวจึงโหลดใหม่ทั้งตาราง
+        self.refresh_offenders()
+    
+    def patch_row(self, tree, iid, values, count_column):
+        """แก้ไขแถวเดียวแล้วย้ายไปตำแหน่งที่ถูกต้องตามจำนวนร้องเรียน (มากไปน้อย)"""
+        if not tree.exists(iid):
+            tree.insert('', tk.END, iid=iid, values=values)
+        else:
+            tree.item(iid, values=values)
+        
+        count = int(values[count_column])
+        index = 0
+        for item in tree.get_children():
+            if item == iid:
+                continue
+            if int(tree.item(item, 'values')[count_column]) < count:
+                break
+            index += 1
+        tree.move(iid, '', index)
+    
     def on_stall_selected(self, event):
         """เมื่อเลือกร้านอาหาร"""
         selection = self.stall_tree.selection()
@@ -0,0 +1,183 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from datetime import datetime
+
+
+class TrendView:
+    """View แสดงแนวโน้มจำนวนการร้องเรียนตามวัน สัปดาห์ หรือเดือน
+    
+    ข้อมูลมาจากตัวนับที่ model รวมไว้ล่วงหน้า (ไม่อ่านการร้องเรียนทีละรายการ)
+    """
+    
+    GRANULARITIES = {'วัน': 'day', 'สัปดาห์': 'week', 'เดือน': 'month'}
+    DIMENSIONS = {'ทั้งหมด': 'all', 'โรงอาหาร': 'canteen', 'ร้านอาหาร': 'stall'}
+    
+    def __init__(self, parent, controller):
+        self.controller = controller
+        self.parent = parent
+        self.trend = []
+        self.dimension = 'all'
+        
+        # สร้างเฟรมหลัก
+        self.frame = ttk.Frame(parent)
+        
+        # สร้าง Toolbar
+        self.setup_toolbar()
+        
+        # สร้างกราฟและตาราง
+        self.setup_chart()
+        self.setup_table()
+        
+        # ลงทะเบียน callback
+        self.controller.register_callback('complaints_updated', self.on_complaints_updated)
+        
+        self.refresh()
+    
+    def setup_toolbar(self):
+        """สร้าง toolbar สำหรับเลือกช่วงเวลา มิติ สถานะ และช่วงวันที่"""
+        toolbar_frame = ttk.Frame(self.frame)
+        toolbar_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(toolbar_frame, text="ช่วงเวลา:").pack(side=tk.LEFT, padx=5)
+        self.granularity_var = tk.StringVar(value="สัปดาห์")
+        granularity_combo = ttk.Combobox(
+            toolbar_frame,
+            textvariable=self.granularity_var,
+            values=list(self.GRANULARITIES),
+            state="readonly",
+            width=8
+        )
+        granularity_combo.pack(side=tk.LEFT, padx=5)
+        granularity_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+        
+        ttk.Label(toolbar_frame, text="แยกตาม:").pack(side=tk.LEFT, padx=5)
+        self.dimension_var = tk.StringVar(value="ทั้งหมด")
+        dimension_combo = ttk.Combobox(
+            toolbar_frame,
+            textvariable=self.dimension_var,
+            values=list(self.DIMENSIONS),
+            state="readonly",
+            width=10
+        )
+        dimension_combo.pack(side=tk.LEFT, padx=5)
+        dimension_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+        
+        ttk.Label(toolbar_frame, text="สถานะ:").pack(side=tk.LEFT, padx=5)
+        self.status_var = tk.StringVar(value="ทั้งหมด")
+        status_combo = ttk.Combobox(
+            toolbar_frame,
+            textvariable=self.status_var,
+            values=["ทั้งหมด", "รอดำเนินการ", "ดำเนินการแล้ว"],
+            state="readonly",
+            width=15
+        )
+        status_combo.pack(side=tk.LEFT, padx=5)
+        status_combo.bind("<<ComboboxSelected>>", lambda e: self.refresh())
+        
+        # ช่วงวันที่ (เว้นว่างเพื่อแสดงทั้งหมด)
+        ttk.Label(toolbar_frame, text="ตั้งแต่:").pack(side=tk.LEFT, padx=5)
+        self.start_var = tk.StringVar()
+        ttk.Entry(toolbar_frame, textvariable=self.start_var, width=11).pack(side=tk.LEFT)
+        ttk.Label(toolbar_frame, text="ถึง:").pack(side=tk.LEFT, padx=5)
+        self.end_var = tk.StringVar()
+        ttk.Entry(toolbar_frame, textvariable=self.end_var, width=11).pack(side=tk.LEFT)
+        
+        ttk.Button(toolbar_frame, text="แสดง", command=self.refresh).pack(side=tk.LEFT, padx=5)
+    
+    def setup_chart(self):
+        """สร้างกราฟแท่งจำนวนการร้องเรียนรวมของแต่ละช่วงเวลา"""
+        self.canvas = tk.Canvas(self.frame, height=180, background="white")
+        self.canvas.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+        self.canvas.bind('<Configure>', lambda e: self.draw_chart())
+    
+    def setup_table(self):
+        """สร้างตารางจำนวนการร้องเรียนต่อช่วงเวลา (แตกย่อยตามร้าน/โรงอาหาร)"""
+        table_frame = ttk.Frame(self.frame)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        self.tree = ttk.Treeview(table_frame, columns=('จำนวนร้องเรียน',), height=10)
+        self.tree.heading('#0', text='ช่วงเวลา / ชื่อ')
+        self.tree.heading('จำนวนร้องเรียน', text='จำนวนร้องเรียน')
+        self.tree.column('#0', width=300, anchor=tk.W)
+        self.tree.column('จำนวนร้องเรียน', width=120, anchor=tk.CENTER)
+        
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.configure(yscroll=scrollbar.set)
+        self.tree.pack(fill=tk.BOTH, expand=True)
+    
+    def read_date(self, var):
+        """อ่านวันที่จากช่องกรอก (None ถ้าว่าง) แจ้งเตือนถ้ารูปแบบไม่ถูกต้อง"""
+        value = var.get().strip()
+        if not value:
+            return None
+        try:
+            datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            messagebox.showwarning("แจ้งเตือน", "กรุณากรอกวันที่ในรูปแบบ YYYY-MM-DD")
+            raise
+        return value
+    
+    def refresh(self):
+        """ดึงตัวนับตามตัวเลือกปัจจุบันแล้ววาดกราฟและตารางใหม่"""
+        try:
+            start = self.read_date(self.start_var)
+            end = self.read_date(self.end_var)
+        except ValueError:
+            return
+        status = self.status_var.get()
+        self.dimension = self.DIMENSIONS[self.dimension_var.get()]
+        self.trend = self.controller.get_trend(
+            self.GRANULARITIES[self.granularity_var.get()],
+            self.dimension,
+            start,
+            end,
+            None if status == "ทั้งหมด" else status
+        )
+        self.draw_chart()
+        self.fill_table()
+    
+    def key_name(self, key):
+        """ชื่อที่แสดงของ key ตามมิติปัจจุบัน"""
+        if self.dimension == 'stall':
+            return self.controller.get_stall_name(key)
+        if self.dimension == 'canteen':
+            return self.controller.get_canteen_name(key)
+        return 'รวม'
+    
+    def fill_table(self):
+        """แสดงช่วงเวลาล่าสุดก่อน พร้อมจำนวนแยกตามร้าน/โรงอาหาร"""
+        self.tree.delete(*self.tree.get_children())
+        for bucket in reversed(self.trend):
+            total = sum(bucket['counts'].values())
+            parent = self.tree.insert('', tk.END, text=bucket['bucket'], values=(total,))
+            if self.dimension == 'all':
+                continue
+            for key, count in sorted(bucket['counts'].items(), key=lambda item: -item[1]):
+                self.tree.insert(parent, tk.END, text=f"{key} {self.key_name(key)}", values=(count,))
+    
+    def draw_chart(self):
+        """วาดกราฟแท่งจำนวนรวมของแต่ละช่วงเวลา (เก่า -> ใหม่)"""
+        self.canvas.delete('all')
+        if not self.trend:
+            return
+        width = self.canvas.winfo_width()
+        height = self.canvas.winfo_height()
+        margin = 20
+        totals = [sum(bucket['counts'].values()) for bucket in self.trend]
+        peak = max(max(totals), 1)
+        bar_width = max((width - 2 * margin) / len(totals), 1)
+        for i, total in enumerate(totals):
+            x0 = margin + i * bar_width
+            bar_height = (height - 2 * margin) * total / peak
+            self.canvas.create_rectangle(
+                x0, height - margin - bar_height, x0 + max(bar_width - 1, 1), height - margin,
+                fill="steelblue", outline=""
+            )
+        self.canvas.create_text(margin, margin / 2, text=f"สูงสุด {peak}", anchor=tk.W)
+        self.canvas.create_text(margin, height - margin / 2, text=self.trend[0]['bucket'], anchor=tk.W)
+        self.canvas.create_text(width - margin, height - margin / 2, text=self.trend[-1]['bucket'], anchor=tk.E)
+    
+    def on_complaints_updated(self, change):
+        """ตัวนับถูกอัปเดตทีละรายการใน model จึงดึงผลใหม่ได้ทันที"""
+        self.refresh()